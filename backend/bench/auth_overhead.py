@@ -0,0 +1,76 @@
+"""
+Micro-benchmark overhead autentikasi per request (get_current_user).
+
+Membandingkan jalur lambat (decode JWT + query users, cache dikosongkan
+setiap iterasi) dengan jalur cepat lewat AuthCache, serta jumlah query
+per panggilan. Memakai database SQLite sementara, bukan DATABASE_URL.
+
+Jalankan dari root repo:
+    python -m backend.bench.auth_overhead --iterations 2000
+"""
+import os
+import tempfile
+
+# Konfigurasi dibaca saat modul backend diimpor
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench-auth-"), "bench.db")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_DB_PATH}",
+    ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{_DB_PATH}",
+    JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY") or "bench-secret",
+    JWT_ALGORITHM=os.getenv("JWT_ALGORITHM") or "HS256",
+    ACCESS_TOKEN_EXPIRE_MINUTES=os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES") or "30",
+)
+
+import argparse
+import time
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+from backend.database import Base, engine, SessionLocal
+from backend.models.user import User
+from backend.utils.auth_cache import auth_cache
+from backend.utils.security import create_access_token, get_current_user
+
+
+def measure(credentials, iterations: int, cached: bool):
+    queries = [0]
+
+    def count(*args):
+        queries[0] += 1
+
+    db = SessionLocal()
+    get_current_user(credentials, db)
+    event.listen(engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            auth_cache._entries.clear()
+            auth_cache._by_email.clear()
+        get_current_user(credentials, db)
+        # Setiap request mendapat sesi baru; objek tidak boleh tersisa di identity map
+        db.expunge_all()
+    elapsed = time.perf_counter() - started
+    event.remove(engine, "before_cursor_execute", count)
+    db.close()
+    return elapsed / iterations * 1e6, queries[0] / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(name="Guru", email="bench@example.com", password_hash="x", role="teacher"))
+    db.commit()
+    db.close()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": "bench@example.com"}))
+
+    miss_us, miss_queries = measure(credentials, args.iterations, cached=False)
+    hit_us, hit_queries = measure(credentials, args.iterations, cached=True)
+    print(f"tanpa cache : {miss_us:7.1f} us/request, {miss_queries:.1f} query/request")
+    print(f"dengan cache: {hit_us:7.1f} us/request, {hit_queries:.1f} query/request")
+
+
+if __name__ == "__main__":
+    main()
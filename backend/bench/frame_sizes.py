@@ -0,0 +1,74 @@
+"""
+Benchmark ukuran dan waktu encode frame biner vs JSON (lihat utils/frame_codec.py).
+
+Payload sintetis untuk ketiga event berfrekuensi tinggi:
+  drawing_batch               -> --strokes coretan x --points titik per tick
+  update_bubble_quiz_results  -> snapshot penuh heatmap BUBBLE_HEATMAP_GRID + 3 area
+  update_leaderboard          -> --leaderboard entri
+
+Jalankan dari root repo:
+    python -m backend.bench.frame_sizes --strokes 2 --points 40 --leaderboard 50
+"""
+import argparse
+import json
+import random
+import timeit
+from backend.utils import frame_codec
+from backend.utils.bubble_quiz import BUBBLE_HEATMAP_GRID
+
+
+def drawing_batch(strokes: int, points: int):
+    ops = []
+    for index in range(strokes):
+        deltas = [random.randint(0, 4096), random.randint(0, 4096)]
+        deltas += [random.randint(-40, 40) for _ in range((points - 1) * 2)]
+        ops.append({
+            "slide_id": "3f0c2a9e-7d41-4c55-9a4e-2b8f6d1c0e77", "id": 1729240000000000.0 + index, "n": 0,
+            "tool": "pen", "color": "#EF4444", "width": 0.004, "points": deltas,
+        })
+    return {"ops": ops}
+
+
+def bubble_results():
+    values = {"grid": BUBBLE_HEATMAP_GRID}
+    values.update({f"cell:{cell}": random.randint(1, 30) for cell in range(BUBBLE_HEATMAP_GRID * BUBBLE_HEATMAP_GRID)})
+    values.update({f"area:{area}": random.randint(1, 30) for area in range(3)})
+    return {"slide_id": "3f0c2a9e-7d41-4c55-9a4e-2b8f6d1c0e77", "seq": 0, "full": True, "values": values}
+
+
+def leaderboard(entries: int):
+    return [
+        {"student_id": f"student-{index:04d}", "student_name": f"Siswa {index}", "score": 1000 - index * 7}
+        for index in range(entries)
+    ]
+
+
+def encode_json(payload):
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def report(event: str, payload, repeat: int):
+    json_bytes = len(encode_json(payload))
+    binary_bytes = len(frame_codec.encode(event, payload))
+    json_us = timeit.timeit(lambda: encode_json(payload), number=repeat) / repeat * 1e6
+    binary_us = timeit.timeit(lambda: frame_codec.encode(event, payload), number=repeat) / repeat * 1e6
+    print(f"{event:<28} JSON {json_bytes:>7} B {json_us:>8.1f} us | biner {binary_bytes:>7} B {binary_us:>8.1f} us"
+          f" | {binary_bytes / json_bytes:.0%} ukuran")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strokes", type=int, default=2)
+    parser.add_argument("--points", type=int, default=40)
+    parser.add_argument("--leaderboard", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    report("drawing_batch", drawing_batch(args.strokes, args.points), args.repeat)
+    report("update_bubble_quiz_results", bubble_results(), args.repeat)
+    report("update_leaderboard", leaderboard(args.leaderboard), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark memori puncak render PDF saat ingest.
+
+Membuat PDF sintetis N halaman, lalu merendernya di process pool 'spawn'
+seperti PdfIngestor, per potongan --chunk-pages halaman:
+  stream -> render_page_range (pdftoppm menulis langsung ke disk)
+  eager  -> render gambar PIL di memori lewat convert_from_path tanpa
+            output_folder, cara lama sebelum render_page_range: semua
+            halaman satu potongan ditampung di memori sebelum disimpan
+
+Yang dilaporkan per mode: RSS puncak proses render (Python) dan RSS puncak
+pdftoppm (proses anaknya). RSS mode stream seharusnya tetap untuk berapa pun
+jumlah halaman per potongan; mode eager naik sebanding dengannya.
+
+Butuh poppler (pdftoppm). Jalankan dari root repo:
+    python -m backend.bench.pdf_ingest_memory --pages 60 --dpi 150
+    python -m backend.bench.pdf_ingest_memory --pages 60 --chunk-pages 60 --mode eager
+"""
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PIL import Image, ImageDraw
+
+
+def make_pdf(path: Path, pages: int, size=(1280, 720)):
+    """PDF berisi gambar noise per halaman agar hasil render tidak mudah dikompresi."""
+    images = []
+    for number in range(1, pages + 1):
+        image = Image.effect_noise(size, 64).convert("RGB")
+        ImageDraw.Draw(image).text((40, 40), f"Slide {number}", fill=(255, 0, 0))
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=72)
+
+
+def _peak_rss_mb():
+    # ru_maxrss dalam KB di Linux; RUSAGE_CHILDREN = pdftoppm yang sudah selesai
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+def _render_stream(pdf_path, staging_dir, first_page, last_page, dpi):
+    from backend.utils.pdf_render import render_page_range
+    render_page_range(pdf_path, staging_dir, first_page, last_page, dpi, 1)
+    return _peak_rss_mb()
+
+
+def _render_eager(pdf_path, staging_dir, first_page, last_page, dpi):
+    from pdf2image import convert_from_path
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page, thread_count=1)
+    for page_number, image in zip(range(first_page, last_page + 1), images):
+        image.save(Path(staging_dir) / f"slide_{page_number}.png")
+    return _peak_rss_mb()
+
+
+RENDERERS = {"stream": _render_stream, "eager": _render_eager}
+
+
+def run(mode: str, pdf_path: Path, pages: int, chunk_pages: int, dpi: int):
+    with tempfile.TemporaryDirectory(prefix="bench-ingest-") as staging_dir:
+        started = time.perf_counter()
+        # Pool baru per mode agar RSS puncak tidak terbawa dari mode sebelumnya
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            peaks = [
+                pool.submit(RENDERERS[mode], str(pdf_path), staging_dir, first, min(first + chunk_pages - 1, pages), dpi).result()
+                for first in range(1, pages + 1, chunk_pages)
+            ]
+        elapsed = time.perf_counter() - started
+    own = max(peak[0] for peak in peaks)
+    children = max(peak[1] for peak in peaks)
+    print(f"{mode:>6}: {pages} halaman, potongan {chunk_pages}, {dpi} dpi -> "
+          f"RSS puncak render {own:.0f} MB, pdftoppm {children:.0f} MB, {elapsed:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--chunk-pages", type=int, default=8, help="halaman per potongan (PDF_CHUNK_PAGES)")
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--mode", choices=["stream", "eager", "both"], default="both")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-pdf-") as tmp_dir:
+        pdf_path = Path(tmp_dir) / "deck.pdf"
+        make_pdf(pdf_path, args.pages)
+        print(f"PDF sintetis: {pdf_path.stat().st_size / 1024 / 1024:.1f} MB")
+        for mode in (["stream", "eager"] if args.mode == "both" else [args.mode]):
+            run(mode, pdf_path, args.pages, args.chunk_pages, args.dpi)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark throughput endpoint /uploads.
+
+Menjalankan router file_serving saja (tanpa database) di uvicorn, lalu
+mengirim --requests permintaan dengan --concurrency klien bersamaan untuk:
+  full GET      -> 200 dengan isi gambar blob
+  conditional   -> If-None-Match dengan ETag yang cocok (304)
+  ?w=400 webp   -> turunan WebP lewat negosiasi Accept
+  legacy GET    -> file lama uploads/{presentation_id}/ (ETag dari hash isi)
+
+File uji dibuat di uploads/ dan dihapus lagi setelah selesai.
+Jalankan dari root repo:
+    python -m backend.bench.uploads_throughput --requests 3000 --concurrency 32
+"""
+import argparse
+import asyncio
+import shutil
+import time
+import uuid
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from PIL import Image, ImageDraw
+from backend.routers import file_serving
+from backend.utils import blob_store
+from backend.utils.slide_variants import write_variants
+
+
+async def measure(client, url, requests: int, concurrency: int, headers=None):
+    semaphore = asyncio.Semaphore(concurrency)
+    codes = {}
+
+    async def one():
+        async with semaphore:
+            response = await client.get(url, headers=headers or {})
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+            return response
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*[one() for _ in range(requests)])
+    return requests / (time.perf_counter() - started), codes, responses[0]
+
+
+def make_slide():
+    """Gambar mirip slide: latar gradien, blok teks, dan satu area foto (noise)."""
+    image = Image.linear_gradient("L").resize((1920, 1080)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for row in range(8):
+        draw.rectangle((120, 160 + row * 90, 1100, 200 + row * 90), fill=(30, 30, 90))
+    image.paste(Image.effect_noise((640, 480), 40).convert("RGB"), (1180, 300))
+    return image
+
+
+async def main(requests: int, concurrency: int, port: int):
+    image = make_slide()
+    digest = uuid.uuid4().hex * 2
+    blob = blob_store.blob_file(digest, "png")
+    blob.parent.mkdir(parents=True, exist_ok=True)
+    image.save(blob)
+    write_variants(str(blob))
+    legacy_dir = blob_store.UPLOADS_DIR / str(uuid.uuid4())
+    legacy_dir.mkdir(parents=True)
+    image.save(legacy_dir / "slide_1.png")
+
+    app = FastAPI()
+    app.include_router(file_serving.router)
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", access_log=False))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            blob_url = "/" + blob_store.blob_url(digest, "png")
+            legacy_url = f"/uploads/{legacy_dir.name}/slide_1.png"
+            rps, codes, response = await measure(client, blob_url, requests, concurrency)
+            print(f"full GET     {rps:7.0f} req/s {codes}")
+            headers = {"If-None-Match": response.headers["etag"]}
+            rps, codes, _ = await measure(client, blob_url, requests, concurrency, headers)
+            print(f"conditional  {rps:7.0f} req/s {codes}")
+            headers = {"Accept": "image/webp,*/*"}
+            rps, codes, _ = await measure(client, blob_url + "?w=400", requests, concurrency, headers)
+            print(f"?w=400 webp  {rps:7.0f} req/s {codes}")
+            rps, codes, _ = await measure(client, legacy_url, requests, concurrency)
+            print(f"legacy GET   {rps:7.0f} req/s {codes}")
+    finally:
+        server.should_exit = True
+        await serve_task
+        blob_store.remove_blob(blob_store.blob_relpath(digest, "png"))
+        blob.parent.rmdir()
+        shutil.rmtree(legacy_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.port))
@@ -0,0 +1,86 @@
+import uuid
+from collections import Counter
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+from ..models.blob import Blob
+from ..models.slide import Slide
+from ..models.presentation import PresentationSource
+from ..utils import blob_store
+
+# Referensi blob dihitung sebagai Counter {(hash, ekstensi): jumlah}.
+# Baris blob selalu diproses urut hash agar transaksi paralel mengunci dalam urutan yang sama.
+
+def add_blob_refs(db: Session, refs: Counter):
+    """Menambah ref_count (membuat baris blob jika belum ada) secara atomik."""
+    rows = [
+        {"hash": digest, "path": blob_store.blob_relpath(digest, ext), "ref_count": count}
+        for (digest, ext), count in sorted(refs.items())
+    ]
+    if not rows:
+        return
+    stmt = insert(Blob).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Blob.hash],
+        set_={"ref_count": Blob.ref_count + stmt.excluded.ref_count},
+    )
+    db.execute(stmt)
+
+def release_blob_refs(db: Session, refs: Counter):
+    for (digest, _), count in sorted(refs.items()):
+        db.execute(update(Blob).where(Blob.hash == digest).values(ref_count=Blob.ref_count - count))
+
+def presentation_blob_refs(db: Session, presentation_id: uuid.UUID):
+    """Referensi blob milik presentasi: gambar setiap slide dan PDF sumbernya."""
+    refs = Counter()
+    for (content_url,) in db.query(Slide.content_url).filter(Slide.presentation_id == presentation_id):
+        digest = blob_store.digest_of_url(content_url)
+        # Slide lama (uploads/{presentation_id}/...) tidak punya blob
+        if digest:
+            refs[(digest, "png")] += 1
+    source = db.get(PresentationSource, presentation_id)
+    if source is not None:
+        refs[(source.pdf_hash, "pdf")] += 1
+    return refs
+
+def get_page_manifest(db: Session, pdf_hash: str):
+    """Daftar halaman dari PDF identik yang sudah selesai dikonversi (di presentasi mana pun)."""
+    source = (
+        db.query(PresentationSource)
+        .filter(PresentationSource.pdf_hash == pdf_hash, PresentationSource.pages.isnot(None))
+        .first()
+    )
+    return source.pages if source else None
+
+def collect_garbage(db: Session, keys):
+    """
+    Menghapus blob tanpa referensi (baris dan filenya) dalam transaksi sendiri.
+    `keys` berisi (hash, ekstensi) yang mungkin tidak lagi dipakai: referensi
+    yang baru dilepas, atau file yang ditulis oleh transaksi yang di-rollback
+    (barisnya mungkin tidak ada). Dipanggil setelah commit/rollback pemanggil.
+
+    Baris dikunci lewat add_blob_refs dengan jumlah 0, bukan SELECT ... FOR
+    UPDATE: upsert ikut menunggu transaksi lain yang baru menyisipkan hash
+    yang sama, sedangkan FOR UPDATE tidak melihat baris yang belum di-commit.
+    Ingest selalu menambah referensi sebelum menaruh file, jadi selama kunci
+    dipegang tidak ada yang bisa memakai ulang file yang sedang dihapus.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    try:
+        add_blob_refs(db, Counter({key: 0 for key in keys}))
+        blobs = db.execute(
+            select(Blob)
+            .where(Blob.hash.in_(sorted(digest for digest, _ in keys)), Blob.ref_count <= 0)
+            .order_by(Blob.hash)
+        ).scalars().all()
+        for blob in blobs:
+            # File dihapus selagi baris masih terkunci; jika commit gagal, baris
+            # ref_count 0 yang tersisa dibersihkan oleh collect_garbage berikutnya
+            blob_store.remove_blob(blob.path)
+            db.delete(blob)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
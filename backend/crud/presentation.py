@@ -1,9 +1,18 @@
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.presentation import Presentation
 from ..models.slide import Slide
 from ..schemas.presentation import PresentationCreate
 from ..schemas.activity import QuizCreate, PollCreate, WordCloudCreate, BubbleQuizCreate
+from ..utils.slide_cache import slide_cache
+from ..utils.deck_cache import deck_cache
+from ..utils.session_cache import session_cache
+from ..utils.presentation_cache import presentation_cache
+from ..utils.slide_variants import variant_path
+from ..utils import blob_store
+from . import blob as crud_blob
 
 def create_presentation(db: Session, presentation: PresentationCreate, owner_id: uuid.UUID):
     db_presentation = Presentation(
@@ -16,7 +25,47 @@ def create_presentation(db: Session, presentation: PresentationCreate, owner_id:
     return db_presentation
 
 def get_presentations_by_owner(db: Session, owner_id: uuid.UUID):
-    return db.query(Presentation).filter(Presentation.owner_id == owner_id).all()
+    # Slide semua presentasi dimuat dengan satu query tambahan, bukan satu query per presentasi
+    return (
+        db.query(Presentation)
+        .options(selectinload(Presentation.slides))
+        .filter(Presentation.owner_id == owner_id)
+        .all()
+    )
+
+def get_presentation_summaries_by_owner(db: Session, owner_id: uuid.UUID):
+    """
+    Daftar presentasi ringan untuk dasbor dalam satu query: jumlah slide dan
+    thumbnail slide pertama, tanpa memuat slide beserta settings-nya.
+    """
+    slide_count = (
+        select(func.count(Slide.id))
+        .where(Slide.presentation_id == Presentation.id)
+        .correlate(Presentation)
+        .scalar_subquery()
+    )
+    first_image = (
+        select(Slide.content_url)
+        .where(Slide.presentation_id == Presentation.id)
+        .order_by(Slide.page_number)
+        .limit(1)
+        .correlate(Presentation)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        select(Presentation, slide_count, first_image).where(Presentation.owner_id == owner_id)
+    ).all()
+    return [
+        {
+            "id": presentation.id,
+            "title": presentation.title,
+            "owner_id": presentation.owner_id,
+            "created_at": presentation.created_at,
+            "slide_count": count,
+            "thumbnail_url": variant_path(image, "thumb") if image else None,
+        }
+        for presentation, count, image in rows
+    ]
 
 def get_presentation_by_id(db: Session, presentation_id: uuid.UUID, owner_id: uuid.UUID = None):
     """
@@ -29,22 +78,48 @@ def get_presentation_by_id(db: Session, presentation_id: uuid.UUID, owner_id: uu
         query = query.filter(Presentation.owner_id == owner_id)
     return query.first()
 
+def get_presentation_with_slides(db: Session, presentation_id: uuid.UUID, owner_id: uuid.UUID = None):
+    query = (
+        db.query(Presentation)
+        .options(selectinload(Presentation.slides))
+        .filter(Presentation.id == presentation_id)
+    )
+    if owner_id:
+        query = query.filter(Presentation.owner_id == owner_id)
+    return query.first()
+
 def update_presentation_title(db: Session, presentation: Presentation, new_title: str):
     presentation.title = new_title
     db.commit()
     db.refresh(presentation)
+    presentation_cache.invalidate(presentation.id)
     return presentation
 
 def delete_presentation(db: Session, presentation: Presentation):
+    # Gambar slide dan PDF sumber yang tidak dipakai presentasi lain ikut dihapus
+    released = crud_blob.presentation_blob_refs(db, presentation.id)
+    crud_blob.release_blob_refs(db, released)
     db.delete(presentation)
     db.commit()
+    crud_blob.collect_garbage(db, released)
+    blob_store.remove_legacy_dir(presentation.id)
+    slide_cache.invalidate_presentation(presentation.id)
+    deck_cache.invalidate(presentation.id)
+    presentation_cache.invalidate(presentation.id)
+    # Sesi milik presentasi ikut terhapus (ON DELETE CASCADE)
+    session_cache.invalidate_presentation(presentation.id)
     return presentation
 
+# Setiap perubahan aktivitas slide membuang entri slide_cache agar
+# handler Socket.IO membaca konfigurasi terbaru dari database, dan
+# respons detail presentasi yang di-cache.
 def remove_slide_activity(db: Session, slide: Slide):
     slide.interactive_type = None
     slide.settings = None
     db.commit()
     db.refresh(slide)
+    slide_cache.invalidate(slide.id)
+    presentation_cache.invalidate(slide.presentation_id)
     return slide
 
 def set_slide_quiz(db: Session, slide: Slide, quiz_data: QuizCreate):
@@ -56,6 +131,8 @@ def set_slide_quiz(db: Session, slide: Slide, quiz_data: QuizCreate):
     }
     db.commit()
     db.refresh(slide)
+    slide_cache.invalidate(slide.id)
+    presentation_cache.invalidate(slide.presentation_id)
     return slide
 
 def set_slide_activity(db: Session, slide: Slide, poll_data: PollCreate):
@@ -73,6 +150,8 @@ def set_slide_activity(db: Session, slide: Slide, poll_data: PollCreate):
     
     db.commit()
     db.refresh(slide)
+    slide_cache.invalidate(slide.id)
+    presentation_cache.invalidate(slide.presentation_id)
     return slide
 
 def set_slide_wordcloud(db: Session, slide: Slide, wordcloud_data: WordCloudCreate):
@@ -80,6 +159,8 @@ def set_slide_wordcloud(db: Session, slide: Slide, wordcloud_data: WordCloudCrea
     slide.settings = {"question": wordcloud_data.question}
     db.commit()
     db.refresh(slide)
+    slide_cache.invalidate(slide.id)
+    presentation_cache.invalidate(slide.presentation_id)
     return slide
 
 def set_slide_bubble_quiz(db: Session, slide: Slide, quiz_data: BubbleQuizCreate):
@@ -88,4 +169,42 @@ def set_slide_bubble_quiz(db: Session, slide: Slide, quiz_data: BubbleQuizCreate
     slide.settings = quiz_data.dict()
     db.commit()
     db.refresh(slide)
-    return slide
\ No newline at end of file
+    slide_cache.invalidate(slide.id)
+    presentation_cache.invalidate(slide.presentation_id)
+    return slide
+
+# --- Versi async untuk handler Socket.IO dan cache live (slide_cache, deck_cache) ---
+
+def _parse_uuid(value):
+    # ID dari klien Socket.IO berupa string bebas; ID tidak valid dianggap tidak ditemukan
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+async def get_slide_by_id_async(db: AsyncSession, slide_id):
+    slide_uuid = _parse_uuid(slide_id)
+    if slide_uuid is None:
+        return None
+    return await db.get(Slide, slide_uuid)
+
+async def get_slides_by_presentation_async(db: AsyncSession, presentation_id):
+    """Semua slide presentasi, urut page_number."""
+    presentation_uuid = _parse_uuid(presentation_id)
+    if presentation_uuid is None:
+        return []
+    result = await db.execute(
+        select(Slide).where(Slide.presentation_id == presentation_uuid).order_by(Slide.page_number)
+    )
+    return result.scalars().all()
+
+async def get_presentation_by_id_async(db: AsyncSession, presentation_id, owner_id: uuid.UUID = None):
+    """Sama seperti get_presentation_by_id, dengan slide dimuat sekaligus (tanpa lazy load)."""
+    presentation_uuid = _parse_uuid(presentation_id)
+    if presentation_uuid is None:
+        return None
+    query = select(Presentation).options(selectinload(Presentation.slides)).where(Presentation.id == presentation_uuid)
+    if owner_id:
+        query = query.where(Presentation.owner_id == owner_id)
+    result = await db.execute(query)
+    return result.scalars().first()
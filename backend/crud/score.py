@@ -1,4 +1,8 @@
+import uuid
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import score as models
 from ..schemas import score as schemas
 
@@ -32,4 +36,44 @@ def add_points(db: Session, session_id: str, student_id: str, student_name: str,
 
 def get_leaderboard(db: Session, session_id: str):
     # PERBAIKAN: Urutkan berdasarkan kolom 'score'
-    return db.query(models.Score).filter(models.Score.session_id == session_id).order_by(models.Score.score.desc()).all()
\ No newline at end of file
+    return db.query(models.Score).filter(models.Score.session_id == session_id).order_by(models.Score.score.desc()).all()
+
+def _bulk_add_points_stmt(session_id, entries):
+    stmt = pg_insert(models.Score).values([
+        {
+            "id": str(uuid.uuid4()),
+            "session_id": session_id,
+            "student_id": entry["student_id"],
+            "student_name": entry["student_name"],
+            "score": entry["points"],
+        }
+        for entry in entries
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="_session_student_uc",
+        set_={
+            "score": models.Score.score + stmt.excluded.score,
+            "student_name": stmt.excluded.student_name,
+        },
+    )
+    return stmt
+
+# --- Versi async untuk handler Socket.IO ---
+
+async def get_leaderboard_async(db: AsyncSession, session_id):
+    result = await db.execute(
+        select(models.Score).where(models.Score.session_id == session_id).order_by(models.Score.score.desc())
+    )
+    return result.scalars().all()
+
+async def bulk_add_points_async(db: AsyncSession, session_id, entries):
+    """
+    Menambahkan poin untuk banyak siswa sekaligus dalam satu statement upsert.
+    `entries` berisi dict dengan key student_id, student_name, dan points.
+    Baris yang sudah ada (berdasarkan _session_student_uc) skornya ditambah.
+    """
+    if not entries:
+        return
+    await db.execute(_bulk_add_points_stmt(session_id, entries))
+    await db.commit()
+
@@ -1,6 +1,9 @@
 import uuid
+from sqlalchemy import select, delete
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.session import Session as SessionModel
+from ..utils.session_cache import session_cache
 from datetime import datetime, timezone
 
 def create_session(db: Session, presentation_id: uuid.UUID):
@@ -8,15 +11,55 @@ def create_session(db: Session, presentation_id: uuid.UUID):
     db.add(db_session)
     db.commit()
     db.refresh(db_session)
+    # Buang hasil negatif yang mungkin tersimpan untuk kode ini
+    session_cache.invalidate(db_session.code)
     return db_session
 
 def get_session_by_code(db: Session, code: str):
     return db.query(SessionModel).filter(SessionModel.code == code).first()
 
+def resolve_session_code(db: Session, code: str):
+    """
+    Seperti get_session_by_code, tetapi lewat session_cache.
+    Mengembalikan SessionDisplay (bukan objek ORM) atau None.
+    """
+    cached = session_cache.get(code)
+    if cached is not session_cache.MISSING:
+        return cached
+    return session_cache.put(code, get_session_by_code(db, code))
+
 def end_session_by_code(db: Session, code: str):
     db_session = db.query(SessionModel).filter(SessionModel.code == code).first()
     if db_session and db_session.end_time is None:
         db_session.end_time = datetime.now(timezone.utc)
         db.commit()
         db.refresh(db_session)
-    return db_session
\ No newline at end of file
+    session_cache.invalidate(code)
+    return db_session
+
+# --- Versi async untuk handler Socket.IO ---
+
+async def get_session_by_code_async(db: AsyncSession, code: str):
+    result = await db.execute(select(SessionModel).where(SessionModel.code == code))
+    return result.scalars().first()
+
+async def resolve_session_code_async(db: AsyncSession, code: str):
+    # Saat cache hit, AsyncSession tidak pernah mengambil koneksi dari pool
+    cached = session_cache.get(code)
+    if cached is not session_cache.MISSING:
+        return cached
+    return session_cache.put(code, await get_session_by_code_async(db, code))
+
+async def end_session_by_code_async(db: AsyncSession, code: str):
+    db_session = await get_session_by_code_async(db, code)
+    if db_session and db_session.end_time is None:
+        db_session.end_time = datetime.now(timezone.utc)
+        await db.commit()
+    session_cache.invalidate(code)
+    return db_session
+
+async def delete_session_async(db: AsyncSession, session_id: uuid.UUID):
+    # Skor ikut terhapus lewat ON DELETE CASCADE di database,
+    # sehingga relasi tidak perlu dimuat seperti pada db.delete()
+    await db.execute(delete(SessionModel).where(SessionModel.id == session_id))
+    await db.commit()
@@ -2,15 +2,14 @@ import uuid
 from sqlalchemy.orm import Session
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
-from ..utils.security import get_password_hash
+from ..utils.auth_cache import auth_cache
 
 def get_user_by_email(db: Session, email: str):
     """Mencari user berdasarkan email."""
     return db.query(User).filter(User.email == email).first()
 
-def create_user(db: Session, user: UserCreate):
-    """Membuat user baru."""
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: str):
+    """Membuat user baru. Password di-hash oleh pemanggil (get_password_hash bersifat async)."""
     db_user = User(
         name=user.name,
         email=user.email,
@@ -22,22 +21,25 @@ def create_user(db: Session, user: UserCreate):
     db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user: User, data: UserUpdate):
-    """Mengupdate data user."""
+def update_user(db: Session, user: User, data: UserUpdate, password_hash: str | None = None):
+    """Mengupdate data user. password_hash adalah hasil get_password_hash(data.password)."""
     # Ubah data di objek user yang ada
     if data.name is not None:
         user.name = data.name
     
-    # Jika ada password baru, hash terlebih dahulu sebelum disimpan
-    if data.password is not None:
-        user.password_hash = get_password_hash(data.password)
+    # Password baru sudah di-hash oleh router sebelum disimpan
+    if password_hash is not None:
+        user.password_hash = password_hash
 
     db.commit()
     db.refresh(user)
+    # Token yang sudah di-cache harus membaca data user terbaru
+    auth_cache.invalidate_user(user.email)
     return user
 
 def delete_user(db: Session, user: User):
     """Menghapus user dari database."""
     db.delete(user)
     db.commit()
+    auth_cache.invalidate_user(user.email)
     return user
\ No newline at end of file
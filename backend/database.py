@@ -1,17 +1,58 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from .utils.db_metrics import db_metrics, instrumented_pool
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+def to_async_url(url: str) -> str:
+    """Mengubah URL Postgres sync (psycopg2) menjadi URL driver asyncpg."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+# URL untuk engine async; default diturunkan dari DATABASE_URL
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+# Pengaturan pool koneksi; berlaku untuk masing-masing engine (sync dan async) di setiap worker
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Koneksi yang lebih tua dari ini (detik) dibuka ulang; -1 untuk menonaktifkan
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+POOL_OPTIONS = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+# Pool mencatat waktu checkout koneksi (lihat utils/db_metrics.py)
+engine = create_engine(DATABASE_URL, poolclass=instrumented_pool(QueuePool, "sync"), **POOL_OPTIONS)
+db_metrics.instrument("sync", engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async untuk handler Socket.IO, agar query tidak memblokir event loop.
+# expire_on_commit=False supaya atribut objek tetap bisa dibaca setelah commit
+# tanpa lazy load (yang tidak diizinkan di AsyncSession).
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=instrumented_pool(AsyncAdaptedQueuePool, "async"), **POOL_OPTIONS)
+db_metrics.instrument("async", async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependency untuk mendapatkan db session di setiap request
@@ -20,4 +61,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -4,13 +4,26 @@ from fastapi.staticfiles import StaticFiles
 import socketio
 import random
 import asyncio
+import math
+from contextlib import asynccontextmanager
 
 # Import yang dibutuhkan untuk handler
-from .database import Base, engine, SessionLocal
-from .models.slide import Slide
-from .routers import auth, file_serving, user, presentation, session, file_serving
-from .crud import score as crud_score, session as crud_session, presentation as crud_presentation
-from .schemas.score import ScoreDisplay
+from .database import Base, engine, async_engine, AsyncSessionLocal
+from .routers import auth, file_serving, user, presentation, session, internal
+from .crud import session as crud_session
+from .utils.score_ledger import score_ledger
+from .utils.broadcaster import BroadcastScheduler
+from .utils.result_stream import ResultStream
+from .utils.live_state import live_state, create_client_manager
+from .utils.slide_cache import slide_cache
+from .utils.session_cache import session_cache
+from .utils.deck_cache import deck_cache
+from .utils.drawing_relay import drawing_relay
+from .utils.connection_registry import connection_registry, ROLE_TEACHER
+from .utils.bubble_quiz import bubble_quiz_aggregator, point_in_areas
+from .utils import frame_codec
+from .utils.pdf_ingest import pdf_ingestor
+from .utils.security import password_hasher
 
 # Membuat tabel di database jika belum ada
 Base.metadata.create_all(bind=engine)
@@ -19,20 +32,40 @@ Base.metadata.create_all(bind=engine)
 # APLIKASI UTAMA DAN KONFIGURASI
 # ====================================================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Timer untuk menulis skor yang tertunda ke database
+    score_ledger.start()
+    # Job konversi PDF melapor progres lewat event loop ini
+    pdf_ingestor.attach(sio)
+    yield
+    pdf_ingestor.shutdown()
+    password_hasher.shutdown()
+    # Pastikan semua skor yang tertunda tersimpan sebelum server mati
+    broadcaster.close()
+    await score_ledger.stop()
+    await async_engine.dispose()
+
 # 1. Aplikasi FastAPI. Ini akan menangani semua rute HTTP.
-app = FastAPI(title="EduSlide API")
+app = FastAPI(title="EduSlide API", lifespan=lifespan)
 
 # 2. Server Socket.IO.
 # Kita berikan izin CORS di sini KHUSUS untuk handshake awal WebSocket.
+# Dengan LIVE_STATE_BACKEND=redis, emit ke room diteruskan lintas worker lewat Redis.
 sio = socketio.AsyncServer(
     async_mode='asgi',
-    cors_allowed_origins=["http://localhost:5173"] 
+    cors_allowed_origins=["http://localhost:5173"],
+    client_manager=create_client_manager()
 )
 
 # 3. Aplikasi Gabungan. Ini adalah titik masuk utama yang akan dijalankan Uvicorn.
 # Ia akan secara cerdas mengarahkan lalu lintas ke 'sio' atau 'app' FastAPI.
 socket_app = socketio.ASGIApp(sio, other_asgi_app=app)
 
+# Broadcast update_* digabung per room agar burst jawaban tidak membanjiri klien.
+# Interval diatur lewat BROADCAST_TICK_MS dan BROADCAST_EVENT_INTERVALS_MS.
+broadcaster = BroadcastScheduler(sio, emit=lambda *args, **kwargs: emit_frame(*args, **kwargs))
+
 
 # 4. Middleware CORS untuk FastAPI.
 # Ini PENTING dan HARUS ADA untuk endpoint seperti /auth/login, /presentations, dll.
@@ -46,33 +79,184 @@ app.add_middleware(
 
 
 # ====================================================================
-# DATABASE SEMENTARA (IN-MEMORY) UNTUK SESI LIVE
+# STATE SESI LIVE
 # ====================================================================
-session_participants = {}
-poll_results = {}
-wordcloud_results = {}
-bubble_quiz_results = {}
+# State yang dibagi antar worker disimpan di LiveStateStore (memory/redis):
+#   connections, participants:{session_code}, teacher_sids -> lihat ConnectionRegistry
+#   teacher_away:{session_code}  -> penanda guru sedang terputus
+#   current_page:{session_code}  -> halaman yang sedang ditampilkan guru
+#   drawing_slide:{session_code} -> slide yang kanvas coretannya sedang ditampilkan
+#   strokes:{session_code}:...   -> log coretan per slide (lihat DrawingRelay)
+#   results*:{session_code}:...  -> hasil aktivitas (lihat ResultStream)
+# Room Socket.IO per sesi:
+#   {session_code}          -> guru dan semua siswa
+#   {session_code}_teacher  -> guru
+#   {session_code}_json/_bin -> encoding frame yang dipilih klien (lihat frame_room)
+# Timer disconnect guru berupa asyncio.Task sehingga tetap lokal per worker.
+result_streams = {}  # session_code -> {activity_type: ResultStream}
 teacher_disconnect_timers = {}  # session_code -> asyncio.Task
-teacher_sids = {}  # session_code -> teacher_sid
 
 GRACE_PERIOD_SECONDS = 180  # 3 minutes
 
+# Nama event broadcast untuk setiap jenis hasil aktivitas
+RESULT_EVENTS = {
+    'poll': 'update_poll_results',
+    'word_cloud': 'update_wordcloud_results',
+    'bubble_quiz': 'update_bubble_quiz_results',
+}
+
+def current_page_key(session_code):
+    return f"current_page:{session_code}"
+
+def drawing_slide_key(session_code):
+    return f"drawing_slide:{session_code}"
+
+def frame_room(session_code, binary):
+    return f"{session_code}_bin" if binary else f"{session_code}_json"
+
+async def enter_frame_room(sid, session_code, binary):
+    # Klien memilih frame biner dengan binary_frames: true saat join; klien lama tetap JSON
+    binary = bool(binary) and frame_codec.BINARY_FRAMES_ENABLED
+    await sio.leave_room(sid, frame_room(session_code, not binary))
+    await sio.enter_room(sid, frame_room(session_code, binary))
+    return binary
+
+async def emit_frame(event, payload, room=None, **kwargs):
+    # Event frekuensi tinggi ke room sesi dikodekan sekali per encoding, bukan per klien
+    if event not in frame_codec.ENCODERS or room is None:
+        await sio.emit(event, payload, room=room, **kwargs)
+        return
+    await sio.emit(event, payload, room=frame_room(room, False), **kwargs)
+    if frame_codec.BINARY_FRAMES_ENABLED:
+        await sio.emit(event, frame_codec.encode(event, payload), room=frame_room(room, True), **kwargs)
+
+async def get_participant(session_code, sid):
+    return await connection_registry.get_participant(session_code, sid)
+
+async def list_participants(session_code):
+    return await connection_registry.participants(session_code)
+
+async def handle_departure(entry):
+    # Dipanggil setelah sebuah sid dikeluarkan dari ConnectionRegistry
+    session_code = entry['session_code']
+    if entry['role'] == ROLE_TEACHER:
+        print(f"--- TEACHER DISCONNECTED from session {session_code} ---")
+        await live_state.set(f"teacher_away:{session_code}", 1)
+        if session_code not in teacher_disconnect_timers:
+            teacher_disconnect_timers[session_code] = asyncio.create_task(end_session_after_timeout(session_code))
+    else:
+        await emit_roster_change(session_code, 'participant_left', {'student_id': entry['student_id']})
+
+async def emit_roster_change(session_code, event, data):
+    # Guru hanya menerima perubahan roster; versi yang terlewat memicu request_participant_list
+    version = await connection_registry.bump_roster_version(session_code)
+    await sio.emit(event, {'version': version, **data}, room=f"{session_code}_teacher")
+
+async def leave_previous_session(sid, previous, session_code):
+    # sid yang berpindah sesi dikeluarkan dari room dan daftar peserta sesi lamanya
+    if previous is None or previous['session_code'] == session_code: return
+    old_code = previous['session_code']
+    for room in (old_code, f"{old_code}_teacher", frame_room(old_code, False), frame_room(old_code, True)):
+        await sio.leave_room(sid, room)
+    await handle_departure(previous)
+
+async def clear_live_session(session_code):
+    # Hapus semua state sesi dari store dan objek lokal worker ini
+    keys = [
+        f"teacher_away:{session_code}", current_page_key(session_code),
+        drawing_slide_key(session_code), slide_cache.versions_key(session_code),
+        bubble_quiz_aggregator.clicks_key(session_code),
+    ]
+    for activity in RESULT_EVENTS:
+        keys.extend(ResultStream.keys_for(session_code, activity))
+    await live_state.delete(*keys)
+    await connection_registry.clear_session(session_code)
+    await drawing_relay.clear_session(session_code)
+    result_streams.pop(session_code, None)
+
 async def end_session_after_timeout(session_code):
     await asyncio.sleep(GRACE_PERIOD_SECONDS)
-    # Check if teacher has reconnected
-    if session_code in teacher_disconnect_timers:
+    # Check if teacher has reconnected (di worker mana pun)
+    if session_code in teacher_disconnect_timers and await live_state.get(f"teacher_away:{session_code}"):
         # End and delete session in DB
-        db = SessionLocal()
-        try:
-            session_obj = crud_session.get_session_by_code(db, session_code)
+        async with AsyncSessionLocal() as db:
+            session_obj = await crud_session.get_session_by_code_async(db, session_code)
             if session_obj:
-                db.delete(session_obj)
-                db.commit()
+                # Skor ikut terhapus bersama sesi, jadi tidak perlu di-flush
+                await score_ledger.close_session(session_obj.id, persist=False)
+                await crud_session.delete_session_async(db, session_obj.id)
+                session_cache.invalidate(session_code)
                 print(f"Session {session_code} ended and deleted due to teacher not reconnecting.")
-        finally:
-            db.close()
-        # Clean up timer
-        del teacher_disconnect_timers[session_code]
+        broadcaster.cancel_room(session_code)
+        broadcaster.cancel_room(f"{session_code}_teacher")
+        await clear_live_session(session_code)
+    # Clean up timer
+    teacher_disconnect_timers.pop(session_code, None)
+
+async def award_points(sid, session_id, student_id, student_name, points):
+    # Poin diterapkan di ledger (memori), lalu siswa diberi tahu peringkatnya
+    await score_ledger.add_points(session_id, student_id, student_name, points)
+    await broadcaster.schedule('update_my_rank', sid, lambda: score_ledger.rank(session_id, student_id))
+
+def result_stream(session_code, activity):
+    streams = result_streams.setdefault(session_code, {})
+    if activity not in streams:
+        streams[activity] = ResultStream(live_state, session_code, activity)
+    return streams[activity]
+
+async def get_result_stream(session_code, activity, slide_id):
+    # Stream hanya valid untuk slide yang aktivitasnya sedang berjalan
+    stream = result_stream(session_code, activity)
+    if await stream.slide_id() != slide_id:
+        return None
+    return stream
+
+async def start_result_stream(session_code, activity, slide_id, initial=None):
+    # Aktivitas baru selalu diawali snapshot penuh dengan seq 0
+    stream = result_stream(session_code, activity)
+    await stream.start(slide_id, initial)
+    await sio.emit(RESULT_EVENTS[activity], await stream.snapshot(), room=session_code)
+    return stream
+
+async def take_result_delta(session_code, activity):
+    # Dipanggil broadcaster saat tick: hanya key yang berubah yang dikirim
+    stream = result_streams.get(session_code, {}).get(activity)
+    return await stream.take_delta() if stream is not None else None
+
+async def take_bubble_quiz_delta(session_code):
+    # Klik yang terkumpul sejak tick terakhir diagregasi sekaligus (poin sudah diberikan saat submit)
+    stream = result_streams.get(session_code, {}).get('bubble_quiz')
+    if stream is None: return None
+    slide = await slide_cache.get(session_code, await stream.slide_id())
+    if slide and slide['interactive_type'] == 'bubble_quiz':
+        await bubble_quiz_aggregator.flush(session_code, stream, slide)
+    return await stream.take_delta()
+
+async def schedule_results(session_code, activity):
+    await broadcaster.schedule(RESULT_EVENTS[activity], session_code, lambda: take_result_delta(session_code, activity))
+
+async def schedule_leaderboard(session_code, session_id):
+    await broadcaster.schedule('update_leaderboard', session_code, lambda: score_ledger.leaderboard(session_id))
+
+async def show_page(session_code, page_number, skip_sid=None):
+    # Hasil dan coretan yang masih tertunda milik slide sebelumnya dikirim dulu
+    await broadcaster.flush_room(session_code)
+    # Halaman dicatat agar siswa yang bergabung belakangan langsung melihat slide yang sama
+    await live_state.set(current_page_key(session_code), page_number)
+    # Klien menyembunyikan kanvas coretan saat slide berganti
+    await live_state.delete(drawing_slide_key(session_code))
+    await sio.emit('slide_changed', {'page_number': page_number}, room=session_code, skip_sid=skip_sid)
+    await send_prefetch_hint(session_code, page_number)
+
+async def send_prefetch_hint(session_code, page_number, to=None):
+    # Gambar beberapa slide berikutnya diunduh klien sebelum guru pindah slide,
+    # sehingga perpindahan tidak memicu unduhan serentak dari seluruh kelas
+    async with AsyncSessionLocal() as db:
+        session_obj = await crud_session.resolve_session_code_async(db, session_code)
+    if not session_obj: return
+    slides = await deck_cache.upcoming(session_obj.presentation_id, page_number)
+    if slides:
+        await sio.emit('prefetch_slides', {'page_number': page_number, 'slides': slides}, room=to or session_code)
 
 # ====================================================================
 # SEMUA EVENT HANDLER SOCKET.IO
@@ -87,25 +271,25 @@ async def teacher_join(sid, data):
     session_code = data.get('session_code')
     if not session_code: return
     
+    previous = await connection_registry.register_teacher(sid, session_code)
+    await leave_previous_session(sid, previous, session_code)
     await sio.enter_room(sid, session_code)
     await sio.enter_room(sid, f"{session_code}_teacher")
+    await enter_frame_room(sid, session_code, data.get('binary_frames'))
     
     print(f"--- TEACHER JOINED: {sid} to rooms '{session_code}' and '{session_code}_teacher' ---")
     
-    current_participants = list(session_participants.get(session_code, {}).values())
-    await sio.emit('update_participant_list', {'participants': current_participants}, to=sid)
+    # Roster lengkap hanya dikirim di sini dan atas permintaan; selebihnya participant_joined/left
+    await sio.emit('update_participant_list', await connection_registry.roster_snapshot(session_code), to=sid)
 
-    db = SessionLocal()
-    try:
-        session_obj = crud_session.get_session_by_code(db, session_code)
-        if session_obj:
-            leaderboard = crud_score.get_leaderboard(db, session_obj.id)
-            leaderboard_data = [ScoreDisplay.model_validate(s).model_dump() for s in leaderboard]
-            await sio.emit('update_leaderboard', leaderboard_data, to=sid)
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        session_obj = await crud_session.resolve_session_code_async(db, session_code)
+    if session_obj:
+        await score_ledger.ensure_loaded(session_obj.id)
+        await sio.emit('update_leaderboard', await score_ledger.leaderboard(session_obj.id), to=sid)
 
     # If there was a disconnect timer, cancel it
+    await live_state.delete(f"teacher_away:{session_code}")
     if session_code in teacher_disconnect_timers:
         teacher_disconnect_timers[session_code].cancel()
         del teacher_disconnect_timers[session_code]
@@ -121,67 +305,72 @@ async def join_session(sid, data):
         print("Join attempt failed: missing data")
         return
     
+    previous, roster_changed = await connection_registry.register_student(sid, session_code, name, student_id)
+    await leave_previous_session(sid, previous, session_code)
     await sio.enter_room(sid, session_code)
+    binary_frames = await enter_frame_room(sid, session_code, data.get('binary_frames'))
     print(f"--- STUDENT JOINED: {sid} ({name}, ID: {student_id}) to room {session_code} ---")
 
-    if session_code not in session_participants:
-        session_participants[session_code] = {}
-    
-    session_participants[session_code][sid] = {"name": name, "student_id": student_id}
-
-    updated_participants = list(session_participants[session_code].values())
-    await sio.emit('update_participant_list', {'participants': updated_participants}, room=f"{session_code}_teacher")
-    await sio.emit('join_success', {'message': f"Successfully joined room {session_code}"}, to=sid)
-
-    db = SessionLocal()
-    try:
-        session_obj = crud_session.get_session_by_code(db, session_code)
-        if session_obj:
-            leaderboard = crud_score.get_leaderboard(db, session_obj.id)
-            leaderboard_data = [ScoreDisplay.model_validate(s).model_dump() for s in leaderboard]
-            await sio.emit('update_leaderboard', leaderboard_data, to=sid)
-    finally:
-        db.close()
+    if roster_changed:
+        await emit_roster_change(session_code, 'participant_joined', {'participant': {'name': name, 'student_id': student_id}})
+    # page_number: slide yang sedang ditampilkan (0 jika presentasi belum dimulai)
+    # binary_frames: apakah broadcast frekuensi tinggi dikirim sebagai frame biner
+    current_page = await live_state.get(current_page_key(session_code)) or 0
+    await sio.emit('join_success', {
+        'message': f"Successfully joined room {session_code}",
+        'page_number': current_page,
+        'binary_frames': binary_frames,
+    }, to=sid)
+
+    async with AsyncSessionLocal() as db:
+        session_obj = await crud_session.resolve_session_code_async(db, session_code)
+    if session_obj:
+        await score_ledger.ensure_loaded(session_obj.id)
+        await sio.emit('update_leaderboard', await score_ledger.leaderboard(session_obj.id), to=sid)
+        # Siswa yang reconnect langsung tahu peringkatnya walau di luar top-K
+        my_rank = await score_ledger.rank(session_obj.id, student_id)
+        if my_rank:
+            await sio.emit('update_my_rank', my_rank, to=sid)
+
+    await send_prefetch_hint(session_code, current_page, to=sid)
+
+    # Kanvas coretan yang sedang tampil dikirim utuh dalam satu pesan
+    drawing_slide_id = await live_state.get(drawing_slide_key(session_code))
+    if drawing_slide_id:
+        strokes = await drawing_relay.strokes(session_code, drawing_slide_id)
+        await sio.emit('drawing_started', {'slide_id': drawing_slide_id, 'strokes': strokes}, to=sid)
+
+@sio.on('request_participant_list')
+async def request_participant_list(sid, data):
+    # Dasbor guru yang tertinggal (versi roster terlewat) meminta roster lengkap
+    session_code = data.get('session_code')
+    entry = await connection_registry.get(sid)
+    if not entry or entry['role'] != ROLE_TEACHER or entry['session_code'] != session_code: return
+    await sio.emit('update_participant_list', await connection_registry.roster_snapshot(session_code), to=sid)
 
 @sio.event
 async def disconnect(sid):
     print(f"--- DISCONNECTED: {sid} ---")
-    is_teacher = False
-    disconnected_session_code = None
-
-    for session_code, teacher_sid in list(teacher_sids.items()):
-        if sid == teacher_sid:
-            is_teacher = True
-            disconnected_session_code = session_code
-            del teacher_sids[session_code]
-            break
-
-    if is_teacher:
-        print(f"--- TEACHER DISCONNECTED from session {disconnected_session_code} ---")
-        if disconnected_session_code not in teacher_disconnect_timers:
-            teacher_disconnect_timers[disconnected_session_code] = asyncio.create_task(end_session_after_timeout(disconnected_session_code))
-    else:
-        for session_code, participants_dict in list(session_participants.items()):
-            if sid in participants_dict:
-                del session_participants[session_code][sid]
-                # PERBAIKAN: Kirim list of objects
-                updated_participants = list(participants_dict.values())
-                await sio.emit('update_participant_list', {'participants': updated_participants}, room=f"{session_code}_teacher")
-                print(f"--- CLEANUP: Removed {sid} from room {session_code} ---")
-                break
+    broadcaster.cancel_room(sid)
+    # Indeks balik sid -> sesi: tidak perlu menelusuri semua sesi
+    entry = await connection_registry.unregister(sid)
+    if entry is not None:
+        await handle_departure(entry)
+        print(f"--- CLEANUP: Removed {sid} from room {entry['session_code']} ---")
 
 @sio.on('start_presentation')
 async def start_presentation(sid, data):
     session_code = data.get('session_code')
     if not session_code: return
     print(f"--- START_PRESENTATION: Room {session_code} is starting. ---")
-    await sio.emit('slide_changed', {'page_number': 1}, room=session_code)
+    await show_page(session_code, 1)
 
 @sio.on('change_slide')
 async def change_slide(sid, data):
     session_code = data.get('session_code')
     page_number = data.get('page_number')
-    await sio.emit('slide_changed', {'page_number': page_number}, room=session_code, skip_sid=sid)
+    if not session_code or not isinstance(page_number, int): return
+    await show_page(session_code, page_number, skip_sid=sid)
 
 @sio.on('end_session')
 async def end_session(sid, data):
@@ -191,19 +380,23 @@ async def end_session(sid, data):
     print(f"--- END_SESSION: Room {session_code} is ending. ---")
     
     # Update database untuk mencatat waktu berakhir
-    db = SessionLocal()
-    try:
-        crud_session.end_session_by_code(db, session_code)
-    finally:
-        db.close()
+    async with AsyncSessionLocal() as db:
+        session_obj = await crud_session.end_session_by_code_async(db, session_code)
+
+    # Leaderboard dan hasil terakhir dikirim sebelum data sesi dibuang
+    await broadcaster.flush_room(session_code)
+    await broadcaster.flush_room(f"{session_code}_teacher")
+
+    # Tulis semua skor yang tertunda sebelum data sesi dibuang dari memori
+    if session_obj:
+        await score_ledger.close_session(session_obj.id)
 
+    broadcaster.cancel_room(session_code)
+    broadcaster.cancel_room(f"{session_code}_teacher")
     await sio.emit('session_ended', {'message': 'The teacher has ended the session.'}, room=session_code)
     
-    # Hapus semua data sesi dari memori
-    if session_code in session_participants: del session_participants[session_code]
-    if session_code in poll_results: del poll_results[session_code]
-    if session_code in wordcloud_results: del wordcloud_results[session_code]
-    if session_code in bubble_quiz_results: del bubble_quiz_results[session_code]
+    # Hapus semua data sesi dari store
+    await clear_live_session(session_code)
 
 # --- HANDLER UNTUK AKTIVITAS ---
 
@@ -212,14 +405,11 @@ async def start_quiz(sid, data):
     session_code = data.get('session_code')
     slide_id = str(data.get('slide_id'))
     if not session_code or not slide_id: return
-    db = SessionLocal()
-    try:
-        slide = db.query(Slide).filter(Slide.id == slide_id).first()
-        if slide and slide.interactive_type == 'quiz':
-            quiz_for_student = {"question": slide.settings.get('question'), "options": slide.settings.get('options')}
-            await sio.emit('quiz_started', quiz_for_student, room=session_code)
-    finally:
-        db.close()
+    # Konfigurasi selalu dibaca ulang saat aktivitas dimulai, lalu dipakai submit dari cache
+    slide = await slide_cache.refresh(session_code, slide_id)
+    if slide and slide['interactive_type'] == 'quiz':
+        quiz_for_student = {"question": slide['settings'].get('question'), "options": slide['settings'].get('options')}
+        await sio.emit('quiz_started', quiz_for_student, room=session_code)
 
 @sio.on('submit_quiz_answer')
 async def submit_quiz_answer(sid, data):
@@ -227,47 +417,41 @@ async def submit_quiz_answer(sid, data):
     slide_id = str(data.get('slide_id'))
     answer = data.get('answer')
     
-    participant = session_participants.get(session_code, {}).get(sid)
+    participant = await get_participant(session_code, sid)
     if not participant: return
     student_id = participant['student_id']
     student_name = participant['name']
 
     if not all([session_code, slide_id, answer]): return
 
-    db = SessionLocal()
-    try:
-        session = crud_session.get_session_by_code(db, session_code)
-        slide = db.query(Slide).filter(Slide.id == slide_id).first()
-        if not session or not slide or slide.interactive_type != 'quiz': return
-        
-        is_correct = (slide.settings.get('correct_answer') == answer)
-        await sio.emit('quiz_feedback', {'correct': is_correct}, to=sid)
+    slide = await slide_cache.get(session_code, slide_id)
+    if not slide or slide['interactive_type'] != 'quiz': return
+    async with AsyncSessionLocal() as db:
+        session = await crud_session.resolve_session_code_async(db, session_code)
+    if not session: return
+    
+    is_correct = (slide['settings'].get('correct_answer') == answer)
+    # quiz_feedback dikonfigurasi tanpa jeda di broadcaster
+    await broadcaster.schedule('quiz_feedback', sid, lambda: {'correct': is_correct})
 
-        if is_correct:
-            crud_score.add_points(db, session.id, student_id, student_name, 100)
-        
-        leaderboard = crud_score.get_leaderboard(db, session.id)
-        leaderboard_data = [ScoreDisplay.model_validate(s).model_dump() for s in leaderboard]
-        await sio.emit('update_leaderboard', leaderboard_data, room=session_code)
-    finally:
-        db.close()
+    if is_correct:
+        await award_points(sid, session.id, student_id, student_name, 100)
+    else:
+        await score_ledger.ensure_loaded(session.id)
+
+    await schedule_leaderboard(session_code, session.id)
     
 @sio.on('start_poll')
 async def start_poll(sid, data):
     session_code = data.get('session_code')
     slide_id = str(data.get('slide_id'))
     if not session_code or not slide_id: return
-    if session_code not in poll_results: poll_results[session_code] = {}
-    db = SessionLocal()
-    try:
-        slide = db.query(Slide).filter(Slide.id == slide_id).first()
-        if slide and slide.interactive_type == 'poll':
-            options = slide.settings.get('options', [])
-            poll_results[session_code][slide_id] = {opt: 0 for opt in options}
-            await sio.emit('poll_started', slide.settings, room=session_code)
-            await sio.emit('update_poll_results', poll_results[session_code][slide_id], room=session_code)
-    finally:
-        db.close()
+    # Konfigurasi selalu dibaca ulang saat aktivitas dimulai, lalu dipakai submit dari cache
+    slide = await slide_cache.refresh(session_code, slide_id)
+    if slide and slide['interactive_type'] == 'poll':
+        options = slide['settings'].get('options', [])
+        await sio.emit('poll_started', slide['settings'], room=session_code)
+        await start_result_stream(session_code, 'poll', slide_id, {opt: 0 for opt in options})
 
 @sio.on('submit_vote')
 async def submit_vote(sid, data):
@@ -275,43 +459,35 @@ async def submit_vote(sid, data):
     slide_id = str(data.get('slide_id'))
     option = data.get('option')
 
-    participant = session_participants.get(session_code, {}).get(sid)
+    participant = await get_participant(session_code, sid)
     if not participant: return
     student_id = participant['student_id']
     student_name = participant['name']
     
     if not all([session_code, slide_id, option]): return
 
-    if session_code in poll_results and slide_id in poll_results[session_code] and option in poll_results[session_code][slide_id]:
-        poll_results[session_code][slide_id][option] += 1
-        await sio.emit('update_poll_results', poll_results[session_code][slide_id], room=session_code)
+    stream = await get_result_stream(session_code, 'poll', slide_id)
+    if stream is not None and await stream.has(option):
+        await stream.increment(option)
+        await schedule_results(session_code, 'poll')
         
-        db = SessionLocal()
-        try:
-            session = crud_session.get_session_by_code(db, session_code)
-            if session:
-                crud_score.add_points(db, session.id, student_id, student_name, 10)
-                leaderboard = crud_score.get_leaderboard(db, session.id)
-                leaderboard_data = [ScoreDisplay.model_validate(s).model_dump() for s in leaderboard]
-                await sio.emit('update_leaderboard', leaderboard_data, room=session_code)
-        finally:
-            db.close()
+        async with AsyncSessionLocal() as db:
+            session = await crud_session.resolve_session_code_async(db, session_code)
+        if session:
+            await award_points(sid, session.id, student_id, student_name, 10)
+            await schedule_leaderboard(session_code, session.id)
 
 @sio.on('start_wordcloud')
 async def start_wordcloud(sid, data):
     session_code = data.get('session_code')
     slide_id = str(data.get('slide_id'))
     if not session_code or not slide_id: return
-    if session_code not in wordcloud_results: wordcloud_results[session_code] = {}
-    wordcloud_results[session_code][slide_id] = []
-    db = SessionLocal()
-    try:
-        slide = db.query(Slide).filter(Slide.id == slide_id).first()
-        if slide and slide.interactive_type == 'word_cloud':
-            await sio.emit('wordcloud_started', slide.settings, room=session_code)
-            await sio.emit('update_wordcloud_results', [], room=session_code)
-    finally:
-        db.close()
+    # Konfigurasi selalu dibaca ulang saat aktivitas dimulai, lalu dipakai submit dari cache
+    slide = await slide_cache.refresh(session_code, slide_id)
+    if slide and slide['interactive_type'] == 'word_cloud':
+        await sio.emit('wordcloud_started', slide['settings'], room=session_code)
+        # Word cloud disimpan sebagai frekuensi {kata: jumlah}, bukan list mentah
+        await start_result_stream(session_code, 'word_cloud', slide_id)
 
 @sio.on('submit_word')
 async def submit_word(sid, data):
@@ -319,42 +495,35 @@ async def submit_word(sid, data):
     slide_id = str(data.get('slide_id'))
     word = data.get('word', '').strip().lower()
 
-    participant = session_participants.get(session_code, {}).get(sid)
+    participant = await get_participant(session_code, sid)
     if not participant: return
     student_id = participant['student_id']
     student_name = participant['name']
 
     if not all([session_code, slide_id, word]): return
 
-    if session_code in wordcloud_results and slide_id in wordcloud_results[session_code]:
-        wordcloud_results[session_code][slide_id].append(word)
-        await sio.emit('update_wordcloud_results', wordcloud_results[session_code][slide_id], room=session_code)
+    stream = await get_result_stream(session_code, 'word_cloud', slide_id)
+    if stream is not None:
+        await stream.increment(word)
+        await schedule_results(session_code, 'word_cloud')
         
-        db = SessionLocal()
-        try:
-            session = crud_session.get_session_by_code(db, session_code)
-            if session:
-                crud_score.add_points(db, session.id, student_id, student_name, 15)
-                leaderboard = crud_score.get_leaderboard(db, session.id)
-                leaderboard_data = [ScoreDisplay.model_validate(s).model_dump() for s in leaderboard]
-                await sio.emit('update_leaderboard', leaderboard_data, room=session_code)
-        finally:
-            db.close()
+        async with AsyncSessionLocal() as db:
+            session = await crud_session.resolve_session_code_async(db, session_code)
+        if session:
+            await award_points(sid, session.id, student_id, student_name, 15)
+            await schedule_leaderboard(session_code, session.id)
 
 @sio.on('start_bubble_quiz')
 async def start_bubble_quiz(sid, data):
     session_code = data.get('session_code')
     slide_id = str(data.get('slide_id'))
     if not session_code or not slide_id: return
-    if session_code not in bubble_quiz_results: bubble_quiz_results[session_code] = {}
-    bubble_quiz_results[session_code][slide_id] = []
-    db = SessionLocal()
-    try:
-        slide = db.query(Slide).filter(Slide.id == slide_id).first()
-        if slide and slide.interactive_type == 'bubble_quiz':
-            await sio.emit('bubble_quiz_started', {"question": slide.settings.get('question')}, room=session_code)
-    finally:
-        db.close()
+    # Konfigurasi selalu dibaca ulang saat aktivitas dimulai, lalu dipakai submit dari cache
+    slide = await slide_cache.refresh(session_code, slide_id)
+    if slide and slide['interactive_type'] == 'bubble_quiz':
+        await sio.emit('bubble_quiz_started', {"question": slide['settings'].get('question')}, room=session_code)
+        await bubble_quiz_aggregator.reset(session_code)
+        await start_result_stream(session_code, 'bubble_quiz', slide_id, bubble_quiz_aggregator.initial_results())
 
 @sio.on('submit_bubble_click')
 async def submit_bubble_click(sid, data):
@@ -362,74 +531,134 @@ async def submit_bubble_click(sid, data):
     slide_id = str(data.get('slide_id'))
     point = data.get('point')
     
-    participant = session_participants.get(session_code, {}).get(sid)
+    participant = await get_participant(session_code, sid)
     if not participant: return
     student_id = participant['student_id']
     student_name = participant['name']
 
     if not all([session_code, slide_id, point]): return
 
-    db = SessionLocal()
     try:
-        slide = db.query(Slide).filter(Slide.id == slide_id).first()
-        if not slide or slide.interactive_type != 'bubble_quiz': return
-        
-        is_correct = False
-        for area in slide.settings.get('correct_areas', []):
-            distance = ((point['x'] - area['x'])**2 + (point['y'] - area['y'])**2)**0.5
-            if distance <= area['r']:
-                is_correct = True
-                break
-        
-        if session_code in bubble_quiz_results and slide_id in bubble_quiz_results[session_code]:
-            bubble_quiz_results[session_code][slide_id].append({"name": student_name, "x": point['x'], "y": point['y'], "is_correct": is_correct})
-        
-        if is_correct:
-            session = crud_session.get_session_by_code(db, session_code)
-            if session: crud_score.add_points(db, session.id, student_id, student_name, 75)
-        
-        all_clicks = bubble_quiz_results.get(session_code, {}).get(slide_id, [])
-        leaderboard = crud_score.get_leaderboard(db, session.id)
-        leaderboard_data = [ScoreDisplay.model_validate(s).model_dump() for s in leaderboard]
-        await sio.emit('update_bubble_quiz_results', {'clicks': all_clicks}, room=session_code)
-        await sio.emit('update_leaderboard', leaderboard_data, room=session_code)
-    finally:
-        db.close()
+        x, y = float(point['x']), float(point['y'])
+    except (KeyError, TypeError, ValueError):
+        return
 
+    slide = await slide_cache.get(session_code, slide_id)
+    if not slide or slide['interactive_type'] != 'bubble_quiz': return
+    if await get_result_stream(session_code, 'bubble_quiz', slide_id) is None: return
+
+    # Heatmap dan jumlah per area diproses per batch pada tick broadcaster
+    bubble_quiz_aggregator.add(session_code, {
+        "slide_id": slide_id, "student_id": student_id, "name": student_name, "x": x, "y": y,
+    })
+    await broadcaster.schedule(RESULT_EVENTS['bubble_quiz'], session_code, lambda: take_bubble_quiz_delta(session_code))
+
+    # Poin diberikan untuk setiap klik yang benar, tidak bergantung pada tick broadcaster
+    if point_in_areas(slide['correct_area_list'], x, y):
+        async with AsyncSessionLocal() as db:
+            session = await crud_session.resolve_session_code_async(db, session_code)
+        if session:
+            await award_points(sid, session.id, student_id, student_name, 75)
+            await schedule_leaderboard(session_code, session.id)
+
+@sio.on('request_bubble_area')
+async def request_bubble_area(sid, data):
+    # Daftar nama per area benar tidak ikut disiarkan; dikirim sebagai ack atas permintaan
+    session_code = data.get('session_code')
+    area = data.get('area')
+    if not session_code or not isinstance(area, int): return None
+    entry = await connection_registry.get(sid)
+    if not entry or entry['session_code'] != session_code: return None
+    return {'area': area, 'names': await bubble_quiz_aggregator.area_names(session_code, area)}
+
+
+@sio.on('request_results_snapshot')
+async def request_results_snapshot(sid, data):
+    # Klien yang tertinggal (seq terlewat) meminta state penuh aktivitas
+    session_code = data.get('session_code')
+    activity = data.get('activity')
+    if not session_code or activity not in RESULT_EVENTS: return
+    stream = result_stream(session_code, activity)
+    if await stream.slide_id() is not None:
+        await sio.emit(RESULT_EVENTS[activity], await stream.snapshot(), to=sid)
+
+@sio.on('watch_ingest_job')
+async def watch_ingest_job(sid, data):
+    # Guru berlangganan progres konversi PDF; status saat ini langsung dikirim
+    job_id = data.get('job_id')
+    if not job_id: return
+    await sio.enter_room(sid, f"ingest_{job_id}")
+    job = await pdf_ingestor.get_job(job_id)
+    if job:
+        await sio.emit('ingest_progress', pdf_ingestor.public_view(job), to=sid)
 
 @sio.on('pick_random_student')
 async def pick_random_student(sid, data):
     session_code = data.get('session_code')
-    if not session_code or session_code not in session_participants: return
-    participants_list = list(session_participants[session_code].values())
+    if not session_code: return
+    participants_list = await list_participants(session_code)
     if not participants_list: return
     winner = random.choice(participants_list)
     await sio.emit('student_picked', {'winner': winner, 'participants': participants_list}, room=session_code)
 
+# Coretan guru: drawing_event hanya menambah titik ke DrawingRelay; titik baru
+# dikirim ke siswa sebagai satu frame 'drawing_batch' per tick broadcaster.
+
 @sio.on('start_drawing')
 async def start_drawing(sid, data):
     session_code = data.get('session_code')
     slide_id = data.get('slide_id')
-    if not session_code: return
-    await sio.emit('drawing_started', {'lines': data.get('lines', []), 'slide_id': slide_id}, room=session_code, skip_sid=sid)
+    if not session_code or not slide_id: return
+    await live_state.set(drawing_slide_key(session_code), slide_id)
+    strokes = await drawing_relay.strokes(session_code, slide_id)
+    await sio.emit('drawing_started', {'slide_id': slide_id, 'strokes': strokes}, room=session_code, skip_sid=sid)
 
 @sio.on('hide_drawing')
 async def hide_drawing(sid, data):
     session_code = data.get('session_code')
     if not session_code: return
+    await live_state.delete(drawing_slide_key(session_code))
     await sio.emit('drawing_hidden', room=session_code, skip_sid=sid)
 
+def stroke_style(draw_data):
+    # Gaya dari klien ikut dikodekan ke frame biner (lihat frame_codec), jadi nilai
+    # yang tidak valid diganti default di sini, sebelum coretan masuk ke relay
+    tool = draw_data.get('tool')
+    color = draw_data.get('color')
+    try:
+        width = float(draw_data['strokeWidth'])
+    except (KeyError, TypeError, ValueError):
+        width = None
+    return {
+        'tool': tool if isinstance(tool, str) and len(tool) <= 16 else 'pen',
+        'color': color if isinstance(color, str) and len(color) <= 32 else None,
+        # Lebar relatif terhadap lebar kanvas
+        'strokeWidth': width if width is not None and math.isfinite(width) and 0 < width <= 1 else None,
+    }
+
 @sio.on('drawing_event')
 async def drawing_event(sid, data):
     session_code = data.get('session_code')
-    if not session_code: return
-    await sio.emit('update_drawing', data, room=session_code, skip_sid=sid)
+    draw_data = data.get('drawData') or {}
+    point = draw_data.get('point')
+    if not session_code or not point: return
+    # Sengaja tanpa await sebelum titik dicatat agar urutan event pointer terjaga
+    if draw_data.get('type') == 'start':
+        if not draw_data.get('slide_id'): return
+        drawing_relay.start_stroke(session_code, draw_data['slide_id'], stroke_style(draw_data), point)
+    elif draw_data.get('type') == 'draw':
+        drawing_relay.extend_stroke(session_code, point)
+    elif draw_data.get('type') == 'end':
+        drawing_relay.extend_stroke(session_code, point)
+        drawing_relay.end_stroke(session_code)
+    await broadcaster.schedule('drawing_batch', session_code, lambda: drawing_relay.take_batch(session_code), skip_sid=sid)
 
 @sio.on('clear_canvas')
 async def clear_canvas(sid, data):
     session_code = data.get('session_code')
     slide_id = data.get('slide_id')
     if not session_code or not slide_id: return
+    await drawing_relay.clear_slide(session_code, slide_id)
     await sio.emit('canvas_cleared', {'slide_id': slide_id}, room=session_code, skip_sid=sid)
 
 # ====================================================================
@@ -440,6 +669,7 @@ app.include_router(user.router)
 app.include_router(presentation.router)
 app.include_router(session.router)
 app.include_router(file_serving.router)
+app.include_router(internal.router)
 
 @app.get("/")
 def read_root():
@@ -1,7 +1,8 @@
 # File ini bisa kosong atau berisi import
 # Impor ini membantu Alembic (alat migrasi nanti) menemukan model secara otomatis
 from .user import User
-from .presentation import Presentation
+from .presentation import Presentation, PresentationSource
 from .slide import Slide
 from .session import Session
-from .score import Score
\ No newline at end of file
+from .score import Score
+from .blob import Blob
\ No newline at end of file
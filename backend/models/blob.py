@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+from ..database import Base
+
+class Blob(Base):
+    """File di uploads/blobs/ yang dinamai sesuai hash isinya (PDF sumber atau gambar slide)."""
+    __tablename__ = "blobs"
+
+    hash = Column(String(64), primary_key=True) # sha256 hex
+    path = Column(String, nullable=False) # relatif terhadap uploads/
+    # Jumlah Slide (untuk gambar) atau PresentationSource (untuk PDF) yang memakai blob ini
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, func, ForeignKey
+from sqlalchemy import Column, String, DateTime, func, ForeignKey, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..database import Base
@@ -15,4 +15,16 @@ class Presentation(Base):
 
     # Relasi ke User (pemilik) dan Slide
     owner = relationship("User")
-    slides = relationship("Slide", back_populates="presentation", cascade="all, delete-orphan", order_by="Slide.page_number")
\ No newline at end of file
+    slides = relationship("Slide", back_populates="presentation", cascade="all, delete-orphan", order_by="Slide.page_number")
+    source = relationship("PresentationSource", uselist=False, cascade="all, delete-orphan")
+
+class PresentationSource(Base):
+    """PDF terakhir yang diunggah untuk sebuah presentasi."""
+    __tablename__ = "presentation_sources"
+
+    presentation_id = Column(UUID(as_uuid=True), ForeignKey("presentations.id", ondelete="CASCADE"), primary_key=True)
+    pdf_hash = Column(String(64), nullable=False, index=True)
+    filename = Column(String)
+    # Hash gambar setiap halaman: [{"image": "<sha256>"}, ...]; None selama konversi belum selesai
+    pages = Column(JSON, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
@@ -1,47 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models.user import User
 from ..schemas.user import UserCreate, UserDisplay, LoginRequest
 from ..schemas.token import Token
-from ..utils.security import verify_password, get_password_hash, create_access_token, get_current_user
+from ..utils.security import verify_and_update_password, get_password_hash, create_access_token, get_current_user
+from ..crud import user as crud_user
 
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"]
 )
 
+# Endpoint auth bersifat async: bcrypt ditunggu lewat executor khusus tanpa
+# menahan thread pool, sedangkan query database dijalankan di thread pool.
 @router.post("/register", response_model=UserDisplay)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(crud_user.get_user_by_email, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # PAKSA ROLE MENJADI 'teacher' SAAT REGISTRASI
     user.role = 'teacher'
     
-    hashed_password = get_password_hash(user.password)
-    new_user = User(
-        name=user.name,
-        email=user.email,
-        password_hash=hashed_password,
-        role=user.role
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    hashed_password = await get_password_hash(user.password)
+    return await run_in_threadpool(crud_user.create_user, db, user, hashed_password)
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first() # Gunakan request.email
-    if not user or not verify_password(request.password, user.password_hash): # Gunakan request.password
+async def login_for_access_token(request: LoginRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(crud_user.get_user_by_email, db, request.email) # Gunakan request.email
+    verified, new_hash = await verify_and_update_password(request.password, user.password_hash) if user else (False, None) # Gunakan request.password
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # BCRYPT_ROUNDS berubah sejak password ini di-hash: simpan hash dengan cost baru
+    if new_hash:
+        user.password_hash = new_hash
+        await run_in_threadpool(db.commit)
     access_token = create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
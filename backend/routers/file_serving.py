@@ -1,10 +1,14 @@
 # backend/routers/file_serving.py
 
-from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from starlette.responses import FileResponse, Response as StarletteResponse
 from pathlib import Path
+from typing import Optional
 import os
-import logging
+import threading
+from ..utils.slide_variants import variant_path, variant_for_width, source_path_of_variant
+from ..utils.blob_store import BLOBS_DIR_NAME, file_digest
 
 router = APIRouter()
 
@@ -12,49 +16,166 @@ router = APIRouter()
 # Ini lebih andal daripada hanya menggunakan path relatif "uploads"
 BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent
 UPLOADS_DIR = BASE_DIR / "uploads"
+UPLOADS_ROOT = str(UPLOADS_DIR.resolve())
 
-logger = logging.getLogger("uvicorn.error")
+# File di uploads/blobs/ dinamai sesuai hash isinya sehingga isinya tidak pernah berubah
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# File lama (uploads/{presentation_id}/...) bisa ditimpa; browser wajib revalidasi dengan ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Jumlah hasil resolusi URL -> file yang disimpan di memori per worker
+UPLOADS_CACHE_MAX_ENTRIES = int(os.getenv("UPLOADS_CACHE_MAX_ENTRIES", "4096"))
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "http://localhost:5173",
+    "Access-Control-Allow-Credentials": "true",
+}
+
+# (file_path, turunan, format, terima webp) -> entri file; lihat resolve_upload
+_resolved = {}
+_resolved_lock = threading.Lock()
 
 @router.options("/uploads/{file_path:path}")
-async def options_uploaded_file(file_path: str, request: Request):
-    # Debug: print request method and headers
-    print("OPTIONS request for:", file_path)
-    print("Headers:", request.headers)
+async def options_uploaded_file(file_path: str):
     headers = {
-        "Access-Control-Allow-Origin": "http://localhost:5173",
-        "Access-Control-Allow-Credentials": "true",
+        **CORS_HEADERS,
         "Access-Control-Allow-Methods": "GET,OPTIONS",
-        "Access-Control-Allow-Headers": "Authorization,Content-Type,Range",
+        "Access-Control-Allow-Headers": "Authorization,Content-Type,Range,If-None-Match",
     }
     return StarletteResponse(status_code=204, headers=headers)
 
+def select_slide_file(file_path: str, w: Optional[int], format: Optional[str], accepts_webp: bool):
+    """
+    Memilih file yang benar-benar dikirim untuk sebuah permintaan gambar slide.
+
+    - `?w=400` dan/atau `?format=webp|png` pada URL PNG slide memilih turunan
+      WebP terkecil yang cukup lebar. Tanpa `format`, WebP dipakai jika header
+      Accept mendukungnya.
+    - URL turunan (slide_N.mobile.webp) dari slide yang diunggah sebelum ada
+      turunan jatuh kembali ke PNG aslinya.
+    Mengembalikan (path relatif, apakah respons bergantung pada header Accept).
+    """
+    if not UPLOADS_DIR.joinpath(file_path).is_file():
+        source = source_path_of_variant(file_path)
+        return (source, False) if source else (file_path, False)
+
+    if (w is None and format is None) or not file_path.endswith(".png"):
+        return file_path, False
+
+    negotiated = format is None
+    wants_webp = format == "webp" or (negotiated and accepts_webp)
+    if wants_webp:
+        candidate = variant_path(file_path, variant_for_width(w) if w else "full")
+        if UPLOADS_DIR.joinpath(candidate).is_file():
+            return candidate, negotiated
+    return file_path, negotiated
+
+def _build_entry(requested_path: str, w: Optional[int], format: Optional[str], accepts_webp: bool):
+    file_path, vary_accept = select_slide_file(requested_path, w, format, accepts_webp)
+    # Gabungkan direktori uploads dengan path file yang diminta
+    file_location = UPLOADS_DIR.joinpath(file_path).resolve()
+
+    # Keamanan: Pastikan path yang diminta benar-benar berada di dalam UPLOADS_DIR
+    # dan bukan file sementara (uploads/.staging, file .render-*)
+    if (
+        not file_location.is_file()
+        or not str(file_location).startswith(UPLOADS_ROOT)
+        or any(part.startswith(".") for part in Path(file_path).parts)
+    ):
+        return None
+
+    # URL turunan yang jatuh ke PNG tidak di-cache permanen: turunannya bisa dibuat kemudian
+    fallback = file_path != requested_path and w is None and format is None
+    if Path(file_path).parts[0] == BLOBS_DIR_NAME and not fallback:
+        # Nama file blob sudah berupa hash isi: '<sha256>.png' atau '<sha256>.mobile.webp'
+        etag = f'"{file_location.name.rsplit(".", 1)[0]}"'
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        etag = f'"{file_digest(file_location)}"'
+        cache_control = REVALIDATE_CACHE_CONTROL
+    headers = {"ETag": etag, "Cache-Control": cache_control, **CORS_HEADERS}
+    if vary_accept:
+        headers["Vary"] = "Accept"
+    return {"path": str(file_location), "stat": os.stat(file_location), "headers": headers}
+
+def upload_cache_key(file_path: str, w: Optional[int], format: Optional[str], accepts_webp: bool):
+    # Hanya ?w= tanpa ?format= yang bergantung pada header Accept
+    return (
+        file_path,
+        variant_for_width(w) if w else None,
+        format,
+        accepts_webp if (w is not None or format is not None) and format is None else None,
+    )
+
+def cached_upload(key):
+    """
+    Entri cache untuk key yang filenya masih sama (satu os.stat), atau None.
+    Cukup murah untuk dipanggil langsung di event loop.
+    """
+    entry = _resolved.get(key)
+    if entry is not None:
+        try:
+            stat = os.stat(entry["path"])
+            if stat.st_mtime_ns == entry["stat"].st_mtime_ns and stat.st_size == entry["stat"].st_size:
+                return entry
+        except OSError:
+            pass
+    return None
+
+def resolve_upload(file_path: str, w: Optional[int], format: Optional[str], accepts_webp: bool):
+    """
+    Hasil resolusi URL -> file (path absolut, stat, header cache) dengan cache per worker.
+
+    Permintaan berikutnya untuk URL yang sama hanya melakukan satu os.stat untuk
+    memastikan file masih sama; pemilihan turunan, resolve path, dan hash isi
+    (untuk file lama) tidak diulang kecuali ukuran atau mtime file berubah.
+    """
+    key = upload_cache_key(file_path, w, format, accepts_webp)
+    entry = cached_upload(key)
+    if entry is not None:
+        return entry
+
+    entry = _build_entry(file_path, w, format, accepts_webp)
+    with _resolved_lock:
+        if entry is None:
+            _resolved.pop(key, None)
+            return None
+        if key not in _resolved and len(_resolved) >= UPLOADS_CACHE_MAX_ENTRIES:
+            # Buang entri tertua (dict menyimpan urutan penyisipan)
+            del _resolved[next(iter(_resolved))]
+        _resolved[key] = entry
+    return entry
+
+def etag_matches(if_none_match: str, etag: str):
+    if if_none_match.strip() == "*":
+        return True
+    # Perbandingan lemah (RFC 9110): awalan W/ diabaikan
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
 @router.get("/uploads/{file_path:path}")
-async def serve_uploaded_file(file_path: str, request: Request):
+async def serve_uploaded_file(file_path: str, request: Request, w: Optional[int] = None, format: Optional[str] = None):
     """
     Endpoint ini secara aman menyajikan file dari direktori 'uploads'.
     Semua permintaan ke sini dijamin melewati CORSMiddleware.
+
+    Setiap respons membawa ETag (hash isi) dan Cache-Control: blob berbasis hash
+    di-cache permanen (immutable), file lama wajib direvalidasi. If-None-Match
+    yang cocok dijawab 304 tanpa isi; Range ditangani oleh FileResponse.
     """
+    accepts_webp = "image/webp" in request.headers.get("accept", "")
     try:
-        logger.info(f"GET request for: {file_path}")
-        logger.info(f"Headers: {request.headers}")
-        # Gabungkan direktori uploads dengan path file yang diminta
-        file_location = UPLOADS_DIR.joinpath(file_path).resolve()
-
-        # Keamanan: Pastikan path yang diminta benar-benar berada di dalam UPLOADS_DIR
-        if not file_location.is_file() or not str(file_location).startswith(str(UPLOADS_DIR.resolve())):
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        # Buat respons file seperti biasa
-        response = FileResponse(str(file_location))
-
-        # ==========================================================
-        # PERBAIKAN KUNCI: TAMBAHKAN HEADER SECARA MANUAL DI SINI
-        # ==========================================================
-        response.headers["Access-Control-Allow-Origin"] = "http://localhost:5173"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        # ==========================================================
-
-        return response
+        # Cache hit dijawab langsung di event loop. Hanya miss yang ke thread pool:
+        # di sana file lama di-hash penuh (file_digest), dan itu tidak boleh
+        # menahan event loop yang juga melayani Socket.IO
+        entry = cached_upload(upload_cache_key(file_path, w, format, accepts_webp))
+        if entry is None:
+            entry = await run_in_threadpool(resolve_upload, file_path, w, format, accepts_webp)
     except Exception as e:
         print(f"Error serving file: {e}")
-        raise HTTPException(status_code=404, detail="File not found")
\ No newline at end of file
+        entry = None
+    if entry is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, entry["headers"]["ETag"]):
+        return StarletteResponse(status_code=304, headers=entry["headers"])
+    return FileResponse(entry["path"], stat_result=entry["stat"], headers=entry["headers"])
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from ..models.user import User
+from ..utils.security import get_current_user
+from ..utils.db_metrics import db_metrics
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"]
+)
+
+# Endpoint metrik pool koneksi dan query lambat, hanya untuk admin
+@router.get("/db-metrics")
+def read_db_metrics(current_user: User = Depends(get_current_user)):
+    """
+    Status pool, histogram waktu checkout koneksi, dan query lambat terakhir.
+    Nilainya per worker yang menangani request ini.
+    """
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return db_metrics.snapshot()
@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 import uuid
 import shutil
 from pathlib import Path
-from pdf2image import convert_from_path
 import io
 import qrcode
 from starlette.responses import StreamingResponse
@@ -13,12 +12,14 @@ import os
 from ..database import get_db
 from ..models.user import User
 from ..models.slide import Slide
-from ..schemas.presentation import PresentationCreate, PresentationDisplay, PresentationWithSlides
+from ..schemas.presentation import PresentationCreate, PresentationDisplay, PresentationWithSlides, PresentationSummary, IngestJobDisplay
 from ..schemas.session import SessionDisplay
 from ..schemas.activity import QuizCreate, PollCreate, WordCloudCreate, BubbleQuizCreate
 from ..schemas.slide import SlideDisplay
 from ..crud import presentation as crud_presentation
 from ..crud import session as crud_session
+from ..utils.pdf_ingest import pdf_ingestor, IngestConflictError
+from ..utils import blob_store
 from ..utils.security import get_current_user
 
 
@@ -41,24 +42,38 @@ def create_new_presentation(
         raise HTTPException(status_code=403, detail="Only teachers can create presentations")
     return crud_presentation.create_presentation(db=db, presentation=presentation, owner_id=current_user.id)
 
-@router.get("/", response_model=List[PresentationWithSlides])
+@router.get("/", response_model=Union[List[PresentationSummary], List[PresentationWithSlides]])
 def get_user_presentations(
+    summary: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    return crud_presentation.get_presentations_by_owner(db=db, owner_id=current_user.id)
+    """
+    Daftar presentasi milik guru. Dengan `?summary=true` setiap presentasi
+    hanya berisi jumlah slide dan thumbnail slide pertama.
+    """
+    if summary:
+        presentations = crud_presentation.get_presentation_summaries_by_owner(db=db, owner_id=current_user.id)
+        return [PresentationSummary.model_validate(presentation) for presentation in presentations]
+    presentations = crud_presentation.get_presentations_by_owner(db=db, owner_id=current_user.id)
+    return [PresentationWithSlides.model_validate(presentation) for presentation in presentations]
 
 @router.get("/{presentation_id}", response_model=PresentationWithSlides)
 def get_single_presentation(
     presentation_id: uuid.UUID,
-    db: Session = Depends(get_db)
-    # HAPUS 'current_user' dari sini karena endpoint ini sekarang publik
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
 ):
-    # Panggil fungsi tanpa owner_id
-    presentation = crud_presentation.get_presentation_by_id(db=db, presentation_id=presentation_id)
+    """
+    Presentasi lengkap untuk pemiliknya, termasuk kunci jawaban di settings slide.
+    Siswa memakai GET /sessions/{code}/presentation yang kunci jawabannya dibuang.
+    """
+    presentation = crud_presentation.get_presentation_with_slides(
+        db=db, presentation_id=presentation_id, owner_id=current_user.id
+    )
     if not presentation:
         raise HTTPException(status_code=404, detail="Presentation not found")
-    return presentation
+    return PresentationWithSlides.model_validate(presentation)
 
 @router.put("/{presentation_id}", response_model=PresentationDisplay)
 def update_presentation(
@@ -102,13 +117,18 @@ def delete_slide_activity(
     updated_slide = crud_presentation.remove_slide_activity(db, slide)
     return updated_slide
 
-@router.post("/{presentation_id}/upload", response_model=PresentationWithSlides)
+@router.post("/{presentation_id}/upload", response_model=IngestJobDisplay, status_code=status.HTTP_202_ACCEPTED)
 def upload_pdf_and_create_slides(
     presentation_id: uuid.UUID,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Menyimpan PDF lalu langsung mengembalikan job konversi.
+    Slide dibuat bertahap di latar belakang; pantau lewat
+    GET /presentations/ingest-jobs/{job_id} atau event Socket.IO 'ingest_progress'.
+    """
     presentation = crud_presentation.get_presentation_by_id(db, presentation_id, owner_id=current_user.id)
     if not presentation:
         raise HTTPException(status_code=404, detail="Presentation not found or you are not the owner")
@@ -116,42 +136,26 @@ def upload_pdf_and_create_slides(
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF is allowed.")
         
-    # Buat path unik untuk menyimpan file
-    presentation_upload_dir = UPLOAD_DIRECTORY / str(presentation_id)
-    presentation_upload_dir.mkdir(exist_ok=True)
-    file_path = presentation_upload_dir / file.filename
-    
-    # Simpan file PDF yang diupload
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    # Konversi PDF ke gambar
+    # Simpan PDF ke folder staging unik sambil menghitung hash isinya;
+    # job memindahkannya ke uploads/blobs/ setelah slide pertama tersimpan
+    staging_dir = blob_store.STAGING_DIR / uuid.uuid4().hex
+    file_path, pdf_hash = blob_store.stage_stream(file.file, staging_dir, "source.pdf")
+
     try:
-        # Hapus slide lama jika ada
-        db.query(Slide).filter(Slide.presentation_id == presentation_id).delete()
-        
-        # Konversi PDF ke gambar
-        images = convert_from_path(file_path)
-        
-        for i, image in enumerate(images):
-            slide_image_path = presentation_upload_dir / f"slide_{i+1}.png"
-            image.save(slide_image_path, "PNG")
-            
-            # Store only the relative web path in content_url
-            new_slide = Slide(
-                presentation_id=presentation_id,
-                page_number=i+1,
-                content_url=f"uploads/{presentation_id}/slide_{i+1}.png"
-            )
-            db.add(new_slide)
-            
-        db.commit()
-        db.refresh(presentation)
-        return presentation
-    except Exception as e:
-        # Hapus file jika terjadi error
-        file_path.unlink(missing_ok=True)
-        raise HTTPException(status_code=500, detail=f"Failed to process PDF: {e}")
+        return pdf_ingestor.submit(presentation_id, current_user.id, file_path, pdf_hash, file.filename)
+    except IngestConflictError:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise HTTPException(status_code=409, detail="A PDF for this presentation is still being processed")
+
+@router.get("/ingest-jobs/{job_id}", response_model=IngestJobDisplay)
+async def get_ingest_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    job = await pdf_ingestor.get_job(job_id)
+    if not job or job["owner_id"] != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
     
 @router.post("/{presentation_id}/sessions", response_model=SessionDisplay)
 def create_new_session(
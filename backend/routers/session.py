@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..schemas.session import SessionDisplay
+from ..schemas.presentation import PresentationWithSlides
 from ..crud import session as crud_session
+from ..crud import presentation as crud_presentation
+from ..utils.presentation_cache import presentation_cache, StudentDeck
+from .file_serving import etag_matches
 
 router = APIRouter(
     prefix="/sessions",
@@ -12,7 +16,39 @@ router = APIRouter(
 
 @router.get("/{session_code}", response_model=SessionDisplay)
 def validate_session_code(session_code: str, db: Session = Depends(get_db)):
-    db_session = crud_session.get_session_by_code(db, code=session_code)
+    db_session = crud_session.resolve_session_code(db, code=session_code)
     if not db_session:
         raise HTTPException(status_code=404, detail="Session code not found or has expired.")
-    return db_session
\ No newline at end of file
+    return db_session
+
+@router.get("/{session_code}/presentation", response_model=PresentationWithSlides)
+def get_session_presentation(session_code: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Presentasi sesi untuk siswa, tanpa kunci jawaban (correct_answer, correct_areas).
+
+    JSON dan versi gzip-nya dibangun sekali per presentasi lalu dikirim langsung
+    dari memori ke setiap siswa yang bergabung. ETag memungkinkan siswa yang
+    reconnect mendapat 304 tanpa isi.
+    """
+    db_session = crud_session.resolve_session_code(db, code=session_code)
+    if not db_session:
+        raise HTTPException(status_code=404, detail="Session code not found or has expired.")
+
+    deck = presentation_cache.get(db_session.presentation_id)
+    if deck is None:
+        presentation = crud_presentation.get_presentation_with_slides(db, db_session.presentation_id)
+        if not presentation:
+            raise HTTPException(status_code=404, detail="Presentation not found")
+        deck = StudentDeck(PresentationWithSlides.model_validate(presentation).model_dump(mode="json"))
+        presentation_cache.put(db_session.presentation_id, deck)
+
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    # Setiap representasi punya ETag sendiri
+    etag = deck.etag[:-1] + '-gzip"' if use_gzip else deck.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if use_gzip:
+        return Response(content=deck.gzip_body, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=deck.body, media_type="application/json", headers=headers)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models.user import User
 from ..schemas.user import UserDisplay, UserUpdate, StatusResponse
-from ..utils.security import get_current_user
+from ..utils.security import get_current_user, get_password_hash
 from ..crud import user as crud_user
 
 router = APIRouter(
@@ -13,7 +14,7 @@ router = APIRouter(
 
 # Endpoint untuk mengupdate data user yang sedang login
 @router.put("/me", response_model=UserDisplay)
-def update_current_user(
+async def update_current_user(
     data: UserUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -21,7 +22,9 @@ def update_current_user(
     """
     Memperbarui nama atau password untuk user yang sedang login.
     """
-    updated_user = crud_user.update_user(db=db, user=current_user, data=data)
+    # Hash dijalankan di executor bcrypt; query database tetap di thread pool
+    password_hash = await get_password_hash(data.password) if data.password is not None else None
+    updated_user = await run_in_threadpool(crud_user.update_user, db, current_user, data, password_hash)
     return updated_user
 
 # Endpoint untuk menghapus user yang sedang login
@@ -1,7 +1,7 @@
 import uuid
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from .slide import SlideDisplay
 
 class PresentationBase(BaseModel):
@@ -20,4 +20,19 @@ class PresentationDisplay(PresentationBase):
 
 # Skema untuk menampilkan presentasi beserta semua slidenya
 class PresentationWithSlides(PresentationDisplay):
-    slides: List[SlideDisplay] = []
\ No newline at end of file
+    slides: List[SlideDisplay] = []
+
+# Skema ringan untuk daftar presentasi di dasbor (GET /presentations/?summary=true)
+class PresentationSummary(PresentationDisplay):
+    slide_count: int = 0
+    # Turunan 'thumb' dari gambar slide pertama
+    thumbnail_url: Optional[str] = None
+
+# Status job konversi PDF yang berjalan di latar belakang
+class IngestJobDisplay(BaseModel):
+    job_id: str
+    presentation_id: uuid.UUID
+    status: str  # queued | processing | done | failed
+    total_pages: Optional[int] = None
+    done_pages: int = 0
+    error: Optional[str] = None
@@ -1,6 +1,7 @@
 import uuid
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 from typing import Optional, Any
+from ..utils.slide_variants import SLIDE_VARIANTS, variant_path
 
 class SlideBase(BaseModel):
     page_number: int
@@ -15,5 +16,16 @@ class SlideDisplay(SlideBase):
     id: uuid.UUID
     presentation_id: uuid.UUID
 
+    # Turunan WebP per ukuran: {"thumb": {"url", "width"}, "mobile": ..., "full": ...}
+    @computed_field
+    @property
+    def variants(self) -> Optional[dict]:
+        if not self.content_url:
+            return None
+        return {
+            name: {"url": variant_path(self.content_url, name), "width": width}
+            for name, width in SLIDE_VARIANTS.items()
+        }
+
     class Config:
         from_attributes = True
\ No newline at end of file
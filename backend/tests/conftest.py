@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+# Konfigurasi dibaca saat modul backend diimpor, jadi harus diisi sebelum import apa pun
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="eduslide-test-"), "test.db")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_DB_PATH}",
+    ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{_DB_PATH}",
+    JWT_SECRET_KEY="test-secret",
+    JWT_ALGORITHM="HS256",
+    ACCESS_TOKEN_EXPIRE_MINUTES="30",
+)
+
+import pytest
+from sqlalchemy import event
+from backend.database import Base, engine, SessionLocal
+from backend.models.user import User
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def teacher(db):
+    user = User(name="Guru", email="guru@example.com", password_hash="x", role="teacher")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def query_counter():
+    """Menghitung statement SQL yang dijalankan engine selama `with query_counter:`."""
+
+    class QueryCounter:
+        def __init__(self):
+            self.count = 0
+
+        def _count(self, *args):
+            self.count += 1
+
+        def __enter__(self):
+            self.count = 0
+            event.listen(engine, "before_cursor_execute", self._count)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(engine, "before_cursor_execute", self._count)
+
+    return QueryCounter()
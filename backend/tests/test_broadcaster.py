@@ -0,0 +1,59 @@
+import asyncio
+from backend.utils.broadcaster import BroadcastScheduler
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    async def emit(self, event, payload, room=None, **kwargs):
+        self.sent.append((event, room, payload))
+
+
+def test_updates_are_coalesced_per_room_and_event():
+    async def run():
+        recorder = Recorder()
+        broadcaster = BroadcastScheduler(recorder, tick_ms=20, event_intervals_ms={})
+        for value in range(5):
+            await broadcaster.schedule("update_poll_results", "ROOM", lambda value=value: value)
+        await asyncio.sleep(0.05)
+        for value in range(5, 10):
+            await broadcaster.schedule("update_poll_results", "ROOM", lambda value=value: value)
+        await asyncio.sleep(0.05)
+        return recorder.sent
+
+    # Update beruntun digabung: hanya snapshot terakhir per tick yang dikirim
+    assert [payload for _, _, payload in asyncio.run(run())] == [4, 9]
+
+
+def test_cancel_room_drops_only_that_room():
+    async def run():
+        recorder = Recorder()
+        broadcaster = BroadcastScheduler(recorder, tick_ms=20, event_intervals_ms={})
+        for room in ("sid-1", "sid-2"):
+            await broadcaster.schedule("update_my_rank", room, lambda: "first")
+            await broadcaster.schedule("update_my_rank", room, lambda room=room: room)
+        broadcaster.cancel_room("sid-1")
+        assert "sid-1" not in broadcaster._timers
+        assert "sid-1" not in broadcaster._pending
+        assert "sid-1" not in broadcaster._last_emit
+        await asyncio.sleep(0.05)
+        broadcaster.cancel_room("sid-2")
+        assert not (broadcaster._timers or broadcaster._pending or broadcaster._last_emit)
+        return recorder.sent
+
+    assert asyncio.run(run()) == [("update_my_rank", "sid-2", "sid-2")]
+
+
+def test_flush_room_sends_pending_immediately():
+    async def run():
+        recorder = Recorder()
+        broadcaster = BroadcastScheduler(recorder, tick_ms=1000, event_intervals_ms={})
+        await broadcaster.schedule("update_leaderboard", "ROOM", lambda: "old")
+        await broadcaster.schedule("update_leaderboard", "ROOM", lambda: "new")
+        await broadcaster.flush_room("ROOM")
+        assert not broadcaster._timers
+        return recorder.sent
+
+    assert [payload for _, _, payload in asyncio.run(run())] == ["new"]
+
@@ -0,0 +1,27 @@
+import asyncio
+import math
+from backend.utils.drawing_relay import DRAWING_GRID, DrawingRelay, quantize
+from backend.utils.live_state import InMemoryStateStore
+
+
+def test_quantize_rejects_malformed_points():
+    for point in (None, "ab", "12", [0.5], [0.1, 0.2, 0.3], {"x": 0.1, "y": 0.2},
+                  [0.5, None], ["a", 0.5], [math.nan, 0.5], [0.5, math.inf]):
+        assert quantize(point) is None, point
+    assert quantize([0.5, "0.25"]) == (DRAWING_GRID // 2, DRAWING_GRID // 4)
+    # Di luar kanvas dijepit ke tepi
+    assert quantize((-1, 2)) == (0, DRAWING_GRID)
+
+
+def test_malformed_points_are_skipped():
+    relay = DrawingRelay(store=InMemoryStateStore())
+    relay.start_stroke("ABC123", "slide", {"tool": "pen"}, [math.nan, 0])
+    assert "ABC123" not in relay._active
+
+    relay.start_stroke("ABC123", "slide", {"tool": "pen"}, [0, 0])
+    for point in ([0.5], "xy", None, [0.25, 0.25]):
+        relay.extend_stroke("ABC123", point)
+    relay.end_stroke("ABC123")
+
+    strokes = asyncio.run(relay.take_batch("ABC123"))["ops"]
+    assert strokes[0]["points"] == [0, 0, DRAWING_GRID // 4, DRAWING_GRID // 4]
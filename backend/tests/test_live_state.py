@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from backend.utils.live_state import LiveStateStore, create_live_state_store
+
+# Kontrak yang sama harus berlaku untuk setiap backend yang bisa dipilih lewat LIVE_STATE_BACKEND
+BACKENDS = ["memory", "fakeredis"]
+
+
+@pytest.fixture(params=BACKENDS)
+def run(request):
+    """Menjalankan `scenario(store)` pada store baru dari backend yang diuji."""
+    if request.param == "fakeredis":
+        pytest.importorskip("fakeredis")
+
+    def runner(scenario):
+        async def main():
+            store = create_live_state_store(request.param)
+            if hasattr(store, "client"):
+                await store.client.flushall()
+            return await scenario(store)
+
+        return asyncio.run(main())
+
+    return runner
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        LiveStateStore()
+
+
+def test_key_value(run):
+    async def scenario(store):
+        assert await store.get("missing") is None
+        assert await store.set("page", {"n": 3})
+        assert await store.get("page") == {"n": 3}
+        assert not await store.set("page", 5, nx=True)
+        assert await store.get("page") == {"n": 3}
+        assert await store.incr("counter") == 1
+        assert await store.incr("counter", 4) == 5
+        await store.delete("page", "counter")
+        assert await store.get("page") is None
+
+    run(scenario)
+
+
+def test_hash(run):
+    async def scenario(store):
+        await store.hset("h", "a", {"x": 1})
+        await store.hset_many("h", {"b": "two", "c": [3]})
+        await store.hset_many("h", {})
+        assert await store.hget("h", "a") == {"x": 1}
+        assert await store.hmget("h", ["a", "missing", "c"]) == [{"x": 1}, None, [3]]
+        assert await store.hmget("h", []) == []
+        assert await store.hgetall("h") == {"a": {"x": 1}, "b": "two", "c": [3]}
+        assert await store.hexists("h", "b")
+        await store.hdel("h", "b", "missing")
+        assert not await store.hexists("h", "b")
+        assert await store.hincrby("h", "votes") == 1
+        assert await store.hincrby("h", "votes", 2) == 3
+        # Counter hincrby tetap terbaca sebagai int lewat hget/hgetall
+        assert await store.hget("h", "votes") == 3
+        await store.hdel("h", "a", "c", "votes")
+        assert await store.hgetall("h") == {}
+        assert await store.hgetall("never-written") == {}
+
+    run(scenario)
+
+
+def test_sorted_set(run):
+    async def scenario(store):
+        await store.zadd("z", {"ana": 10, "budi": 30})
+        assert await store.zincrby("z", "cici", 20) == 20
+        assert await store.zincrby("z", "ana", 25) == 35
+        assert await store.zrevrange("z", 0, -1) == [("ana", 35), ("budi", 30), ("cici", 20)]
+        assert await store.zrevrange("z", 0, 1) == [("ana", 35), ("budi", 30)]
+        assert await store.zrevrank("z", "cici") == 2
+        assert await store.zrevrank("z", "nobody") is None
+        assert await store.zscore("z", "budi") == 30
+        assert await store.zscore("z", "nobody") is None
+        assert await store.zcard("z") == 3
+        assert await store.zrevrange("empty", 0, -1) == []
+        assert await store.zcard("empty") == 0
+
+    run(scenario)
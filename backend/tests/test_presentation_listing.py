@@ -0,0 +1,133 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.database import get_db
+from backend.models.presentation import Presentation
+from backend.models.slide import Slide
+from backend.models.user import User
+from backend.routers import presentation as presentation_router, session as session_router
+from backend.crud import presentation as crud_presentation, session as crud_session
+from backend.schemas.presentation import PresentationWithSlides
+from backend.utils.presentation_cache import presentation_cache
+from backend.utils.session_cache import session_cache
+from backend.utils.security import get_current_user
+
+
+def add_presentations(db, owner, count, slides_per_presentation=3):
+    presentations = []
+    for index in range(count):
+        presentation = Presentation(title=f"Presentasi {index}", owner_id=owner.id)
+        db.add(presentation)
+        db.flush()
+        for page_number in range(1, slides_per_presentation + 1):
+            db.add(Slide(
+                presentation_id=presentation.id, page_number=page_number,
+                content_url=f"uploads/blobs/ab/{presentation.id.hex}{page_number}.png",
+            ))
+        presentations.append(presentation)
+    db.commit()
+    return presentations
+
+
+@pytest.fixture
+def client(db, teacher):
+    app = FastAPI()
+    app.include_router(presentation_router.router)
+    app.include_router(session_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: teacher
+    yield TestClient(app)
+    presentation_cache._entries.clear()
+    session_cache._entries.clear()
+
+
+def listing_queries(db, teacher, query_counter):
+    owner_id = teacher.id
+    db.expire_all()
+    with query_counter:
+        presentations = crud_presentation.get_presentations_by_owner(db, owner_id)
+        # Serialisasi seperti di router: menyentuh setiap slide
+        payload = [PresentationWithSlides.model_validate(presentation) for presentation in presentations]
+    return query_counter.count, payload
+
+
+def test_listing_query_count_does_not_grow_with_presentations(db, teacher, query_counter):
+    add_presentations(db, teacher, 2)
+    few_queries, payload = listing_queries(db, teacher, query_counter)
+    assert len(payload) == 2
+
+    add_presentations(db, teacher, 10)
+    many_queries, payload = listing_queries(db, teacher, query_counter)
+    assert len(payload) == 12
+    assert all(len(presentation.slides) == 3 for presentation in payload)
+
+    # Satu query presentasi + satu selectinload slide, berapa pun jumlah presentasinya
+    assert many_queries == few_queries <= 2
+
+
+def test_summary_is_a_single_query(db, teacher, query_counter):
+    add_presentations(db, teacher, 5, slides_per_presentation=4)
+    owner_id = teacher.id
+    db.expire_all()
+    with query_counter:
+        summaries = crud_presentation.get_presentation_summaries_by_owner(db, owner_id)
+    assert query_counter.count == 1
+    assert [summary["slide_count"] for summary in summaries] == [4] * 5
+    assert all(summary["thumbnail_url"].endswith("1.thumb.webp") for summary in summaries)
+
+
+def test_summary_endpoint(client, db, teacher):
+    add_presentations(db, teacher, 3)
+    response = client.get("/presentations/?summary=true")
+    assert response.status_code == 200
+    assert {item["slide_count"] for item in response.json()} == {3}
+    assert all("slides" not in item for item in response.json())
+
+
+def test_detail_is_owner_only(client, db, teacher):
+    presentation = add_presentations(db, teacher, 1)[0]
+    presentation.slides[0].settings = {"question": "q", "correct_answer": "a"}
+    db.commit()
+    url = f"/presentations/{presentation.id}"
+
+    # Pemilik mendapat kunci jawaban
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json()["slides"][0]["settings"]["correct_answer"] == "a"
+
+    # Tanpa token, atau dengan token sembarang, tidak ada yang dikirim
+    anonymous = TestClient(client.app)
+    anonymous.app.dependency_overrides.pop(get_current_user)
+    assert anonymous.get(url).status_code in (401, 403)
+    assert anonymous.get(url, headers={"Authorization": "Bearer junk"}).status_code == 401
+
+    # Guru lain tidak bisa membaca presentasi yang bukan miliknya
+    other = User(name="Guru lain", email="lain@example.com", password_hash="x", role="teacher")
+    db.add(other)
+    db.commit()
+    client.app.dependency_overrides[get_current_user] = lambda: other
+    assert client.get(url).status_code == 404
+
+
+def test_student_deck_is_stripped_and_served_from_cache(client, db, teacher, query_counter):
+    presentation = add_presentations(db, teacher, 1)[0]
+    presentation.slides[0].settings = {"question": "q", "correct_answer": "a", "correct_areas": [{"x": 0.5, "y": 0.5, "r": 0.1}]}
+    db.commit()
+    url = f"/sessions/{crud_session.create_session(db, presentation.id).code}/presentation"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.json()["slides"][0]["settings"] == {"question": "q"}
+
+    with query_counter:
+        second = client.get(url)
+    assert query_counter.count == 0
+    assert second.content == first.content
+
+
+def test_student_deck_is_invalidated_on_title_change(client, db, teacher):
+    presentation = add_presentations(db, teacher, 1)[0]
+    url = f"/sessions/{crud_session.create_session(db, presentation.id).code}/presentation"
+    client.get(url)
+    crud_presentation.update_presentation_title(db, presentation, "Judul baru")
+    assert client.get(url).json()["title"] == "Judul baru"
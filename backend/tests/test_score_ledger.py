@@ -0,0 +1,62 @@
+import asyncio
+from sqlalchemy.exc import IntegrityError, OperationalError
+from backend.utils.live_state import InMemoryStateStore
+from backend.utils.score_ledger import ScoreLedger
+
+
+class RecordingLedger(ScoreLedger):
+    """ScoreLedger yang menulis ke list; session_id di `failures` melempar exception-nya."""
+
+    def __init__(self, failures):
+        super().__init__(store=InMemoryStateStore())
+        self.failures = failures
+        self.written = {}
+
+    async def _load_from_db(self, session_id):
+        return []
+
+    async def _write_to_db(self, session_id, entries):
+        if session_id in self.failures:
+            raise self.failures[session_id]
+        self.written[session_id] = entries
+
+
+def add(ledger, session_id, points=10):
+    return ledger.add_points(session_id, "student-1", "Siswa", points)
+
+
+def test_integrity_error_drops_delta_and_other_sessions_still_flush():
+    async def run():
+        ledger = RecordingLedger({"deleted": IntegrityError("INSERT", {}, Exception("fk"))})
+        await add(ledger, "deleted")
+        await add(ledger, "alive")
+        await ledger.flush()
+        return ledger
+
+    ledger = asyncio.run(run())
+    assert ledger.written["alive"][0]["points"] == 10
+    # Tidak dicoba lagi selamanya
+    assert "deleted" not in ledger._pending
+
+
+def test_transient_error_requeues_delta():
+    async def run():
+        ledger = RecordingLedger({"flaky": OperationalError("INSERT", {}, Exception("timeout"))})
+        await add(ledger, "flaky", 10)
+        await ledger.flush()
+        await add(ledger, "flaky", 5)
+        del ledger.failures["flaky"]
+        await ledger.flush()
+        return ledger
+
+    ledger = asyncio.run(run())
+    assert ledger.written["flaky"][0]["points"] == 15
+
+
+def test_stop_does_not_raise():
+    async def run():
+        ledger = RecordingLedger({"broken": RuntimeError("boom")})
+        await add(ledger, "broken")
+        await ledger.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+# Batas umur entri meski token masih berlaku, agar perubahan user di worker lain ikut terbaca
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+
+# Kolom User yang disimpan; password_hash sengaja tidak ikut dan dimuat dari database bila dibutuhkan
+USER_SNAPSHOT_FIELDS = ("id", "name", "email", "role", "created_at")
+
+
+def token_key(token: str):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AuthCache:
+    """
+    LRU token JWT yang sudah diverifikasi -> snapshot user.
+
+    get_current_user memakai cache ini agar request berikutnya dengan token
+    yang sama tidak perlu decode JWT maupun query tabel users. Key berupa hash
+    token (token asli tidak disimpan). Entri berakhir saat token kedaluwarsa
+    (`exp`) atau setelah AUTH_CACHE_TTL_SECONDS, mana yang lebih dulu, dan
+    dibuang saat user diubah atau dihapus (lihat crud.user).
+
+    Lokal per worker dan dipakai dari thread pool FastAPI, jadi semua akses
+    dilindungi lock.
+    """
+
+    def __init__(self, max_entries: int = AUTH_CACHE_MAX_ENTRIES, ttl: float = AUTH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # hash token -> (berlaku sampai (epoch), snapshot user)
+        self._entries = OrderedDict()
+        # email -> {hash token} untuk invalidasi per user
+        self._by_email = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        key = token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, token: str, expires_at: float, user):
+        snapshot = {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+        key = token_key(token)
+        with self._lock:
+            self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self._entries[key] = (min(expires_at, time.time() + self.ttl), snapshot)
+            self._by_email.setdefault(snapshot["email"], set()).add(key)
+        return snapshot
+
+    def invalidate_user(self, email: str):
+        with self._lock:
+            for key in list(self._by_email.get(email, ())):
+                self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_email.get(entry[1]["email"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_email[entry[1]["email"]]
+
+
+auth_cache = AuthCache()
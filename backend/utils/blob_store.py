@@ -0,0 +1,118 @@
+# Penyimpanan berbasis hash isi (content-addressed) untuk PDF dan gambar slide.
+# Modul ini juga diimpor proses render, jadi hanya memakai pustaka standar.
+import os
+import shutil
+import hashlib
+from pathlib import Path
+from .slide_variants import SLIDE_VARIANTS, variant_path
+
+BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent
+UPLOADS_DIR = BASE_DIR / "uploads"
+BLOBS_DIR_NAME = "blobs"
+# File upload dan hasil render ditampung di sini sebelum dipindah ke blobs/
+STAGING_DIR = UPLOADS_DIR / ".staging"
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_relpath(digest: str, ext: str) -> str:
+    """Path relatif terhadap uploads/: 'blobs/ab/abcdef....png'."""
+    return f"{BLOBS_DIR_NAME}/{digest[:2]}/{digest}.{ext}"
+
+
+def blob_url(digest: str, ext: str) -> str:
+    return f"uploads/{blob_relpath(digest, ext)}"
+
+
+def blob_file(digest: str, ext: str) -> Path:
+    return UPLOADS_DIR / blob_relpath(digest, ext)
+
+
+def digest_of_url(url: str):
+    """Hash blob dari content_url slide; None untuk slide lama (uploads/{presentation_id}/...)."""
+    prefix = f"uploads/{BLOBS_DIR_NAME}/"
+    if not url or not url.startswith(prefix):
+        return None
+    digest, _ = os.path.splitext(os.path.basename(url))
+    return digest
+
+
+def file_digest(path) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def stage_stream(source, staging_dir: Path, filename: str):
+    """Menyalin stream upload ke staging sambil menghitung hash-nya. Mengembalikan (path, digest)."""
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    target = staging_dir / filename
+    sha = hashlib.sha256()
+    with target.open("wb") as buffer:
+        for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+            sha.update(chunk)
+            buffer.write(chunk)
+    return target, sha.hexdigest()
+
+
+def staged_image(staging_dir, digest: str) -> Path:
+    return Path(staging_dir) / f"{digest}.png"
+
+
+def place_blob(staged_path: Path, digest: str, ext: str, keep_staged: bool = False) -> Path:
+    """
+    Memindahkan file staging ke lokasi blob; jika blob sudah ada, salinan staging dibuang.
+    keep_staged=True membuat hard link sehingga file staging masih bisa dibaca (mis. PDF yang sedang dirender).
+    """
+    target = blob_file(digest, ext)
+    if target.is_file():
+        if not keep_staged:
+            Path(staged_path).unlink(missing_ok=True)
+        return target
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if not keep_staged:
+        os.replace(staged_path, target)
+        return target
+    tmp_target = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        os.link(staged_path, tmp_target)
+    except OSError:
+        shutil.copyfile(staged_path, tmp_target)
+    os.replace(tmp_target, target)
+    return target
+
+
+def place_image(staging_dir, digest: str) -> bool:
+    """
+    Memindahkan PNG hasil render beserta turunan WebP-nya ke blobs/.
+    Mengembalikan False jika turunan belum ada dan harus dibuat oleh pemanggil.
+    """
+    staged = staged_image(staging_dir, digest)
+    target = blob_file(digest, "png")
+    target_exists = target.is_file()
+    for variant in SLIDE_VARIANTS:
+        staged_variant = Path(variant_path(str(staged), variant))
+        if staged_variant.is_file():
+            if target_exists:
+                staged_variant.unlink()
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged_variant, variant_path(str(target), variant))
+    place_blob(staged, digest, "png")
+    return all(os.path.isfile(variant_path(str(target), variant)) for variant in SLIDE_VARIANTS)
+
+
+def remove_blob(relpath: str):
+    """Menghapus file blob beserta turunan WebP-nya (untuk gambar)."""
+    path = UPLOADS_DIR / relpath
+    if path.suffix == ".png":
+        for variant in SLIDE_VARIANTS:
+            Path(variant_path(str(path), variant)).unlink(missing_ok=True)
+    path.unlink(missing_ok=True)
+
+
+def remove_legacy_dir(presentation_id):
+    """Folder uploads/{presentation_id}/ dari sebelum penyimpanan berbasis hash."""
+    shutil.rmtree(UPLOADS_DIR / str(presentation_id), ignore_errors=True)
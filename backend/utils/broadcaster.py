@@ -0,0 +1,147 @@
+import os
+import asyncio
+import inspect
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Jeda minimum (ms) antar broadcast untuk event yang sama di room yang sama
+BROADCAST_TICK_MS = int(os.getenv("BROADCAST_TICK_MS", "150"))
+
+
+def parse_event_intervals(raw: str):
+    """
+    Mengubah string "quiz_feedback=0,update_leaderboard=250" menjadi dict {event: ms}.
+    Entri yang tidak valid dilewati dengan peringatan agar server tetap bisa start.
+    """
+    intervals = {}
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        event, _, ms = item.partition("=")
+        try:
+            value = int(ms)
+        except ValueError:
+            value = -1
+        if not event.strip() or value < 0:
+            logger.warning("BROADCAST_EVENT_INTERVALS_MS: entri %r dilewati, format yang benar event=ms (bilangan bulat >= 0)", item.strip())
+            continue
+        intervals[event.strip()] = value
+    return intervals
+
+
+# Event yang butuh latensi rendah dikirim langsung (interval 0)
+BROADCAST_EVENT_INTERVALS_MS = {
+    "quiz_feedback": 0,
+    # Coretan guru dikirim per 50 ms agar tetap terlihat mulus
+    "drawing_batch": 50,
+    **parse_event_intervals(os.getenv("BROADCAST_EVENT_INTERVALS_MS", "")),
+}
+
+
+class BroadcastScheduler:
+    """
+    Penjadwal broadcast Socket.IO yang menggabungkan (coalesce) update beruntun.
+
+    Handler cukup menandai bahwa state sebuah room berubah dengan memberikan
+    `producer`, yaitu fungsi yang membangun snapshot terbaru. Untuk setiap
+    pasangan (room, event) paling banyak satu snapshot dikirim per tick;
+    snapshot dibangun tepat saat dikirim sehingga selalu memuat state terakhir.
+
+    `emit` (opsional) menggantikan sio.emit untuk pengiriman snapshot, misalnya
+    agar satu snapshot dikirim dalam beberapa encoding.
+    """
+
+    def __init__(self, sio, tick_ms: int = BROADCAST_TICK_MS, event_intervals_ms: dict | None = None, emit=None):
+        self.sio = sio
+        self.emit = emit or sio.emit
+        self.tick = tick_ms / 1000
+        intervals = BROADCAST_EVENT_INTERVALS_MS if event_intervals_ms is None else event_intervals_ms
+        self.event_intervals = {event: ms / 1000 for event, ms in intervals.items()}
+        # State diindeks per room agar cancel_room cukup satu pop, bukan scan
+        # semua key (room sid dipakai untuk update_my_rank setiap siswa)
+        # room -> {event: (producer, emit_kwargs)}
+        self._pending = {}
+        # room -> {event: asyncio.Task yang menunggu giliran kirim}
+        self._timers = {}
+        # room -> {event: waktu loop saat terakhir dikirim}
+        self._last_emit = {}
+
+    async def schedule(self, event: str, room: str, producer, **emit_kwargs):
+        """Menjadwalkan broadcast `event` ke `room`. `producer` boleh sync atau async."""
+        interval = self.event_intervals.get(event, self.tick)
+        if interval <= 0:
+            await self._emit(event, room, producer, emit_kwargs)
+            return
+
+        self._pending.setdefault(room, {})[event] = (producer, emit_kwargs)
+        timers = self._timers.setdefault(room, {})
+        if event in timers:
+            return
+
+        # Update pertama setelah jeda panjang langsung dikirim;
+        # update berikutnya menunggu sampai interval terpenuhi.
+        loop = asyncio.get_running_loop()
+        last = self._last_emit.get(room, {}).get(event)
+        delay = 0 if last is None else max(0, last + interval - loop.time())
+        timers[event] = asyncio.create_task(self._emit_later(room, event, delay))
+
+    @staticmethod
+    def _pop(index: dict, room: str, event: str):
+        # Room tanpa entri tersisa dibuang agar dict luar tidak tumbuh terus
+        entries = index.get(room)
+        if entries is None:
+            return None
+        value = entries.pop(event, None)
+        if not entries:
+            del index[room]
+        return value
+
+    async def _emit_later(self, room: str, event: str, delay: float):
+        await asyncio.sleep(delay)
+        self._pop(self._timers, room, event)
+        pending = self._pop(self._pending, room, event)
+        if pending is None:
+            return
+        producer, emit_kwargs = pending
+        self._last_emit.setdefault(room, {})[event] = asyncio.get_running_loop().time()
+        try:
+            await self._emit(event, room, producer, emit_kwargs)
+        except Exception as e:
+            print(f"Error broadcasting {event} to {room}: {e}")
+
+    async def _emit(self, event, room, producer, emit_kwargs):
+        payload = producer()
+        if inspect.isawaitable(payload):
+            payload = await payload
+        if payload is None:
+            return
+        await self.emit(event, payload, room=room, **emit_kwargs)
+
+    async def flush_room(self, room: str):
+        """
+        Mengirim semua update tertunda milik room sekarang juga, misalnya
+        sebelum slide berganti atau sesi berakhir.
+        """
+        for task in self._timers.pop(room, {}).values():
+            task.cancel()
+        for event, (producer, emit_kwargs) in self._pending.pop(room, {}).items():
+            self._last_emit.setdefault(room, {})[event] = asyncio.get_running_loop().time()
+            try:
+                await self._emit(event, room, producer, emit_kwargs)
+            except Exception as e:
+                print(f"Error broadcasting {event} to {room}: {e}")
+
+    def cancel_room(self, room: str):
+        """Membatalkan semua update tertunda milik room (misalnya saat sesi berakhir atau sid putus)."""
+        for task in self._timers.pop(room, {}).values():
+            task.cancel()
+        self._pending.pop(room, None)
+        self._last_emit.pop(room, None)
+
+    def close(self):
+        for timers in self._timers.values():
+            for task in timers.values():
+                task.cancel()
+        self._timers.clear()
+        self._pending.clear()
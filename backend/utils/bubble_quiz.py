@@ -0,0 +1,119 @@
+import os
+import time
+import numpy as np
+from .live_state import live_state
+
+# Jumlah sel heatmap per sisi; payload hasil bubble quiz paling banyak GRID x GRID sel
+BUBBLE_HEATMAP_GRID = int(os.getenv("BUBBLE_HEATMAP_GRID", "32"))
+
+
+def area_tuples(settings: dict):
+    """correct_areas dari settings slide -> list (x, y, r kuadrat)."""
+    return [
+        (float(area["x"]), float(area["y"]), float(area["r"]) ** 2)
+        for area in settings.get("correct_areas", [])
+        if all(key in area for key in ("x", "y", "r"))
+    ]
+
+
+def compile_areas(areas):
+    """Hasil area_tuples -> array (A, 3) untuk hit-testing per batch."""
+    return np.array(areas, dtype=np.float64).reshape(-1, 3)
+
+
+def hit_test(areas, points):
+    """Matriks boolean (N, A): klik ke-i berada di dalam area ke-j."""
+    dx = points[:, 0, None] - areas[None, :, 0]
+    dy = points[:, 1, None] - areas[None, :, 1]
+    return dx * dx + dy * dy <= areas[None, :, 2]
+
+
+def point_in_areas(areas, x: float, y: float):
+    """
+    Apakah satu klik berada di dalam salah satu area (list dari area_tuples).
+    Python biasa: untuk satu titik, menyiapkan array NumPy lebih mahal dari hitungannya.
+    """
+    return any((x - ax) * (x - ax) + (y - ay) * (y - ay) <= r2 for ax, ay, r2 in areas)
+
+
+def heatmap_cells(points, grid: int = BUBBLE_HEATMAP_GRID):
+    """Indeks sel heatmap (baris * grid + kolom) untuk setiap klik."""
+    cells = np.clip(np.floor(points * grid).astype(np.int64), 0, grid - 1)
+    return cells[:, 1] * grid + cells[:, 0]
+
+
+class BubbleQuizAggregator:
+    """
+    Klik bubble quiz diagregasi per tick broadcaster, bukan per klik.
+
+    submit_bubble_click memberi poin untuk klik yang benar (point_in_areas) lalu
+    menambah klik ke buffer lokal; flush() dipanggil saat tick
+    'update_bubble_quiz_results' dan menguji semua klik sekaligus terhadap
+    area benar yang sudah dikompilasi (lihat SlideActivityCache).
+    Hasil yang disiarkan lewat ResultStream berukuran tetap:
+      "grid"     -> ukuran heatmap
+      "cell:{i}" -> jumlah klik di sel heatmap i
+      "area:{j}" -> jumlah klik di dalam area benar j
+    Setiap klik dihitung, termasuk klik berulang dari siswa yang sama. Klik
+    beserta nama siswanya (untuk daftar nama per area) disimpan di
+    bubble_clicks:{session_code} dan hanya dikirim atas permintaan.
+    """
+
+    def __init__(self, store=live_state):
+        self.store = store
+        # session_code -> [klik, ...] yang belum diproses
+        self._pending = {}
+
+    @staticmethod
+    def clicks_key(session_code: str):
+        return f"bubble_clicks:{session_code}"
+
+    def initial_results(self):
+        return {"grid": BUBBLE_HEATMAP_GRID}
+
+    async def reset(self, session_code: str):
+        self._pending.pop(session_code, None)
+        await self.store.delete(self.clicks_key(session_code))
+
+    def add(self, session_code: str, click: dict):
+        """click: {"slide_id", "student_id", "name", "x", "y"}."""
+        # Waktu klik menjadi bagian key penyimpanan agar daftar nama tetap urut klik
+        self._pending.setdefault(session_code, []).append({**click, "at": time.time_ns()})
+
+    async def flush(self, session_code: str, stream, slide: dict):
+        """Mengagregasi klik tertunda untuk slide yang sedang berjalan di stream."""
+        pending = self._pending.pop(session_code, [])
+        clicks = [click for click in pending if click["slide_id"] == slide["slide_id"]]
+        if not clicks:
+            return
+
+        points = np.array([(click["x"], click["y"]) for click in clicks], dtype=np.float64)
+        inside = hit_test(slide["correct_areas"], points)
+
+        cells, counts = np.unique(heatmap_cells(points), return_counts=True)
+        for cell, count in zip(cells.tolist(), counts.tolist()):
+            await stream.increment(f"cell:{cell}", count)
+        for area, count in enumerate(inside.sum(axis=0).tolist()):
+            if count:
+                await stream.increment(f"area:{area}", count)
+
+        records = {
+            f"{click['at']}:{click['student_id']}": {
+                "name": click["name"], "x": click["x"], "y": click["y"],
+                "areas": np.flatnonzero(row).tolist(),
+            }
+            for click, row in zip(clicks, inside)
+        }
+        await self.store.hset_many(self.clicks_key(session_code), records)
+
+    async def area_names(self, session_code: str, area: int):
+        """Nama siswa per klik di dalam area benar ke-`area`, urut waktu klik."""
+        records = await self.store.hgetall(self.clicks_key(session_code))
+        return [
+            records[key]["name"]
+            for key in sorted(records, key=lambda key: int(key.split(":", 1)[0]))
+            if area in records[key]["areas"]
+        ]
+
+
+bubble_quiz_aggregator = BubbleQuizAggregator()
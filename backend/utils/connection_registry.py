@@ -0,0 +1,130 @@
+from .live_state import live_state
+
+ROLE_TEACHER = "teacher"
+ROLE_STUDENT = "student"
+
+
+class ConnectionRegistry:
+    """
+    Registri koneksi Socket.IO: siapa pemilik sebuah sid dan di sesi mana.
+
+    Disimpan di LiveStateStore agar sama di semua worker:
+      connections                   -> {sid: {"session_code", "role", "name", "student_id"}}
+      participants:{session_code}   -> {student_id: {"name", "student_id", "sid"}} (roster)
+      roster_version:{session_code} -> versi roster, naik setiap ada siswa masuk/keluar
+      teacher_sids                  -> {session_code: teacher_sid}
+
+    Indeks balik `connections` membuat join, leave, dan disconnect O(1): handler
+    tidak perlu menelusuri semua sesi untuk mencari tempat sebuah sid bergabung.
+
+    Roster dikunci student_id dan menyimpan sid terakhir siswa tersebut. Siswa
+    yang reconnect dengan sid baru hanya memperbarui sid-nya (tidak muncul dua
+    kali), dan disconnect sid lama yang datang belakangan tidak mengeluarkannya.
+    """
+
+    CONNECTIONS_KEY = "connections"
+    TEACHER_SIDS_KEY = "teacher_sids"
+
+    def __init__(self, store=live_state):
+        self.store = store
+
+    @staticmethod
+    def participants_key(session_code: str):
+        return f"participants:{session_code}"
+
+    @staticmethod
+    def roster_version_key(session_code: str):
+        return f"roster_version:{session_code}"
+
+    async def get(self, sid: str):
+        """Entri koneksi sid, atau None jika sid belum bergabung ke sesi mana pun."""
+        return await self.store.hget(self.CONNECTIONS_KEY, sid)
+
+    async def get_participant(self, session_code: str, sid: str):
+        """Entri siswa jika sid adalah siswa di sesi session_code."""
+        if not session_code:
+            return None
+        entry = await self.get(sid)
+        if entry is None or entry["role"] != ROLE_STUDENT or entry["session_code"] != session_code:
+            return None
+        return entry
+
+    async def participants(self, session_code: str):
+        roster = await self.store.hgetall(self.participants_key(session_code))
+        return [{"name": entry["name"], "student_id": entry["student_id"]} for entry in roster.values()]
+
+    async def roster_snapshot(self, session_code: str):
+        """Roster lengkap beserta versinya, untuk guru yang baru bergabung atau tertinggal."""
+        version = int(await self.store.get(self.roster_version_key(session_code)) or 0)
+        return {"version": version, "participants": await self.participants(session_code)}
+
+    async def bump_roster_version(self, session_code: str):
+        return await self.store.incr(self.roster_version_key(session_code))
+
+    async def teacher_sid(self, session_code: str):
+        return await self.store.hget(self.TEACHER_SIDS_KEY, session_code)
+
+    async def register_teacher(self, sid: str, session_code: str):
+        previous = await self.unregister(sid)
+        await self.store.hset(self.CONNECTIONS_KEY, sid, {
+            "session_code": session_code, "role": ROLE_TEACHER, "name": None, "student_id": None,
+        })
+        await self.store.hset(self.TEACHER_SIDS_KEY, session_code, sid)
+        return previous
+
+    async def register_student(self, sid: str, session_code: str, name: str, student_id: str):
+        """
+        Mendaftarkan siswa; sid yang pindah sesi lebih dulu dikeluarkan dari sesi lamanya.
+        Mengembalikan (entri sebelumnya, apakah roster berubah).
+        """
+        previous = None
+        entry = await self.get(sid)
+        # Join ulang dari sid yang sama sebagai siswa yang sama tidak perlu keluar dulu
+        if entry is not None and (entry["session_code"], entry["role"], entry["student_id"]) != (session_code, ROLE_STUDENT, student_id):
+            previous = await self.unregister(sid)
+        await self.store.hset(self.CONNECTIONS_KEY, sid, {
+            "session_code": session_code, "role": ROLE_STUDENT, "name": name, "student_id": student_id,
+        })
+        roster_key = self.participants_key(session_code)
+        current = await self.store.hget(roster_key, student_id)
+        await self.store.hset(roster_key, student_id, {"name": name, "student_id": student_id, "sid": sid})
+        return previous, current is None or current["name"] != name
+
+    async def unregister(self, sid: str):
+        """
+        Menghapus sid dari registri. Mengembalikan entrinya jika sid keluar dari
+        sebuah sesi, atau None jika sid tidak terdaftar atau hanya koneksi lama
+        milik guru yang sudah tersambung lagi dengan sid baru.
+        """
+        entry = await self.get(sid)
+        if entry is None:
+            return None
+        await self.store.hdel(self.CONNECTIONS_KEY, sid)
+        session_code = entry["session_code"]
+        if entry["role"] == ROLE_STUDENT:
+            roster_key = self.participants_key(session_code)
+            current = await self.store.hget(roster_key, entry["student_id"])
+            if current is None or current["sid"] != sid:
+                # Siswa sudah tersambung lagi dengan sid lain
+                return None
+            await self.store.hdel(roster_key, entry["student_id"])
+        elif await self.teacher_sid(session_code) == sid:
+            await self.store.hdel(self.TEACHER_SIDS_KEY, session_code)
+        else:
+            return None
+        return entry
+
+    async def clear_session(self, session_code: str):
+        """Menghapus semua koneksi milik sesi (saat sesi berakhir)."""
+        roster = await self.store.hgetall(self.participants_key(session_code))
+        sids = [entry["sid"] for entry in roster.values()]
+        teacher_sid = await self.teacher_sid(session_code)
+        if teacher_sid is not None:
+            sids.append(teacher_sid)
+        if sids:
+            await self.store.hdel(self.CONNECTIONS_KEY, *sids)
+        await self.store.delete(self.participants_key(session_code), self.roster_version_key(session_code))
+        await self.store.hdel(self.TEACHER_SIDS_KEY, session_code)
+
+
+connection_registry = ConnectionRegistry()
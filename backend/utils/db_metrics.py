@@ -0,0 +1,148 @@
+import logging
+import os
+import time
+import threading
+from bisect import bisect_left
+from collections import deque
+from sqlalchemy import event, exc
+
+logger = logging.getLogger(__name__)
+
+# Query yang berjalan selama ini (ms) atau lebih dicatat di log query lambat
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+# Jumlah query lambat terakhir yang disimpan untuk endpoint metrik
+DB_SLOW_QUERY_LOG_SIZE = int(os.getenv("DB_SLOW_QUERY_LOG_SIZE", "50"))
+
+# Batas atas bucket histogram waktu checkout koneksi (ms); bucket terakhir tanpa batas
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class DatabaseMetrics:
+    """
+    Metrik pool koneksi dan query per worker, untuk menentukan ukuran pool.
+
+    - Waktu checkout: lama menunggu koneksi dari pool (termasuk membuka
+      koneksi baru), dicatat oleh pool hasil instrumented_pool() sebagai
+      histogram per engine, bersama jumlah checkout yang gagal karena
+      pool_timeout habis.
+    - Query lambat: statement yang berjalan >= DB_SLOW_QUERY_MS ditulis ke log
+      dan DB_SLOW_QUERY_LOG_SIZE terakhir disimpan. Parameter query tidak
+      disimpan karena bisa berisi data pengguna.
+    - Status pool (koneksi dipakai, overflow, dll.) dibaca langsung dari pool
+      setiap kali snapshot() dipanggil.
+    """
+
+    def __init__(self):
+        # nama engine -> engine
+        self.engines = {}
+        # nama engine -> {"buckets": [...], "count", "sum_ms", "max_ms", "timeouts"}
+        self._checkouts = {}
+        self.slow_queries = deque(maxlen=DB_SLOW_QUERY_LOG_SIZE)
+        self._lock = threading.Lock()
+
+    def instrument(self, name: str, engine):
+        """Mendaftarkan engine (sync; untuk AsyncEngine gunakan .sync_engine)."""
+        self.engines[name] = engine
+        self._checkouts[name] = self._empty_histogram()
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    @staticmethod
+    def _empty_histogram():
+        return {"buckets": [0] * (len(CHECKOUT_BUCKETS_MS) + 1), "count": 0, "sum_ms": 0.0, "max_ms": 0.0, "timeouts": 0}
+
+    def record_checkout(self, name: str, duration_ms: float, timed_out: bool = False):
+        with self._lock:
+            histogram = self._checkouts.setdefault(name, self._empty_histogram())
+            if timed_out:
+                histogram["timeouts"] += 1
+                return
+            histogram["buckets"][bisect_left(CHECKOUT_BUCKETS_MS, duration_ms)] += 1
+            histogram["count"] += 1
+            histogram["sum_ms"] += duration_ms
+            histogram["max_ms"] = max(histogram["max_ms"], duration_ms)
+
+    # Waktu mulai disimpan di execution context milik statement itu sendiri, bukan
+    # di conn.info: jika query gagal after_cursor_execute tidak dipanggil dan
+    # context ikut dibuang, sehingga tidak ada sisa yang menumpuk per koneksi.
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started_at = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_query_started_at", None)
+        if started_at is None:
+            return
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        if duration_ms < DB_SLOW_QUERY_MS:
+            return
+        engine_name = next((name for name, engine in self.engines.items() if engine is conn.engine), None)
+        statement = " ".join(statement.split())
+        logger.warning("Query lambat (%.0f ms, %s): %s", duration_ms, engine_name, statement[:500])
+        with self._lock:
+            self.slow_queries.append({
+                "engine": engine_name,
+                "duration_ms": round(duration_ms, 1),
+                "statement": statement[:2000],
+                "at": time.time(),
+            })
+
+    @staticmethod
+    def _pool_status(pool):
+        status = {"class": type(pool).__name__}
+        for key in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, key, None)
+            if method is not None:
+                status[key] = method()
+        if "checkedout" in status:
+            status["in_use"] = status.pop("checkedout")
+        if "overflow" in status:
+            # QueuePool.overflow() bernilai negatif selama koneksi belum pernah dibuka semua
+            status["overflow"] = max(0, status["overflow"])
+            status["max_overflow"] = getattr(pool, "_max_overflow", None)
+        return status
+
+    def snapshot(self):
+        with self._lock:
+            checkouts = {
+                name: {
+                    "buckets_ms": {
+                        **{str(bound): count for bound, count in zip(CHECKOUT_BUCKETS_MS, histogram["buckets"])},
+                        "+Inf": histogram["buckets"][-1],
+                    },
+                    "count": histogram["count"],
+                    "avg_ms": round(histogram["sum_ms"] / histogram["count"], 2) if histogram["count"] else None,
+                    "max_ms": round(histogram["max_ms"], 2),
+                    "timeouts": histogram["timeouts"],
+                }
+                for name, histogram in self._checkouts.items()
+            }
+            slow_queries = list(self.slow_queries)
+        return {
+            "pools": {
+                name: {**self._pool_status(engine.pool), "checkout": checkouts.get(name)}
+                for name, engine in self.engines.items()
+            },
+            "slow_query_ms": DB_SLOW_QUERY_MS,
+            "slow_queries": slow_queries,
+        }
+
+
+db_metrics = DatabaseMetrics()
+
+
+def instrumented_pool(pool_class, name: str):
+    """Subclass pool_class yang mencatat waktu setiap checkout ke db_metrics atas nama `name`."""
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            connection = pool_class.connect(self)
+        except exc.TimeoutError:
+            db_metrics.record_checkout(name, (time.perf_counter() - started_at) * 1000, timed_out=True)
+            raise
+        db_metrics.record_checkout(name, (time.perf_counter() - started_at) * 1000)
+        return connection
+
+    return type(f"Instrumented{pool_class.__name__}", (pool_class,), {"connect": connect})
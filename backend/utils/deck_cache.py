@@ -0,0 +1,57 @@
+import os
+import time
+from ..database import AsyncSessionLocal
+from ..schemas.slide import SlideDisplay
+
+# Jumlah slide berikutnya yang diumumkan ke klien untuk di-prefetch
+PREFETCH_SLIDES_AHEAD = int(os.getenv("PREFETCH_SLIDES_AHEAD", "3"))
+DECK_CACHE_TTL_SECONDS = float(os.getenv("DECK_CACHE_TTL_SECONDS", "30"))
+
+# Field SlideDisplay yang dibutuhkan klien untuk memuat gambar (src + srcSet)
+_IMAGE_FIELDS = {"page_number", "content_url", "variants"}
+
+
+class DeckCache:
+    """
+    Urutan gambar slide per presentasi, dipakai untuk petunjuk 'prefetch_slides'.
+
+    Lokal per worker. Entri dibuang saat slide presentasi diganti (ingest PDF,
+    hapus presentasi) dan kedaluwarsa setelah TTL agar worker lain ikut
+    menyusul; petunjuk prefetch yang sedikit usang tidak berbahaya.
+    """
+
+    def __init__(self, ttl: float = DECK_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        # presentation_id -> (expires_at, [gambar slide urut page_number])
+        self._entries = {}
+
+    async def get(self, presentation_id):
+        key = str(presentation_id)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] >= now:
+            return entry[1]
+        # Impor di sini: crud.presentation mengimpor modul ini untuk invalidasi
+        from ..crud import presentation as crud_presentation
+        async with AsyncSessionLocal() as db:
+            slides = [
+                SlideDisplay.model_validate(slide).model_dump(mode="json", include=_IMAGE_FIELDS)
+                for slide in await crud_presentation.get_slides_by_presentation_async(db, presentation_id)
+            ]
+        # Sekalian buang entri kedaluwarsa agar presentasi yang sudah selesai tidak menumpuk
+        for stale_key, (expires_at, _) in list(self._entries.items()):
+            if expires_at < now:
+                self._entries.pop(stale_key, None)
+        self._entries[key] = (now + self.ttl, slides)
+        return slides
+
+    async def upcoming(self, presentation_id, page_number: int, count: int = PREFETCH_SLIDES_AHEAD):
+        """Gambar slide page_number+1 .. page_number+count."""
+        slides = await self.get(presentation_id)
+        return [slide for slide in slides if page_number < slide["page_number"] <= page_number + count]
+
+    def invalidate(self, presentation_id):
+        self._entries.pop(str(presentation_id), None)
+
+
+deck_cache = DeckCache()
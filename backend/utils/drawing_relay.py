@@ -0,0 +1,192 @@
+import os
+import math
+import time
+from .live_state import live_state
+
+# Koordinat kanvas (0..1) dibulatkan ke grid DRAWING_GRID x DRAWING_GRID
+DRAWING_GRID = int(os.getenv("DRAWING_GRID", "4096"))
+
+
+def quantize(point):
+    """Titik [x, y] (0..1) dari klien ke grid, atau None jika titiknya tidak valid."""
+    if not isinstance(point, (list, tuple)) or len(point) != 2:
+        return None
+    try:
+        x, y = float(point[0]), float(point[1])
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(x) and math.isfinite(y)):
+        return None
+    return (
+        min(max(round(x * DRAWING_GRID), 0), DRAWING_GRID),
+        min(max(round(y * DRAWING_GRID), 0), DRAWING_GRID),
+    )
+
+
+class DrawingRelay:
+    """
+    Relay coretan guru ke siswa dalam bentuk batch, plus log coretan per slide.
+
+    Setiap event pointer dari guru hanya menambah titik ke buffer lokal;
+    BroadcastScheduler memanggil take_batch() pada tick 'drawing_batch' dan
+    seluruh titik baru sejak tick sebelumnya dikirim dalam satu frame.
+
+    Titik disimpan sebagai integer pada grid DRAWING_GRID dan di-delta-encode:
+    [x0, y0, dx1, dy1, dx2, dy2, ...]. Format yang sama dipakai untuk coretan
+    di log dan untuk setiap op di frame; op berisi `n`, indeks titik pertamanya
+    di coretan, sehingga klien bisa melewati titik yang sudah ia punya dari
+    log (misalnya siswa yang baru bergabung).
+
+    Log coretan disimpan di LiveStateStore (strokes:{session_code}:{slide_id})
+    agar siswa yang bergabung atau reconnect di worker mana pun mendapat
+    kanvas lengkap dalam satu pesan. Setiap coretan di hash itu terdiri dari
+    field "{id}" (gaya, ditulis sekali) dan potongan titik "{id}:{k}": setiap
+    tick hanya menulis titik yang ditambahkan sejak tick sebelumnya, sehingga
+    coretan panjang tidak ditulis ulang berkali-kali. Event guru selalu
+    diterima worker tempat guru terhubung, jadi buffer dan coretan aktif
+    cukup disimpan lokal.
+    """
+
+    def __init__(self, store=live_state):
+        self.store = store
+        # session_code -> [op, ...] yang belum dikirim
+        self._pending = {}
+        # session_code -> {"slide_id", "stroke", "last": (x, y)} coretan yang sedang digambar
+        self._active = {}
+        # session_code -> {(slide_id, stroke_id): stroke} yang belum ditulis ke store
+        self._dirty = {}
+        # session_code -> {(slide_id, stroke_id): [jumlah titik tersimpan, indeks potongan berikutnya]}
+        # untuk coretan yang masih bisa bertambah
+        self._logged = {}
+        self._last_id = 0
+
+    @staticmethod
+    def log_key(session_code: str, slide_id: str):
+        return f"strokes:{session_code}:{slide_id}"
+
+    @staticmethod
+    def slides_key(session_code: str):
+        # Daftar slide yang punya log, untuk pembersihan saat sesi berakhir
+        return f"stroke_slides:{session_code}"
+
+    def _next_id(self):
+        # Mikrodetik, naik monoton: urutan coretan penting untuk penghapus (eraser)
+        self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+        return self._last_id
+
+    # --- Dipanggil dari handler drawing_event (tanpa await agar urutan event terjaga) ---
+    # Titik yang tidak valid dilewati, seperti gaya coretan yang disaring stroke_style()
+
+    def start_stroke(self, session_code: str, slide_id: str, style: dict, point):
+        point = quantize(point)
+        if point is None:
+            return
+        x, y = point
+        stroke = {
+            "id": self._next_id(),
+            "tool": style.get("tool", "pen"),
+            "color": style.get("color"),
+            # Lebar relatif terhadap lebar kanvas
+            "width": style.get("strokeWidth"),
+            "points": [x, y],
+        }
+        self._active[session_code] = {"slide_id": slide_id, "stroke": stroke, "last": (x, y)}
+        self._dirty.setdefault(session_code, {})[(slide_id, stroke["id"])] = stroke
+        self._pending.setdefault(session_code, []).append({
+            "slide_id": slide_id, "id": stroke["id"], "n": 0,
+            "tool": stroke["tool"], "color": stroke["color"], "width": stroke["width"],
+            "points": [x, y],
+        })
+
+    def extend_stroke(self, session_code: str, point):
+        active = self._active.get(session_code)
+        point = quantize(point)
+        if active is None or point is None:
+            return
+        x, y = point
+        last_x, last_y = active["last"]
+        if (x, y) == (last_x, last_y):
+            return
+        stroke = active["stroke"]
+        stroke["points"].extend((x - last_x, y - last_y))
+        active["last"] = (x, y)
+        self._dirty.setdefault(session_code, {})[(active["slide_id"], stroke["id"])] = stroke
+
+        pending = self._pending.setdefault(session_code, [])
+        if pending and pending[-1]["id"] == stroke["id"]:
+            pending[-1]["points"].extend((x - last_x, y - last_y))
+        else:
+            # Op baru untuk coretan lama: titik pertamanya absolut
+            pending.append({
+                "slide_id": active["slide_id"], "id": stroke["id"],
+                "n": len(stroke["points"]) // 2 - 1, "points": [x, y],
+            })
+
+    def end_stroke(self, session_code: str):
+        self._active.pop(session_code, None)
+
+    # --- Dipanggil BroadcastScheduler dan handler lain ---
+
+    async def take_batch(self, session_code: str):
+        """Menulis titik baru ke log lalu mengembalikan frame berisi op sejak tick terakhir."""
+        dirty = self._dirty.pop(session_code, {})
+        logged = self._logged.setdefault(session_code, {})
+        active = self._active.get(session_code)
+        # slide_id -> {field: nilai} yang ditulis ke log slide itu
+        writes = {}
+        for (slide_id, stroke_id), stroke in dirty.items():
+            fields = writes.setdefault(slide_id, {})
+            state = logged.get((slide_id, stroke_id))
+            if state is None:
+                state = [0, 0]
+                fields[str(stroke_id)] = {key: value for key, value in stroke.items() if key != "points"}
+            # Titik delta-encode: potongan berikutnya cukup disambung ke potongan sebelumnya
+            fields[f"{stroke_id}:{state[1]}"] = stroke["points"][state[0] * 2:]
+            state = [len(stroke["points"]) // 2, state[1] + 1]
+            if active is not None and active["stroke"] is stroke:
+                logged[(slide_id, stroke_id)] = state
+            else:
+                logged.pop((slide_id, stroke_id), None)
+        for slide_id, fields in writes.items():
+            await self.store.hset_many(self.log_key(session_code, slide_id), fields)
+            await self.store.hset(self.slides_key(session_code), slide_id, 1)
+        ops = self._pending.pop(session_code, None)
+        if not ops:
+            return None
+        return {"ops": ops}
+
+    async def strokes(self, session_code: str, slide_id: str):
+        """Log coretan sebuah slide, urut waktu."""
+        fields = await self.store.hgetall(self.log_key(session_code, slide_id))
+        strokes = {}
+        chunks = []
+        for field, value in fields.items():
+            stroke_id, _, chunk = field.partition(":")
+            if chunk:
+                chunks.append((int(stroke_id), int(chunk), value))
+            else:
+                strokes[int(stroke_id)] = {**value, "points": []}
+        for stroke_id, _, points in sorted(chunks, key=lambda chunk: chunk[:2]):
+            if stroke_id in strokes:
+                strokes[stroke_id]["points"].extend(points)
+        return [strokes[stroke_id] for stroke_id in sorted(strokes)]
+
+    async def clear_slide(self, session_code: str, slide_id: str):
+        self._pending[session_code] = [op for op in self._pending.get(session_code, []) if op["slide_id"] != slide_id]
+        self._dirty[session_code] = {key: stroke for key, stroke in self._dirty.get(session_code, {}).items() if key[0] != slide_id}
+        self._logged[session_code] = {key: state for key, state in self._logged.get(session_code, {}).items() if key[0] != slide_id}
+        active = self._active.get(session_code)
+        if active is not None and active["slide_id"] == slide_id:
+            self._active.pop(session_code, None)
+        await self.store.delete(self.log_key(session_code, slide_id))
+
+    async def clear_session(self, session_code: str):
+        self._pending.pop(session_code, None)
+        self._dirty.pop(session_code, None)
+        self._logged.pop(session_code, None)
+        self._active.pop(session_code, None)
+        slide_ids = await self.store.hgetall(self.slides_key(session_code))
+        await self.store.delete(self.slides_key(session_code), *(self.log_key(session_code, slide_id) for slide_id in slide_ids))
+
+
+drawing_relay = DrawingRelay()
@@ -0,0 +1,99 @@
+import os
+import struct
+
+# Frame biner bisa dimatikan dari server; klien lalu selalu menerima JSON
+BINARY_FRAMES_ENABLED = os.getenv("BINARY_FRAMES_ENABLED", "true").lower() == "true"
+
+FRAME_VERSION = 1
+# Byte kedua setiap frame: jenis isi frame
+KIND_DRAWING_BATCH = 1
+KIND_RESULTS = 2
+KIND_LEADERBOARD = 3
+
+# Panjang string 0xFFFF menandai None
+_NULL_STRING = 0xFFFF
+
+# Jenis key hasil bubble quiz (lihat BubbleQuizAggregator): "grid", "cell:{i}", "area:{j}"
+_RESULT_KEY_KINDS = {"grid": 0, "cell": 1, "area": 2}
+
+
+class FrameWriter:
+    """Penyusun frame little-endian sederhana di atas bytearray."""
+
+    def __init__(self, kind: int):
+        self.buffer = bytearray(struct.pack("<BB", FRAME_VERSION, kind))
+
+    def pack(self, fmt: str, *values):
+        self.buffer += struct.pack("<" + fmt, *values)
+
+    def string(self, value):
+        if value is None:
+            self.pack("H", _NULL_STRING)
+            return
+        data = str(value).encode("utf-8")[:_NULL_STRING - 1]
+        self.pack("H", len(data))
+        self.buffer += data
+
+    def bytes(self):
+        return bytes(self.buffer)
+
+
+def encode_drawing_batch(batch):
+    """
+    Frame 'drawing_batch' (lihat DrawingRelay.take_batch).
+
+    Per op: slide_id, id (float64, mikrodetik masih eksak), n (uint32), flag
+    gaya; jika op membawa gaya: tool, color, width (float32, NaN untuk None);
+    lalu jumlah pasangan titik (uint32) dan titik sebagai int16. Titik sudah
+    berupa integer ter-delta-encode pada grid DRAWING_GRID (<= 32767).
+    """
+    writer = FrameWriter(KIND_DRAWING_BATCH)
+    writer.pack("H", len(batch["ops"]))
+    for op in batch["ops"]:
+        writer.string(op["slide_id"])
+        has_style = "tool" in op
+        writer.pack("dIB", op["id"], op["n"], int(has_style))
+        if has_style:
+            writer.string(op["tool"])
+            writer.string(op["color"])
+            writer.pack("f", float("nan") if op["width"] is None else op["width"])
+        points = op["points"]
+        writer.pack(f"I{len(points)}h", len(points) // 2, *points)
+    return writer.bytes()
+
+
+def encode_bubble_results(frame):
+    """
+    Frame hasil bubble quiz (lihat ResultStream): slide_id, seq (uint32),
+    full, lalu per key: jenis (uint8), indeks (uint16), nilai (uint32).
+    """
+    writer = FrameWriter(KIND_RESULTS)
+    writer.string(frame["slide_id"])
+    writer.pack("IBI", frame["seq"], int(frame["full"]), len(frame["values"]))
+    for key, value in frame["values"].items():
+        kind, _, index = key.partition(":")
+        writer.pack("BHI", _RESULT_KEY_KINDS[kind], int(index or 0), value)
+    return writer.bytes()
+
+
+def encode_leaderboard(entries):
+    """Frame leaderboard: per entri student_id, student_name, score (int32)."""
+    writer = FrameWriter(KIND_LEADERBOARD)
+    writer.pack("I", len(entries))
+    for entry in entries:
+        writer.string(entry["student_id"])
+        writer.string(entry["student_name"])
+        writer.pack("i", entry["score"])
+    return writer.bytes()
+
+
+# Event frekuensi tinggi yang punya versi biner; decoder klien ada di services/frameCodec.js
+ENCODERS = {
+    "drawing_batch": encode_drawing_batch,
+    "update_bubble_quiz_results": encode_bubble_results,
+    "update_leaderboard": encode_leaderboard,
+}
+
+
+def encode(event: str, payload):
+    return ENCODERS[event](payload)
@@ -0,0 +1,50 @@
+from .live_state import LiveStateStore
+
+
+class Leaderboard:
+    """
+    Leaderboard satu sesi yang selalu terurut.
+
+    Skor disimpan di sorted set milik LiveStateStore (SortedList untuk backend
+    in-process, ZSET untuk Redis), sehingga pembaruan skor, pengambilan top-K,
+    dan pencarian peringkat siswa semuanya O(log N) tanpa mengurutkan ulang,
+    dan tetap konsisten walau sesi dilayani beberapa worker.
+    """
+
+    def __init__(self, store: LiveStateStore, session_id):
+        self.store = store
+        self.scores_key = f"scores:{session_id}"
+        self.names_key = f"score_names:{session_id}"
+
+    async def size(self) -> int:
+        return await self.store.zcard(self.scores_key)
+
+    async def set_scores(self, rows):
+        """Mengisi leaderboard dari baris {"student_id", "student_name", "score"}."""
+        await self.store.zadd(self.scores_key, {row["student_id"]: row["score"] for row in rows})
+        await self.store.hset_many(self.names_key, {row["student_id"]: row["student_name"] for row in rows})
+
+    async def add_points(self, student_id: str, student_name: str, points: int) -> int:
+        await self.store.hset(self.names_key, student_id, student_name)
+        return int(await self.store.zincrby(self.scores_key, student_id, points))
+
+    async def top(self, limit: int | None = None):
+        """Daftar entri (dict dengan field ScoreDisplay) dari skor tertinggi."""
+        stop = -1 if limit is None else limit - 1
+        ranking = await self.store.zrevrange(self.scores_key, 0, stop)
+        names = await self.store.hmget(self.names_key, [student_id for student_id, _ in ranking])
+        return [
+            {"student_id": student_id, "student_name": name, "score": int(score)}
+            for (student_id, score), name in zip(ranking, names)
+        ]
+
+    async def rank(self, student_id: str):
+        """Peringkat dan skor seorang siswa, atau None jika belum punya skor."""
+        position = await self.store.zrevrank(self.scores_key, student_id)
+        if position is None:
+            return None
+        score = await self.store.zscore(self.scores_key, student_id)
+        return {"rank": position + 1, "score": int(score), "total": await self.size()}
+
+    async def clear(self):
+        await self.store.delete(self.scores_key, self.names_key)
@@ -0,0 +1,311 @@
+import os
+import json
+from abc import ABC, abstractmethod
+from sortedcontainers import SortedList
+
+# Backend state sesi live: 'memory' (satu proses), 'redis', atau 'fakeredis' (pengujian lokal)
+LIVE_STATE_BACKEND = os.getenv("LIVE_STATE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+LIVE_STATE_PREFIX = os.getenv("LIVE_STATE_PREFIX", "eduslide:")
+
+
+class LiveStateStore(ABC):
+    """
+    Antarmuka state sesi live yang bisa dibagi antar worker.
+
+    Operasinya sengaja mengikuti primitif Redis (hash, counter, sorted set)
+    agar backend in-process dan backend Redis berperilaku sama. Nilai hash
+    disimpan sebagai JSON; angka yang ditulis lewat hincrby tetap terbaca
+    sebagai int.
+    """
+
+    # --- Key/value ---
+    @abstractmethod
+    async def get(self, key):
+        ...
+
+    @abstractmethod
+    async def set(self, key, value, nx: bool = False) -> bool:
+        ...
+
+    @abstractmethod
+    async def incr(self, key, amount: int = 1) -> int:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys):
+        ...
+
+    # --- Hash ---
+    @abstractmethod
+    async def hget(self, key, field):
+        ...
+
+    @abstractmethod
+    async def hmget(self, key, fields) -> list:
+        ...
+
+    @abstractmethod
+    async def hgetall(self, key) -> dict:
+        ...
+
+    @abstractmethod
+    async def hset(self, key, field, value):
+        ...
+
+    @abstractmethod
+    async def hset_many(self, key, mapping: dict):
+        ...
+
+    @abstractmethod
+    async def hdel(self, key, *fields):
+        ...
+
+    @abstractmethod
+    async def hexists(self, key, field) -> bool:
+        ...
+
+    @abstractmethod
+    async def hincrby(self, key, field, amount: int = 1) -> int:
+        ...
+
+    # --- Sorted set (skor menurun) ---
+    @abstractmethod
+    async def zadd(self, key, mapping: dict):
+        ...
+
+    @abstractmethod
+    async def zincrby(self, key, member, amount) -> float:
+        ...
+
+    @abstractmethod
+    async def zrevrange(self, key, start: int, stop: int) -> list:
+        """Daftar (member, score) dari skor tertinggi; stop inklusif seperti Redis."""
+        ...
+
+    @abstractmethod
+    async def zrevrank(self, key, member):
+        ...
+
+    @abstractmethod
+    async def zscore(self, key, member):
+        ...
+
+    @abstractmethod
+    async def zcard(self, key) -> int:
+        ...
+
+
+class _SortedSet:
+    def __init__(self):
+        self.ranking = SortedList()  # (-score, member)
+        self.scores = {}
+
+    def set(self, member, score):
+        old = self.scores.get(member)
+        if old is not None:
+            self.ranking.remove((-old, member))
+        self.scores[member] = score
+        self.ranking.add((-score, member))
+
+
+class InMemoryStateStore(LiveStateStore):
+    """Backend in-process: cepat, tetapi hanya berlaku untuk satu worker."""
+
+    def __init__(self):
+        self._values = {}
+        self._hashes = {}
+        self._zsets = {}
+
+    async def get(self, key):
+        return self._values.get(key)
+
+    async def set(self, key, value, nx: bool = False) -> bool:
+        if nx and key in self._values:
+            return False
+        self._values[key] = value
+        return True
+
+    async def incr(self, key, amount: int = 1) -> int:
+        self._values[key] = int(self._values.get(key, 0)) + amount
+        return self._values[key]
+
+    async def delete(self, *keys):
+        for key in keys:
+            self._values.pop(key, None)
+            self._hashes.pop(key, None)
+            self._zsets.pop(key, None)
+
+    async def hget(self, key, field):
+        return self._hashes.get(key, {}).get(field)
+
+    async def hmget(self, key, fields) -> list:
+        current = self._hashes.get(key, {})
+        return [current.get(field) for field in fields]
+
+    async def hgetall(self, key) -> dict:
+        return dict(self._hashes.get(key, {}))
+
+    async def hset(self, key, field, value):
+        self._hashes.setdefault(key, {})[field] = value
+
+    async def hset_many(self, key, mapping: dict):
+        if mapping:
+            self._hashes.setdefault(key, {}).update(mapping)
+
+    async def hdel(self, key, *fields):
+        current = self._hashes.get(key)
+        if current is None:
+            return
+        for field in fields:
+            current.pop(field, None)
+        if not current:
+            del self._hashes[key]
+
+    async def hexists(self, key, field) -> bool:
+        return field in self._hashes.get(key, {})
+
+    async def hincrby(self, key, field, amount: int = 1) -> int:
+        current = self._hashes.setdefault(key, {})
+        current[field] = int(current.get(field, 0)) + amount
+        return current[field]
+
+    async def zadd(self, key, mapping: dict):
+        zset = self._zsets.setdefault(key, _SortedSet())
+        for member, score in mapping.items():
+            zset.set(member, score)
+
+    async def zincrby(self, key, member, amount) -> float:
+        zset = self._zsets.setdefault(key, _SortedSet())
+        score = zset.scores.get(member, 0) + amount
+        zset.set(member, score)
+        return score
+
+    async def zrevrange(self, key, start: int, stop: int) -> list:
+        zset = self._zsets.get(key)
+        if zset is None:
+            return []
+        stop = None if stop < 0 else stop + 1
+        return [(member, -neg_score) for neg_score, member in zset.ranking.islice(start, stop)]
+
+    async def zrevrank(self, key, member):
+        zset = self._zsets.get(key)
+        if zset is None or member not in zset.scores:
+            return None
+        return zset.ranking.index((-zset.scores[member], member))
+
+    async def zscore(self, key, member):
+        zset = self._zsets.get(key)
+        return zset.scores.get(member) if zset is not None else None
+
+    async def zcard(self, key) -> int:
+        zset = self._zsets.get(key)
+        return len(zset.scores) if zset is not None else 0
+
+
+class RedisStateStore(LiveStateStore):
+    """
+    Backend berbasis protokol Redis sehingga state bisa dibagi antar worker/node.
+
+    `client` adalah klien redis.asyncio (atau pengganti yang kompatibel seperti
+    fakeredis) yang dibuat dengan decode_responses=True.
+    """
+
+    def __init__(self, client, prefix: str = LIVE_STATE_PREFIX):
+        self.client = client
+        self.prefix = prefix
+
+    def _k(self, key):
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _dump(value):
+        return json.dumps(value)
+
+    @staticmethod
+    def _load(raw):
+        return json.loads(raw) if raw is not None else None
+
+    async def get(self, key):
+        return self._load(await self.client.get(self._k(key)))
+
+    async def set(self, key, value, nx: bool = False) -> bool:
+        return bool(await self.client.set(self._k(key), self._dump(value), nx=nx))
+
+    async def incr(self, key, amount: int = 1) -> int:
+        return await self.client.incrby(self._k(key), amount)
+
+    async def delete(self, *keys):
+        if keys:
+            await self.client.delete(*(self._k(key) for key in keys))
+
+    async def hget(self, key, field):
+        return self._load(await self.client.hget(self._k(key), field))
+
+    async def hmget(self, key, fields) -> list:
+        fields = list(fields)
+        if not fields:
+            return []
+        return [self._load(raw) for raw in await self.client.hmget(self._k(key), fields)]
+
+    async def hgetall(self, key) -> dict:
+        raw = await self.client.hgetall(self._k(key))
+        return {field: self._load(value) for field, value in raw.items()}
+
+    async def hset(self, key, field, value):
+        await self.client.hset(self._k(key), field, self._dump(value))
+
+    async def hset_many(self, key, mapping: dict):
+        if mapping:
+            await self.client.hset(self._k(key), mapping={f: self._dump(v) for f, v in mapping.items()})
+
+    async def hdel(self, key, *fields):
+        if fields:
+            await self.client.hdel(self._k(key), *fields)
+
+    async def hexists(self, key, field) -> bool:
+        return bool(await self.client.hexists(self._k(key), field))
+
+    async def hincrby(self, key, field, amount: int = 1) -> int:
+        return await self.client.hincrby(self._k(key), field, amount)
+
+    async def zadd(self, key, mapping: dict):
+        if mapping:
+            await self.client.zadd(self._k(key), mapping)
+
+    async def zincrby(self, key, member, amount) -> float:
+        return await self.client.zincrby(self._k(key), amount, member)
+
+    async def zrevrange(self, key, start: int, stop: int) -> list:
+        return await self.client.zrevrange(self._k(key), start, stop, withscores=True)
+
+    async def zrevrank(self, key, member):
+        return await self.client.zrevrank(self._k(key), member)
+
+    async def zscore(self, key, member):
+        return await self.client.zscore(self._k(key), member)
+
+    async def zcard(self, key) -> int:
+        return await self.client.zcard(self._k(key))
+
+
+def create_live_state_store(backend: str = LIVE_STATE_BACKEND) -> LiveStateStore:
+    if backend == "redis":
+        import redis.asyncio as redis
+        return RedisStateStore(redis.from_url(REDIS_URL, decode_responses=True))
+    if backend == "fakeredis":
+        # Hanya untuk pengujian lokal; paket fakeredis tidak termasuk dependensi produksi
+        import fakeredis
+        return RedisStateStore(fakeredis.FakeAsyncRedis(decode_responses=True))
+    return InMemoryStateStore()
+
+
+def create_client_manager(backend: str = LIVE_STATE_BACKEND):
+    """Manager Socket.IO untuk emit lintas worker; None berarti manager bawaan (satu proses)."""
+    if backend == "redis":
+        import socketio
+        return socketio.AsyncRedisManager(REDIS_URL)
+    return None
+
+
+live_state = create_live_state_store()
@@ -0,0 +1,52 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Thread khusus bcrypt; hashing tidak lagi berebut dengan thread pool request lain
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Jumlah permintaan yang boleh menunggu giliran; selebihnya langsung ditolak (429)
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+
+
+class PasswordHasherBusyError(Exception):
+    """Antrean hashing password penuh."""
+
+
+class PasswordHasher:
+    """
+    Menjalankan hash dan verifikasi bcrypt di executor berukuran tetap.
+
+    Satu panggilan bcrypt menghabiskan ratusan milidetik CPU. Saat banyak guru
+    login bersamaan, paling banyak PASSWORD_HASH_WORKERS hash berjalan paralel
+    dan PASSWORD_HASH_MAX_PENDING menunggu; permintaan berikutnya mendapat
+    PasswordHasherBusyError tanpa menunggu, sehingga lonjakan login tidak
+    menghabiskan thread dan CPU yang dipakai sesi live.
+
+    Dipanggil dari endpoint async; yang menunggu hasil hanya coroutine, tidak
+    ada thread pool FastAPI yang ikut tertahan selama bcrypt berjalan.
+    """
+
+    def __init__(self, context, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.context = context
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = asyncio.BoundedSemaphore(workers + max_pending)
+
+    async def _run(self, fn, *args):
+        # Tolak langsung bila slot habis, jangan ikut mengantre di semaphore
+        if self._slots.locked():
+            raise PasswordHasherBusyError()
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def hash(self, password: str):
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str):
+        """
+        (cocok, hash_baru). hash_baru berisi hash dengan cost saat ini jika hash
+        lama dibuat dengan cost berbeda, selain itu None.
+        """
+        return await self._run(self.context.verify_and_update, password, hashed)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
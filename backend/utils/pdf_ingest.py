@@ -0,0 +1,332 @@
+import os
+import uuid
+import asyncio
+import threading
+import shutil
+import multiprocessing
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from ..database import SessionLocal
+from ..models.slide import Slide
+from ..models.presentation import PresentationSource
+from ..crud import blob as crud_blob
+from .live_state import live_state
+from .slide_cache import slide_cache
+from .deck_cache import deck_cache
+from .presentation_cache import presentation_cache
+from .pdf_render import render_page_range, page_fingerprints
+from .slide_variants import write_variants
+from . import blob_store
+
+# Jumlah proses render paralel (dibagi oleh semua job)
+PDF_RENDER_PROCESSES = int(os.getenv("PDF_RENDER_PROCESSES", str(min(4, os.cpu_count() or 1))))
+# Jumlah halaman per potongan yang dikirim ke satu proses render
+PDF_CHUNK_PAGES = int(os.getenv("PDF_CHUNK_PAGES", "8"))
+# thread_count pdftoppm di dalam setiap potongan
+PDF_RENDER_THREADS = int(os.getenv("PDF_RENDER_THREADS", "1"))
+PDF_RENDER_DPI = int(os.getenv("PDF_RENDER_DPI", "200"))
+# Jumlah job upload yang diproses bersamaan
+PDF_INGEST_CONCURRENT_JOBS = int(os.getenv("PDF_INGEST_CONCURRENT_JOBS", "2"))
+
+
+class IngestConflictError(Exception):
+    """Presentasi masih memproses upload sebelumnya."""
+
+
+class PdfIngestor:
+    """
+    Konversi PDF -> slide di latar belakang.
+
+    Upload langsung mendapat job id. Thread orkestrator membagi dokumen menjadi
+    potongan halaman yang dirender paralel di process pool, lalu menyimpan baris
+    Slide setiap kali satu potongan selesai sehingga slide muncul bertahap.
+    Slide lama diganti dalam transaksi yang sama dengan potongan pertama; jika
+    job gagal sebelum itu, slide lama tetap utuh.
+
+    Upload ulang bersifat inkremental: setiap halaman diberi sidik jari
+    (page_fingerprints) dan dicocokkan dengan upload sebelumnya. Slide untuk
+    halaman yang tidak berubah dipertahankan (id dan settings aktivitas tetap,
+    hanya page_number yang disesuaikan); hanya halaman baru atau yang berubah
+    yang dirender.
+
+    PDF dan gambar slide disimpan di blobs/ berdasarkan hash isinya (lihat
+    blob_store) dengan penghitung referensi. Halaman dari PDF identik yang
+    sudah pernah dikonversi di presentasi lain juga tidak dirender ulang.
+
+    Status job disimpan di LiveStateStore (ingest_job:{job_id}) agar bisa dibaca
+    dari worker mana pun, dan disiarkan lewat event Socket.IO 'ingest_progress'
+    ke room ingest_{job_id}.
+    """
+
+    def __init__(self, store=live_state):
+        self.store = store
+        self.sio = None
+        self.loop = None
+        self._jobs_executor = ThreadPoolExecutor(max_workers=PDF_INGEST_CONCURRENT_JOBS, thread_name_prefix="pdf-ingest")
+        self._render_pool = None
+        self._render_pool_lock = threading.Lock()
+        # presentation_id yang sedang diproses di worker ini
+        self._active = set()
+        # submit() dipanggil dari beberapa thread endpoint sekaligus
+        self._active_lock = threading.Lock()
+
+    def attach(self, sio):
+        """Dipanggil saat startup dari event loop utama."""
+        self.sio = sio
+        self.loop = asyncio.get_running_loop()
+
+    def shutdown(self):
+        self._jobs_executor.shutdown(wait=False, cancel_futures=True)
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def job_key(job_id: str):
+        return f"ingest_job:{job_id}"
+
+    async def get_job(self, job_id: str):
+        return await self.store.get(self.job_key(job_id))
+
+    @staticmethod
+    def public_view(job: dict):
+        # owner_id hanya dipakai untuk otorisasi, tidak ikut disiarkan
+        return {key: value for key, value in job.items() if key != "owner_id"}
+
+    async def _publish(self, job: dict):
+        await self.store.set(self.job_key(job["job_id"]), job)
+        if self.sio is not None:
+            await self.sio.emit("ingest_progress", self.public_view(job), room=f"ingest_{job['job_id']}")
+
+    # --- Dipanggil dari thread (endpoint sync dan orkestrator) ---
+
+    def _publish_from_thread(self, job: dict):
+        asyncio.run_coroutine_threadsafe(self._publish(dict(job)), self.loop).result()
+
+    def _get_render_pool(self):
+        with self._render_pool_lock:
+            if self._render_pool is None:
+                # 'spawn' agar proses anak tidak mewarisi event loop dan koneksi database
+                self._render_pool = ProcessPoolExecutor(
+                    max_workers=PDF_RENDER_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._render_pool
+
+    def submit(self, presentation_id, owner_id, pdf_path: Path, pdf_hash: str, filename: str):
+        """
+        Mendaftarkan job baru dan mengembalikan statusnya tanpa menunggu render.
+        pdf_path berada di folder staging milik job; folder itu dihapus saat job selesai.
+        """
+        presentation_id = str(presentation_id)
+        with self._active_lock:
+            if presentation_id in self._active:
+                raise IngestConflictError()
+            self._active.add(presentation_id)
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "presentation_id": presentation_id,
+            "owner_id": str(owner_id),
+            "status": "queued",
+            "total_pages": None,
+            "done_pages": 0,
+            "error": None,
+        }
+        try:
+            self._publish_from_thread(job)
+            self._jobs_executor.submit(self._run_job, job, pdf_path, pdf_hash, filename)
+        except Exception:
+            # Job tidak pernah berjalan, jadi _run_job tidak akan melepas presentasinya
+            self._release(presentation_id)
+            raise
+        return job
+
+    def _release(self, presentation_id: str):
+        with self._active_lock:
+            self._active.discard(presentation_id)
+
+    def _run_job(self, job: dict, pdf_path: Path, pdf_hash: str, filename: str):
+        presentation_id = uuid.UUID(job["presentation_id"])
+        staging_dir = pdf_path.parent
+        futures = []
+        # (hash, ekstensi) gambar/PDF lama yang referensinya dilepas; dibersihkan setelah semua halaman baru tersimpan
+        released = set()
+        # (hash, ekstensi) yang ditaruh di blobs/ oleh transaksi yang belum di-commit;
+        # jika transaksi itu di-rollback, file barunya ikut dibersihkan
+        placed = set()
+        db = SessionLocal()
+        try:
+            pool = self._get_render_pool()
+            fingerprints = pool.submit(page_fingerprints, str(pdf_path), PDF_RENDER_DPI).result()
+            job["total_pages"] = len(fingerprints)
+            kept, reused, to_render = self._plan_pages(db, presentation_id, pdf_hash, fingerprints)
+
+            futures = [
+                pool.submit(
+                    render_page_range, str(pdf_path), str(staging_dir),
+                    first_page, last_page, PDF_RENDER_DPI, PDF_RENDER_THREADS,
+                )
+                for first_page, last_page in _page_ranges(to_render, PDF_CHUNK_PAGES)
+            ]
+            job["status"] = "processing"
+            self._publish_from_thread(job)
+
+            # Potongan pertama sekaligus mengganti PDF dan menata ulang slide lama;
+            # jika tidak ada halaman yang perlu dirender, langkah ini berjalan sendiri
+            chunks = (future.result() for future in as_completed(futures)) if futures else iter([[]])
+            images = {page_number: blob_store.digest_of_url(slide.content_url) for page_number, slide in kept.items()}
+            first = True
+            for chunk in chunks:
+                if first:
+                    placed.add((pdf_hash, "pdf"))
+                    released = self._replace_source(db, presentation_id, pdf_path, pdf_hash, filename, kept)
+                    placed.update((digest, "png") for _, digest in reused)
+                    self._add_pages(db, presentation_id, staging_dir, reused)
+                    images.update(reused)
+                    job["done_pages"] += len(kept) + len(reused)
+                placed.update((digest, "png") for _, digest in chunk)
+                self._add_pages(db, presentation_id, staging_dir, chunk)
+                db.commit()
+                placed.clear()
+                if first:
+                    blob_store.remove_legacy_dir(presentation_id)
+                    first = False
+                slide_cache.invalidate_presentation(presentation_id)
+                deck_cache.invalidate(presentation_id)
+                presentation_cache.invalidate(presentation_id)
+                images.update(chunk)
+                job["done_pages"] += len(chunk)
+                self._publish_from_thread(job)
+
+            source = db.get(PresentationSource, presentation_id)
+            source.pages = [
+                {"image": images[page_number], "fingerprint": fingerprint}
+                for page_number, fingerprint in enumerate(fingerprints, start=1)
+            ]
+            db.commit()
+            crud_blob.collect_garbage(db, released)
+            job["status"] = "done"
+        except Exception as e:
+            print(f"Error ingesting PDF for presentation {presentation_id}: {e}")
+            db.rollback()
+            for future in futures:
+                future.cancel()
+            job["status"] = "failed"
+            job["error"] = str(e)
+            try:
+                # Referensi yang dilepas ikut di-rollback kecuali sudah di-commit di potongan sebelumnya
+                crud_blob.collect_garbage(db, released | placed)
+            except Exception as gc_error:
+                print(f"Error collecting blobs for presentation {presentation_id}: {gc_error}")
+        finally:
+            db.close()
+            # PDF dan gambar yang sudah dipindah ke blobs/ tidak lagi ada di sini
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            self._release(job["presentation_id"])
+            self._publish_from_thread(job)
+
+    def _plan_pages(self, db, presentation_id, pdf_hash: str, fingerprints):
+        """
+        Mencocokkan sidik jari halaman PDF baru dengan versi sebelumnya.
+        Mengembalikan:
+        - kept: {nomor halaman baru: Slide lama} yang dipertahankan (id dan settings tetap),
+        - reused: [(nomor halaman, hash gambar)] dari PDF identik yang sudah pernah dikonversi,
+        - to_render: nomor halaman yang harus dirender.
+        """
+        previous = {}
+        for slide, fingerprint in self._previous_pages(db, presentation_id):
+            if blob_store.digest_of_url(slide.content_url):
+                previous.setdefault(fingerprint, []).append(slide)
+
+        known_images = {}
+        manifest = crud_blob.get_page_manifest(db, pdf_hash)
+        if manifest is not None and len(manifest) == len(fingerprints):
+            for fingerprint, page in zip(fingerprints, manifest):
+                # Manifest lama (tanpa sidik jari) berasal dari PDF yang sama persis, jadi cocok per posisi
+                if page.get("fingerprint", fingerprint) == fingerprint and blob_store.blob_file(page["image"], "png").is_file():
+                    known_images[fingerprint] = page["image"]
+
+        kept, reused, to_render = {}, [], []
+        for page_number, fingerprint in enumerate(fingerprints, start=1):
+            candidates = previous.get(fingerprint)
+            if candidates:
+                # Utamakan slide di posisi yang sama (mis. beberapa halaman kosong yang identik)
+                slide = next((s for s in candidates if s.page_number == page_number), candidates[0])
+                candidates.remove(slide)
+                kept[page_number] = slide
+            elif fingerprint in known_images:
+                reused.append((page_number, known_images[fingerprint]))
+            else:
+                to_render.append(page_number)
+        return kept, reused, to_render
+
+    def _previous_pages(self, db, presentation_id):
+        """Pasangan (Slide lama, sidik jari halamannya) dari upload sebelumnya."""
+        source = db.get(PresentationSource, presentation_id)
+        if source is None:
+            # Slide dari sebelum penyimpanan berbasis hash tidak punya sidik jari
+            return []
+        if source.pages and all("fingerprint" in page for page in source.pages):
+            fingerprints = [page["fingerprint"] for page in source.pages]
+        else:
+            pdf_file = blob_store.blob_file(source.pdf_hash, "pdf")
+            if not pdf_file.is_file():
+                return []
+            fingerprints = self._get_render_pool().submit(page_fingerprints, str(pdf_file), PDF_RENDER_DPI).result()
+        slides = db.query(Slide).filter(Slide.presentation_id == presentation_id).all()
+        return [
+            (slide, fingerprints[slide.page_number - 1])
+            for slide in slides
+            if 0 < slide.page_number <= len(fingerprints)
+        ]
+
+    @staticmethod
+    def _replace_source(db, presentation_id, pdf_path: Path, pdf_hash: str, filename: str, kept: dict):
+        """Melepas slide lama yang tidak dipertahankan dan PDF lama; mengembalikan (hash, ekstensi) yang dilepas."""
+        kept_ids = {slide.id for slide in kept.values()}
+        released = Counter()
+        for slide in db.query(Slide).filter(Slide.presentation_id == presentation_id).all():
+            if slide.id in kept_ids:
+                continue
+            digest = blob_store.digest_of_url(slide.content_url)
+            if digest:
+                released[(digest, "png")] += 1
+            db.delete(slide)
+        for page_number, slide in kept.items():
+            slide.page_number = page_number
+        source = db.get(PresentationSource, presentation_id)
+        if source is not None:
+            released[(source.pdf_hash, "pdf")] += 1
+            db.delete(source)
+        crud_blob.release_blob_refs(db, released)
+        db.flush()
+        crud_blob.add_blob_refs(db, Counter({(pdf_hash, "pdf"): 1}))
+        # PDF staging masih dibaca proses render untuk potongan berikutnya
+        blob_store.place_blob(pdf_path, pdf_hash, "pdf", keep_staged=True)
+        db.add(PresentationSource(presentation_id=presentation_id, pdf_hash=pdf_hash, filename=filename))
+        return set(released)
+
+    @staticmethod
+    def _add_pages(db, presentation_id, staging_dir: Path, pages):
+        crud_blob.add_blob_refs(db, Counter((digest, "png") for _, digest in pages))
+        for page_number, digest in pages:
+            if not blob_store.place_image(staging_dir, digest):
+                write_variants(str(blob_store.blob_file(digest, "png")))
+            db.add(Slide(
+                presentation_id=presentation_id,
+                page_number=page_number,
+                content_url=blob_store.blob_url(digest, "png"),
+            ))
+
+
+def _page_ranges(page_numbers, max_pages: int):
+    """[1, 2, 3, 7, 8] -> [(1, 3), (7, 8)], setiap rentang paling banyak max_pages halaman."""
+    ranges = []
+    for page_number in page_numbers:
+        if ranges and ranges[-1][1] == page_number - 1 and page_number - ranges[-1][0] < max_pages:
+            ranges[-1][1] = page_number
+        else:
+            ranges.append([page_number, page_number])
+    return [tuple(page_range) for page_range in ranges]
+
+pdf_ingestor = PdfIngestor()
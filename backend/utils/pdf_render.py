@@ -0,0 +1,101 @@
+# Fungsi di modul ini dijalankan di proses worker (ProcessPoolExecutor),
+# jadi sengaja hanya mengimpor pdf2image, pypdf, dan Pillow agar proses anak ringan.
+import os
+import hashlib
+import tempfile
+from pdf2image import convert_from_path
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject, DictionaryObject, ArrayObject, StreamObject
+from .slide_variants import write_variants
+from .blob_store import file_digest, staged_image, blob_file
+
+
+# Kunci halaman yang tidak memengaruhi tampilan dan bisa berubah setiap kali PDF diekspor ulang
+_VOLATILE_KEYS = {"/Parent", "/P", "/StructParents", "/LastModified", "/PieceInfo", "/Metadata", "/Thumb"}
+
+
+def page_fingerprints(pdf_path: str, dpi: int):
+    """
+    Sidik jari setiap halaman PDF: sha256 dari isi halaman beserta semua
+    resource yang dipakainya (font, gambar, XObject), tanpa nomor objek
+    internal PDF. Halaman yang tampil sama menghasilkan sidik jari yang sama
+    walaupun PDF diekspor ulang setelah halaman lain diubah. DPI ikut dihitung
+    agar perubahan PDF_RENDER_DPI memicu render ulang.
+    """
+    reader = PdfReader(pdf_path)
+    # (nomor objek, generasi) -> digest; font dan gambar bersama cukup di-hash sekali
+    memo = {}
+    fingerprints = []
+    for page in reader.pages:
+        sha = hashlib.sha256(f"dpi={dpi};".encode())
+        sha.update(_object_digest(page, memo, skip_keys=_VOLATILE_KEYS))
+        fingerprints.append(sha.hexdigest())
+    return fingerprints
+
+
+def _object_digest(obj, memo, skip_keys=()):
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in memo:
+            # Penanda sementara memutus referensi melingkar
+            memo[key] = b"cycle"
+            memo[key] = _object_digest(obj.get_object(), memo)
+        return memo[key]
+    sha = hashlib.sha256()
+    if isinstance(obj, StreamObject):
+        sha.update(b"stream")
+        sha.update(obj.get_data())
+    if isinstance(obj, DictionaryObject):
+        sha.update(b"dict")
+        for name in sorted(obj.keys()):
+            if name in skip_keys or name in ("/Length", "/Filter", "/DecodeParms"):
+                continue
+            sha.update(name.encode())
+            sha.update(_object_digest(obj.raw_get(name), memo))
+    elif isinstance(obj, ArrayObject):
+        sha.update(b"array")
+        for item in obj:
+            sha.update(_object_digest(item, memo))
+    elif not isinstance(obj, StreamObject):
+        sha.update(repr(obj).encode())
+    return sha.digest()
+
+
+def render_page_range(pdf_path: str, staging_dir: str, first_page: int, last_page: int, dpi: int, thread_count: int):
+    """
+    Merender halaman first_page..last_page (inklusif) menjadi PNG di staging_dir.
+    Setiap gambar diberi nama sesuai hash isinya ({sha256}.png); mengembalikan
+    daftar (nomor halaman, hash) yang kemudian dipindah ke blobs/ oleh orkestrator.
+
+    Render bersifat streaming: pdftoppm menulis setiap halaman langsung ke
+    disk (output_folder + paths_only) dan membebaskannya sebelum halaman
+    berikutnya. Turunan WebP (lihat slide_variants) dibuat dari PNG tersebut
+    satu halaman demi satu halaman, dan dilewati jika gambar yang sama sudah
+    ada di blobs/, sehingga memori puncak sebanding dengan satu halaman.
+    """
+    # Folder sementara di dalam staging_dir agar os.replace tetap satu filesystem
+    with tempfile.TemporaryDirectory(dir=staging_dir, prefix=".render-") as tmp_dir:
+        paths = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            thread_count=thread_count,
+            fmt="png",
+            output_folder=tmp_dir,
+            output_file="page",
+            paths_only=True,
+        )
+        # paths terurut sesuai nomor halaman (nama file pdftoppm berisi nomor halaman ber-padding)
+        page_numbers = list(range(first_page, last_page + 1))
+        if len(paths) != len(page_numbers):
+            raise RuntimeError(f"Expected {len(page_numbers)} rendered pages, got {len(paths)}")
+        rendered = []
+        for page_number, path in zip(page_numbers, paths):
+            digest = file_digest(path)
+            target = staged_image(staging_dir, digest)
+            os.replace(path, target)
+            if not blob_file(digest, "png").is_file():
+                write_variants(str(target))
+            rendered.append((page_number, digest))
+    return rendered
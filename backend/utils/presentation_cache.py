@@ -0,0 +1,74 @@
+import os
+import time
+import gzip
+import json
+import hashlib
+import threading
+
+# Lama (detik) presentasi yang sudah diserialisasi disimpan
+PRESENTATION_CACHE_TTL_SECONDS = float(os.getenv("PRESENTATION_CACHE_TTL_SECONDS", "30"))
+PRESENTATION_CACHE_MAX_ENTRIES = int(os.getenv("PRESENTATION_CACHE_MAX_ENTRIES", "1024"))
+
+
+# Key settings slide yang hanya boleh dilihat guru (kunci jawaban)
+TEACHER_ONLY_SETTINGS = {"correct_answer", "correct_areas"}
+
+
+class StudentDeck:
+    """Presentasi versi siswa yang sudah diserialisasi: JSON, versi gzip, dan ETag."""
+
+    def __init__(self, presentation: dict):
+        for slide in presentation.get("slides", []):
+            if slide.get("settings"):
+                slide["settings"] = {
+                    key: value for key, value in slide["settings"].items() if key not in TEACHER_ONLY_SETTINGS
+                }
+        self.body = json.dumps(presentation, separators=(",", ":")).encode()
+        # Dikompresi sekali dengan level maksimum; setiap siswa hanya menerima byte yang sama
+        self.gzip_body = gzip.compress(self.body, compresslevel=9)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+class PresentationDetailCache:
+    """
+    Cache read-through StudentDeck per presentasi untuk rute publik
+    GET /sessions/{code}/presentation.
+
+    Presentasi yang sama diserialisasi sekali lalu dikirim apa adanya ke
+    setiap siswa yang bergabung. Entri dibuang saat judul, slide, atau
+    aktivitas slide diubah, dan kedaluwarsa setelah TTL agar worker lain ikut
+    menyusul. Rute pemilik GET /presentations/{id} (dengan kunci jawaban)
+    tidak memakai cache ini dan selalu membaca database, sehingga guru yang
+    sedang menyunting tidak pernah melihat entri usang dari worker lain.
+
+    Lokal per worker dan dipakai dari thread pool FastAPI, jadi perubahan
+    dilindungi lock.
+    """
+
+    def __init__(self, ttl: float = PRESENTATION_CACHE_TTL_SECONDS, max_entries: int = PRESENTATION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # presentation_id -> (expires_at, StudentDeck)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, presentation_id):
+        entry = self._entries.get(str(presentation_id))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, presentation_id, deck: StudentDeck):
+        key = str(presentation_id)
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # Buang entri tertua (dict menyimpan urutan penyisipan)
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + self.ttl, deck)
+
+    def invalidate(self, presentation_id):
+        with self._lock:
+            self._entries.pop(str(presentation_id), None)
+
+
+presentation_cache = PresentationDetailCache()
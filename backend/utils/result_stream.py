@@ -0,0 +1,78 @@
+from .live_state import LiveStateStore
+
+
+class ResultStream:
+    """
+    Hasil sebuah aktivitas live dalam bentuk map berversi (key -> value).
+
+    Setiap broadcast hanya membawa key yang berubah sejak broadcast sebelumnya
+    beserta nomor urut (seq). Klien yang melewatkan satu seq cukup meminta
+    snapshot penuh. Nilai yang dikirim selalu nilai absolut, bukan selisih,
+    sehingga frame yang sama aman diterapkan lebih dari sekali.
+
+    Nilai dan seq disimpan di LiveStateStore sehingga bisa ditulis oleh
+    beberapa worker; daftar key yang berubah dicatat per worker, dan setiap
+    worker hanya menyiarkan perubahan yang ia terima sendiri.
+
+    Contoh isi: poll {opsi: jumlah}, word cloud {kata: frekuensi},
+    bubble quiz {"cell:{i}": jumlah klik} (lihat BubbleQuizAggregator).
+    """
+
+    def __init__(self, store: LiveStateStore, session_code: str, activity: str):
+        self.store = store
+        self.values_key = f"results:{session_code}:{activity}"
+        self.seq_key = f"results_seq:{session_code}:{activity}"
+        self.slide_key = f"results_slide:{session_code}:{activity}"
+        self._dirty = set()
+
+    @staticmethod
+    def keys_for(session_code: str, activity: str):
+        return [
+            f"results:{session_code}:{activity}",
+            f"results_seq:{session_code}:{activity}",
+            f"results_slide:{session_code}:{activity}",
+        ]
+
+    async def start(self, slide_id: str, initial: dict | None = None):
+        self._dirty.clear()
+        await self.store.delete(self.values_key)
+        await self.store.hset_many(self.values_key, initial or {})
+        await self.store.set(self.seq_key, 0)
+        await self.store.set(self.slide_key, slide_id)
+
+    async def slide_id(self):
+        return await self.store.get(self.slide_key)
+
+    async def has(self, key) -> bool:
+        return await self.store.hexists(self.values_key, key)
+
+    async def increment(self, key, amount: int = 1):
+        value = await self.store.hincrby(self.values_key, key, amount)
+        self._dirty.add(key)
+        return value
+
+    async def set(self, key, value):
+        await self.store.hset(self.values_key, key, value)
+        self._dirty.add(key)
+
+    async def take_delta(self):
+        """Frame berisi key yang berubah sejak frame terakhir, atau None jika tidak ada."""
+        if not self._dirty:
+            return None
+        keys = list(self._dirty)
+        self._dirty.clear()
+        values = await self.store.hmget(self.values_key, keys)
+        changes = {key: value for key, value in zip(keys, values) if value is not None}
+        if not changes:
+            return None
+        seq = await self.store.incr(self.seq_key)
+        return {"slide_id": await self.slide_id(), "seq": seq, "full": False, "values": changes}
+
+    async def snapshot(self):
+        """Frame berisi seluruh state pada seq saat ini."""
+        return {
+            "slide_id": await self.slide_id(),
+            "seq": int(await self.store.get(self.seq_key) or 0),
+            "full": True,
+            "values": await self.store.hgetall(self.values_key),
+        }
@@ -0,0 +1,159 @@
+import os
+import asyncio
+import logging
+from sqlalchemy.exc import IntegrityError
+from ..database import AsyncSessionLocal
+from ..crud import score as crud_score
+from .leaderboard import Leaderboard
+from .live_state import live_state
+
+# Interval (detik) penulisan skor yang tertunda ke tabel 'scores'
+SCORE_FLUSH_INTERVAL_SECONDS = float(os.getenv("SCORE_FLUSH_INTERVAL_SECONDS", "2"))
+# Jumlah baris leaderboard yang dikirim ke klien
+LEADERBOARD_TOP_K = int(os.getenv("LEADERBOARD_TOP_K", "50"))
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreLedger:
+    """
+    Buku skor in-memory per sesi dengan penulisan tertunda (write-behind).
+
+    Poin langsung diterapkan di memori sehingga handler Socket.IO tidak perlu
+    menunggu Postgres. Delta poin dikumpulkan per siswa lalu ditulis ke database
+    secara batch oleh timer, dan sekali lagi ketika sesi berakhir.
+    Setiap sesi juga memiliki Leaderboard terurut di LiveStateStore yang
+    diperbarui bersamaan, sehingga database hanya dibaca saat sesi pertama
+    kali dimuat. Delta tertunda disimpan per worker; karena upsert-nya
+    menambahkan poin, beberapa worker aman melakukan flush untuk sesi yang sama.
+    """
+
+    def __init__(self, store=live_state, flush_interval: float = SCORE_FLUSH_INTERVAL_SECONDS):
+        self.store = store
+        self.flush_interval = flush_interval
+        # session_id yang leaderboard-nya sudah dipastikan termuat di store
+        self._loaded = set()
+        # session_id -> {student_id: {"student_id", "student_name", "points"}}
+        self._pending = {}
+        self._load_locks = {}
+        self._flush_task = None
+
+    # --- Siklus hidup timer ---
+
+    def start(self):
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            # Shutdown tetap dilanjutkan; delta yang gagal sudah dicatat oleh flush()
+            logger.exception("Flush skor terakhir saat shutdown gagal")
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    # --- Skor ---
+
+    def board(self, session_id) -> Leaderboard:
+        return Leaderboard(self.store, session_id)
+
+    async def ensure_loaded(self, session_id):
+        """Memuat skor yang sudah tersimpan di database saat sesi pertama kali disentuh."""
+        if session_id in self._loaded:
+            return
+        lock = self._load_locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            if session_id in self._loaded:
+                return
+            # Hanya satu worker yang memuat dari database untuk setiap sesi
+            if await self.store.set(f"scores_loaded:{session_id}", 1, nx=True):
+                rows = await self._load_from_db(session_id)
+                await self.board(session_id).set_scores(rows)
+            self._loaded.add(session_id)
+        self._load_locks.pop(session_id, None)
+
+    @staticmethod
+    async def _load_from_db(session_id):
+        async with AsyncSessionLocal() as db:
+            return [
+                {"student_id": s.student_id, "student_name": s.student_name, "score": s.score}
+                for s in await crud_score.get_leaderboard_async(db, session_id)
+            ]
+
+    async def add_points(self, session_id, student_id: str, student_name: str, points: int):
+        await self.ensure_loaded(session_id)
+
+        score = await self.board(session_id).add_points(student_id, student_name, points)
+
+        pending = self._pending.setdefault(session_id, {}).setdefault(
+            student_id, {"student_id": student_id, "student_name": student_name, "points": 0}
+        )
+        pending["student_name"] = student_name
+        pending["points"] += points
+        return score
+
+    async def leaderboard(self, session_id, limit: int | None = LEADERBOARD_TOP_K):
+        """Top-K leaderboard siap kirim (list of dict dengan field ScoreDisplay)."""
+        return await self.board(session_id).top(limit)
+
+    async def rank(self, session_id, student_id: str):
+        """Peringkat dan skor seorang siswa, atau None jika belum punya skor."""
+        return await self.board(session_id).rank(student_id)
+
+    # --- Penulisan ke database ---
+
+    async def flush(self, session_id=None):
+        """
+        Menulis delta poin yang tertunda. Jika session_id None, semua sesi di-flush.
+
+        Kegagalan satu sesi tidak menghentikan flush sesi lain. Kesalahan
+        sementara (koneksi putus, timeout) mengembalikan delta ke antrean;
+        IntegrityError (misalnya sesi sudah dihapus) tidak akan pernah berhasil
+        diulang, sehingga deltanya dibuang dan dicatat di log.
+        """
+        session_ids = [session_id] if session_id is not None else list(self._pending.keys())
+        for sid in session_ids:
+            pending = self._pending.pop(sid, None)
+            if not pending:
+                continue
+            entries = list(pending.values())
+            try:
+                await self._write_to_db(sid, entries)
+            except IntegrityError as e:
+                logger.error("Membuang %d delta skor sesi %s yang tidak bisa disimpan: %s; delta: %s",
+                             len(entries), sid, e.orig, entries)
+            except Exception:
+                # Kembalikan delta agar dicoba lagi pada flush berikutnya
+                logger.exception("Gagal menyimpan skor sesi %s, dicoba lagi pada flush berikutnya", sid)
+                self._requeue(sid, entries)
+
+    @staticmethod
+    async def _write_to_db(session_id, entries):
+        async with AsyncSessionLocal() as db:
+            await crud_score.bulk_add_points_async(db, session_id, entries)
+
+    def _requeue(self, session_id, entries):
+        pending = self._pending.setdefault(session_id, {})
+        for entry in entries:
+            current = pending.setdefault(entry["student_id"], {**entry, "points": 0})
+            current["points"] += entry["points"]
+
+    async def close_session(self, session_id, persist: bool = True):
+        """Membuang data sesi dari memori, dengan flush terakhir jika persist=True."""
+        if persist:
+            await self.flush(session_id)
+        else:
+            self._pending.pop(session_id, None)
+        self._loaded.discard(session_id)
+        await self.board(session_id).clear()
+        await self.store.delete(f"scores_loaded:{session_id}")
+
+
+score_ledger = ScoreLedger()
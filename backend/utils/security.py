@@ -7,10 +7,15 @@ from ..database import get_db
 from ..models.user import User
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from .auth_cache import auth_cache
+from .password_hasher import PasswordHasher, PasswordHasherBusyError
 
 # Konfigurasi Hashing Password
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Cost bcrypt; hash lama dengan cost berbeda diperbarui otomatis saat login berhasil
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+password_hasher = PasswordHasher(pwd_context)
 
 # Konfigurasi JWT dari .env
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
@@ -21,11 +26,25 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 # Ini akan menghasilkan dialog otorisasi yang benar di Swagger UI
 bearer_scheme = HTTPBearer()
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def _hasher_busy():
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Server is busy, please try again",
+        headers={"Retry-After": "1"},
+    )
+
+async def verify_and_update_password(plain_password, hashed_password):
+    """(cocok, hash_baru); hash_baru tidak None jika hash perlu dibuat ulang dengan cost saat ini."""
+    try:
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
+    except PasswordHasherBusyError:
+        raise _hasher_busy()
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusyError:
+        raise _hasher_busy()
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
@@ -45,7 +64,12 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_
     )
     
     token = credentials.credentials
-    
+
+    # Jalur cepat: token yang sudah pernah diverifikasi tidak di-decode ulang dan user tidak di-query
+    snapshot = auth_cache.get(token)
+    if snapshot is not None:
+        return _attach_user(db, snapshot)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -58,4 +82,13 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_
     user = db.query(User).filter(User.email == token_data.email).first()
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    if "exp" in payload:
+        auth_cache.put(token, payload["exp"], user)
+    return user
+
+def _attach_user(db: Session, snapshot: dict):
+    # Objek User dari snapshot ditempelkan ke sesi tanpa SELECT (merge load=False);
+    # kolom yang tidak ada di snapshot dimuat dari database saat diakses
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
\ No newline at end of file
@@ -0,0 +1,79 @@
+import os
+import time
+import threading
+from ..schemas.session import SessionDisplay
+
+# Lama (detik) hasil resolusi kode sesi disimpan
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+# Kode yang tidak ditemukan juga di-cache, lebih singkat, untuk meredam banjir join dengan kode salah
+SESSION_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_NEGATIVE_TTL_SECONDS", "5"))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
+
+
+class SessionCodeCache:
+    """
+    Cache resolusi kode sesi -> SessionDisplay (id, presentation_id, code, start_time).
+
+    Kode sesi tidak berubah selama sesi hidup, jadi handler Socket.IO dan
+    endpoint validasi tidak perlu query ke tabel sessions untuk setiap event.
+    Entri kedaluwarsa setelah TTL dan dibuang secara eksplisit saat sesi
+    diakhiri atau dihapus. Cache ini lokal per worker dan dipakai dari event
+    loop maupun thread pool FastAPI, sehingga perubahan dilindungi lock.
+    """
+
+    MISSING = object()
+
+    def __init__(
+        self,
+        ttl: float = SESSION_CACHE_TTL_SECONDS,
+        negative_ttl: float = SESSION_CACHE_NEGATIVE_TTL_SECONDS,
+        max_entries: int = SESSION_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        # code -> (expires_at, SessionDisplay | None)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, code: str):
+        """SessionDisplay, None (kode diketahui tidak ada), atau MISSING jika belum di-cache."""
+        entry = self._entries.get(code)
+        if entry is None:
+            return self.MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.invalidate(code)
+            return self.MISSING
+        return value
+
+    def put(self, code: str, session_obj):
+        value = SessionDisplay.model_validate(session_obj) if session_obj is not None else None
+        ttl = self.ttl if value is not None else self.negative_ttl
+        with self._lock:
+            if code not in self._entries and len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[code] = (time.monotonic() + ttl, value)
+        return value
+
+    def _evict(self):
+        now = time.monotonic()
+        for code, (expires_at, _) in list(self._entries.items()):
+            if expires_at < now:
+                del self._entries[code]
+        # Masih penuh: buang entri tertua (dict menyimpan urutan penyisipan)
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, code: str):
+        with self._lock:
+            self._entries.pop(code, None)
+
+    def invalidate_presentation(self, presentation_id):
+        with self._lock:
+            for code, (_, value) in list(self._entries.items()):
+                if value is not None and value.presentation_id == presentation_id:
+                    del self._entries[code]
+
+
+session_cache = SessionCodeCache()
@@ -0,0 +1,83 @@
+from ..database import AsyncSessionLocal
+from .live_state import live_state
+from .bubble_quiz import area_tuples, compile_areas
+
+
+class SlideActivityCache:
+    """
+    Cache konfigurasi aktivitas slide (interactive_type dan settings) per worker.
+
+    Handler submit membaca konfigurasi dari sini, sehingga jawaban siswa tidak
+    memicu query Slide. Entri dimuat ulang dari database setiap kali guru
+    memulai aktivitas, dan dibuang ketika slide diubah lewat set_slide_* /
+    remove_slide_activity atau slide-nya diganti.
+
+    Cache ini lokal per worker. Agar worker lain ikut memuat ulang, memulai
+    aktivitas mencatat nomor versi slide di LiveStateStore; worker yang
+    memegang versi lebih lama memuat ulang entrinya sekali.
+
+    Untuk bubble quiz, entri juga memuat area benar dalam dua bentuk:
+    "correct_area_list" (tuple biasa, untuk poin per klik) dan
+    "correct_areas" (array NumPy, untuk hit-testing heatmap per batch).
+    """
+
+    def __init__(self, store=live_state):
+        self.store = store
+        # slide_id -> {"slide_id", "presentation_id", "interactive_type", "settings", "version"}
+        self._entries = {}
+
+    @staticmethod
+    def versions_key(session_code: str):
+        return f"slide_versions:{session_code}"
+
+    async def get(self, session_code: str, slide_id):
+        """Konfigurasi slide dari cache; database hanya dibaca jika entri belum ada atau usang."""
+        slide_id = str(slide_id)
+        version = await self.store.hget(self.versions_key(session_code), slide_id) or 0
+        entry = self._entries.get(slide_id)
+        if entry is None or entry["version"] < version:
+            entry = await self._load(slide_id, version)
+        return entry
+
+    async def refresh(self, session_code: str, slide_id):
+        """Memuat ulang slide dari database dan menandai versi barunya untuk semua worker."""
+        slide_id = str(slide_id)
+        version = await self.store.incr("slide_version")
+        entry = await self._load(slide_id, version)
+        if entry is not None:
+            await self.store.hset(self.versions_key(session_code), slide_id, version)
+        return entry
+
+    async def _load(self, slide_id: str, version: int):
+        # Impor di sini: crud.presentation mengimpor modul ini untuk invalidasi
+        from ..crud import presentation as crud_presentation
+        async with AsyncSessionLocal() as db:
+            slide = await crud_presentation.get_slide_by_id_async(db, slide_id)
+        if slide is None:
+            self._entries.pop(slide_id, None)
+            return None
+        entry = {
+            "slide_id": slide_id,
+            "presentation_id": str(slide.presentation_id),
+            "interactive_type": slide.interactive_type,
+            "settings": slide.settings or {},
+            "version": version,
+        }
+        if slide.interactive_type == "bubble_quiz":
+            entry["correct_area_list"] = area_tuples(entry["settings"])
+            entry["correct_areas"] = compile_areas(entry["correct_area_list"])
+        self._entries[slide_id] = entry
+        return entry
+
+    # Dipanggil dari fungsi CRUD (thread pool FastAPI); operasi dict tunggal aman di sini
+    def invalidate(self, slide_id):
+        self._entries.pop(str(slide_id), None)
+
+    def invalidate_presentation(self, presentation_id):
+        presentation_id = str(presentation_id)
+        for slide_id, entry in list(self._entries.items()):
+            if entry["presentation_id"] == presentation_id:
+                self._entries.pop(slide_id, None)
+
+
+slide_cache = SlideActivityCache()
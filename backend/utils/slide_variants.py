@@ -0,0 +1,52 @@
+import os
+from PIL import Image
+
+# Turunan gambar setiap slide: nama -> lebar maksimum (px).
+# Gambar tidak pernah diperbesar; slide yang lebih kecil disimpan apa adanya.
+SLIDE_VARIANTS = {
+    "thumb": 320,
+    "mobile": 960,
+    "full": 1920,
+}
+SLIDE_WEBP_QUALITY = int(os.getenv("SLIDE_WEBP_QUALITY", "80"))
+
+
+def variant_path(source_path: str, variant: str) -> str:
+    """'uploads/p/slide_3.png' -> 'uploads/p/slide_3.mobile.webp'."""
+    stem, _ = os.path.splitext(source_path)
+    return f"{stem}.{variant}.webp"
+
+
+def source_path_of_variant(path: str):
+    """Kebalikan variant_path; None jika path bukan nama file turunan."""
+    stem, ext = os.path.splitext(path)
+    if ext != ".webp":
+        return None
+    stem, variant = os.path.splitext(stem)
+    if variant.lstrip(".") not in SLIDE_VARIANTS:
+        return None
+    return f"{stem}.png"
+
+
+def variant_for_width(width: int) -> str:
+    """Turunan terkecil yang lebarnya cukup untuk `width` px."""
+    for name, max_width in sorted(SLIDE_VARIANTS.items(), key=lambda item: item[1]):
+        if width <= max_width:
+            return name
+    return "full"
+
+
+def write_variants(source_file: str):
+    """Membuat semua turunan WebP di samping file PNG sumber, satu gambar di memori."""
+    with Image.open(source_file) as image:
+        image = image.convert("RGB")
+        for variant, max_width in SLIDE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((max_width, max_width * 10))
+            # Tulis ke file sementara lalu rename, karena halaman identik bisa diproses dua proses sekaligus
+            target = variant_path(source_file, variant)
+            tmp_target = f"{target}.{os.getpid()}.tmp"
+            resized.save(tmp_target, "WEBP", quality=SLIDE_WEBP_QUALITY, method=4)
+            os.replace(tmp_target, target)
+            resized.close()
+        image.close()
@@ -1,50 +1,59 @@
 import React, { useState, useMemo } from 'react';
-import { Stage, Layer, Circle, Text, Group } from 'react-konva';
+import { Stage, Layer, Circle, Rect, Text, Group } from 'react-konva';
 import Modal from './Modal';
 
-const BubbleQuizDisplay = ({ clicks, correctAreas, width, height }) => {
+// results: nilai hasil bubble quiz dari server (lihat BubbleQuizAggregator di backend):
+// { grid, 'cell:{i}': jumlah klik di sel heatmap i, 'area:{j}': jumlah klik di area benar j }.
+// Ukurannya tetap berapa pun jumlah kliknya; nama siswa per area dimuat lewat loadAreaNames.
+const BubbleQuizDisplay = ({ results, correctAreas, width, height, loadAreaNames }) => {
     const [viewingNames, setViewingNames] = useState(null);
 
-    // useMemo untuk menghitung data gelembung secara efisien
-    const aggregatedData = useMemo(() => {
-        if (!correctAreas || correctAreas.length === 0 || !clicks) return [];
+    // useMemo untuk menghitung sel heatmap secara efisien
+    const heatmap = useMemo(() => {
+        const grid = results?.grid;
+        if (!grid) return [];
+        const cells = Object.entries(results)
+            .filter(([key, count]) => key.startsWith('cell:') && count > 0)
+            .map(([key, count]) => ({ index: Number(key.slice(5)), count }));
+        const max = Math.max(1, ...cells.map(cell => cell.count));
+        return cells.map(({ index, count }) => ({
+            x: (index % grid) / grid,
+            y: Math.floor(index / grid) / grid,
+            size: 1 / grid,
+            opacity: 0.15 + 0.65 * (count / max),
+        }));
+    }, [results]);
 
-        return correctAreas.map(area => {
-            const clicksInArea = clicks.filter(click => {
-                if (typeof click?.x !== 'number' || typeof click?.y !== 'number') {
-                    return false;
-                }
-                const distance = Math.sqrt(Math.pow(click.x - area.x, 2) + Math.pow(click.y - area.y, 2));
-                return distance <= area.r;
-            });
-            return {
-                ...area,
-                count: clicksInArea.length,
-                names: clicksInArea.map(c => c.name)
-            };
-        });
-    }, [clicks, correctAreas]);
+    const aggregatedData = useMemo(() => (correctAreas || []).map((area, index) => ({
+        ...area,
+        index,
+        count: results?.[`area:${index}`] || 0,
+    })), [results, correctAreas]);
+
+    const showNames = async (bubble) => {
+        setViewingNames({ count: bubble.count, names: [] });
+        if (!loadAreaNames) return;
+        const names = await loadAreaNames(bubble.index);
+        setViewingNames({ count: bubble.count, names: names || [] });
+    };
 
     return (
         <>
             <Stage width={width} height={height}>
                 <Layer>
-                    {/* Menampilkan semua titik klik dari siswa */}
-                    {clicks.map((click, index) => {
-                         if (typeof click?.x !== 'number' || typeof click?.y !== 'number') return null;
-                         return (
-                            <Circle
-                                key={`click-${index}`}
-                                x={click.x * width}
-                                y={click.y * height}
-                                radius={4}
-                                fill={click.is_correct ? '#22C55E' : '#EF4444'}
-                                opacity={0.9}
-                                shadowColor="black"
-                                shadowBlur={5}
-                            />
-                        );
-                    })}
+                    {/* Heatmap kepadatan klik siswa */}
+                    {heatmap.map((cell) => (
+                        <Rect
+                            key={`cell-${cell.x}-${cell.y}`}
+                            x={cell.x * width}
+                            y={cell.y * height}
+                            width={cell.size * width}
+                            height={cell.size * height}
+                            fill="#EF4444"
+                            opacity={cell.opacity}
+                            listening={false}
+                        />
+                    ))}
                     
                     {/* Menampilkan gelembung hasil agregat */}
                     {aggregatedData.map((bubble, index) => (
@@ -53,8 +62,8 @@ const BubbleQuizDisplay = ({ clicks, correctAreas, width, height }) => {
                             x={bubble.x * width}
                             y={bubble.y * height}
                             // PERBAIKAN KUNCI DI SINI:
-                            onClick={() => setViewingNames(bubble)}
-                            onTap={() => setViewingNames(bubble)}
+                            onClick={() => showNames(bubble)}
+                            onTap={() => showNames(bubble)}
                             onMouseEnter={e => {
                                 // Mengubah kursor menjadi pointer saat mouse di atas gelembung
                                 const container = e.target.getStage().container();
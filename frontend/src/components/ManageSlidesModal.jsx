@@ -1,6 +1,6 @@
 import React from 'react';
 import Modal from './Modal';
-import api from '../services/api';
+import { slideImageProps } from '../services/slideImages';
 
 const ManageSlidesModal = ({ isOpen, onClose, presentation, onAddPoll, onAddWordCloud, onAddQuiz, onAddBubbleQuiz, onDeleteActivity }) => {
     if (!presentation) return null;
@@ -40,7 +40,7 @@ const ManageSlidesModal = ({ isOpen, onClose, presentation, onAddPoll, onAddWord
                         <div key={slide.id} className="border border-gray-200 dark:border-gray-700 rounded-lg p-2 flex flex-col items-center shadow-sm bg-gray-50 dark:bg-gray-800">
                             <div className="w-full mb-2">
                                 <img 
-                                    src={`${api.defaults.baseURL}/${slide.content_url}`} 
+                                    {...slideImageProps(slide, '200px')}
                                     alt={`Slide ${slide.page_number}`}
                                     className="w-full h-auto object-contain rounded-md"
                                 />
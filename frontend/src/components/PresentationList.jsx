@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
+import api from '../services/api';
 import * as presentationService from '../services/presentationService';
 import PresentationModal from './PresentationModal';
 import DeleteConfirmationModal from './DeleteConfirmationModal';
@@ -30,11 +31,13 @@ const PresentationList = ({ isCreateModalOpen, setCreateModalOpen }) => {
 
     const [uploading, setUploading] = useState(false);
     const [uploadProgress, setUploadProgress] = useState(0);
+    // Tahap setelah file terkirim: slide dirender di server
+    const [processing, setProcessing] = useState(null);
 
     const fetchPresentations = async () => {
         setLoading(true);
         try {
-            const response = await presentationService.getPresentations();
+            const response = await presentationService.getPresentations({ summary: true });
             setPresentations(response.data);
         } catch (err) {
             setError('Failed to fetch presentations.');
@@ -84,6 +87,16 @@ const PresentationList = ({ isCreateModalOpen, setCreateModalOpen }) => {
         fileInputRef.current.click();
     };
 
+    // Menunggu job konversi PDF selesai sambil menampilkan jumlah halaman yang sudah jadi
+    const waitForIngestJob = async (jobId) => {
+        while (true) {
+            const { data: job } = await presentationService.getIngestJob(jobId);
+            setProcessing(job);
+            if (job.status === 'done' || job.status === 'failed') return job;
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+        }
+    };
+
     const handleFileChange = async (event) => {
         const file = event.target.files[0];
         const presentationId = fileInputRef.current.dataset.presentationId;
@@ -91,7 +104,7 @@ const PresentationList = ({ isCreateModalOpen, setCreateModalOpen }) => {
             setUploading(true);
             setUploadProgress(0);
             try {
-                await presentationService.uploadPdf(
+                const { data: job } = await presentationService.uploadPdf(
                     presentationId,
                     file,
                     (progressEvent) => {
@@ -99,6 +112,10 @@ const PresentationList = ({ isCreateModalOpen, setCreateModalOpen }) => {
                         setUploadProgress(percent);
                     }
                 );
+                const finishedJob = await waitForIngestJob(job.job_id);
+                if (finishedJob.status === 'failed') {
+                    throw new Error(finishedJob.error);
+                }
                 message.success("File uploaded successfully!");
                 if (managingSlidesOf) {
                     const response = await presentationService.getPresentationById(presentationId);
@@ -110,13 +127,24 @@ const PresentationList = ({ isCreateModalOpen, setCreateModalOpen }) => {
             } finally {
                 setUploading(false);
                 setUploadProgress(0);
+                setProcessing(null);
                 event.target.value = null;
             }
         }
     };
 
+    // Daftar hanya berisi ringkasan; slide lengkap dimuat saat presentasi dibuka
+    const handleManageSlides = async (presentation) => {
+        try {
+            const response = await presentationService.getPresentationById(presentation.id);
+            setManagingSlidesOf(response.data);
+        } catch (err) {
+            alert("Failed to load slides.");
+        }
+    };
+
     const handleStartSession = async (presentation) => {
-        if (!presentation.slides || presentation.slides.length === 0) {
+        if (!presentation.slide_count) {
             alert("This presentation has no slides. Please upload a PDF first.");
             return;
         }
@@ -190,9 +218,17 @@ const PresentationList = ({ isCreateModalOpen, setCreateModalOpen }) => {
         <>
             {uploading && (
                 <div className="fixed inset-0 flex flex-col items-center justify-center bg-black bg-opacity-30 z-50">
-                    <Spin size="large" tip="Uploading..." />
+                    <Spin size="large" tip={processing ? "Processing slides..." : "Uploading..."} />
                     <div className="w-64 mt-4">
-                        <Progress percent={uploadProgress} status="active" />
+                        {processing ? (
+                            <Progress
+                                percent={processing.total_pages ? Math.round((processing.done_pages * 100) / processing.total_pages) : 0}
+                                format={() => `${processing.done_pages}/${processing.total_pages ?? '?'}`}
+                                status="active"
+                            />
+                        ) : (
+                            <Progress percent={uploadProgress} status="active" />
+                        )}
                     </div>
                 </div>
             )}
@@ -205,10 +241,18 @@ const PresentationList = ({ isCreateModalOpen, setCreateModalOpen }) => {
                     <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
                         {presentations.map((pres) => (
                             <div key={pres.id} className="bg-white dark:bg-gray-800 p-6 rounded-lg shadow hover:shadow-lg transition-shadow flex flex-col justify-between">
-                                <div className="cursor-pointer" onClick={() => setManagingSlidesOf(pres)}>
+                                <div className="cursor-pointer" onClick={() => handleManageSlides(pres)}>
+                                    {pres.thumbnail_url && (
+                                        <img
+                                            src={`${api.defaults.baseURL}/${pres.thumbnail_url}`}
+                                            alt=""
+                                            loading="lazy"
+                                            className="w-full aspect-video object-cover rounded mb-3 bg-gray-100 dark:bg-gray-700"
+                                        />
+                                    )}
                                     <h3 className="text-xl font-bold text-gray-900 dark:text-gray-100">{pres.title}</h3>
                                     <p className="text-sm text-gray-600 dark:text-gray-400 mt-2">
-                                        {pres.slides.length} slide(s)
+                                        {pres.slide_count} slide(s)
                                     </p>
                                     <p className="text-xs text-gray-400 dark:text-gray-500 mt-1">
                                         Created on: {new Date(pres.created_at).toLocaleDateString()}
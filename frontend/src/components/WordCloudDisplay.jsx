@@ -5,19 +5,13 @@ const colorPalette = ['#38bdf8', '#818cf8', '#c084fc', '#e879f9', '#f472b6'];
 const fontSizeMapper = (word) => Math.log2(word.value) * 12 + 18;
 const rotate = () => 0;
 
-const WordCloudDisplay = ({ results }) => { // 'results' sekarang adalah list kata, e.g., ["a", "b", "a"]
+const WordCloudDisplay = ({ results }) => { // 'results' adalah frekuensi dari server, e.g., {"a": 2, "b": 1}
     const [words, setWords] = useState([]);
 
-    // PERBAIKAN: Gunakan useMemo untuk menghitung frekuensi hanya jika 'results' berubah
+    // Frekuensi sudah diagregasi server, cukup ubah ke format d3-cloud
     const frequencyMap = useMemo(() => {
-        if (!results || results.length === 0) return [];
-        
-        const count = {};
-        for (const word of results) {
-            count[word] = (count[word] || 0) + 1;
-        }
-        
-        return Object.entries(count).map(([text, value]) => ({ text, value }));
+        if (!results) return [];
+        return Object.entries(results).map(([text, value]) => ({ text, value }));
     }, [results]);
 
     useEffect(() => {
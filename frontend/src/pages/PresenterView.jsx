@@ -3,6 +3,10 @@ import { useParams, useNavigate } from 'react-router-dom';
 import io from 'socket.io-client';
 import api from '../services/api';
 import * as presentationService from '../services/presentationService';
+import { createResultListener } from '../services/resultStream';
+import { createRosterListener } from '../services/roster';
+import { slideImageProps, prefetchSlideImages } from '../services/slideImages';
+import { BINARY_FRAMES_SUPPORTED, withFrameDecoding } from '../services/frameCodec';
 import ThemeToggleButton from '../components/ThemeToggleButton';
 import DrawingCanvas from '../components/DrawingCanvas';
 import DrawingToolbar from '../components/DrawingToolbar';
@@ -11,6 +15,9 @@ import RandomPickerOverlay from '../components/RandomPickerOverlay';
 import SessionSidebar from '../components/SessionSidebar';
 import ConfirmationModal from '../components/ConfirmationModal';
 
+// Lebar tampilan slide, dipakai untuk <img sizes> dan prefetch
+const SLIDE_IMAGE_SIZES = '(max-width: 1152px) 100vw, 1152px';
+
 const PresenterView = () => {
     const { presentationId, sessionCode } = useParams();
     const navigate = useNavigate();
@@ -19,6 +26,8 @@ const PresenterView = () => {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const socketRef = useRef(null);
+    const resultStreamsRef = useRef({});
+    const rosterRef = useRef(null);
     const [participants, setParticipants] = useState([]);
     const [isStarted, setIsStarted] = useState(false);
     const [isQuizActive, setIsQuizActive] = useState(false);
@@ -33,7 +42,7 @@ const PresenterView = () => {
     const [canvasSize, setCanvasSize] = useState({ width: 0, height: 0 });
     const [tool, setTool] = useState({ tool: 'pen', color: '#EF4444', strokeWidth: 5 });
     const [isBubbleQuizActive, setIsBubbleQuizActive] = useState(false);
-    const [bubbleQuizClicks, setBubbleQuizClicks] = useState([]);
+    const [bubbleQuizResults, setBubbleQuizResults] = useState({});
     const [pickerData, setPickerData] = useState(null);
     const [showEndConfirm, setShowEndConfirm] = useState(false);
 
@@ -71,14 +80,17 @@ const PresenterView = () => {
         const socket = io('http://127.0.0.1:8000');
         socketRef.current = socket;
         socket.on('connect', () => {
-            socket.emit('teacher_join', { session_code: sessionCode });
+            socket.emit('teacher_join', { session_code: sessionCode, binary_frames: BINARY_FRAMES_SUPPORTED });
         });
-        socket.on('update_participant_list', (data) => setParticipants(data.participants));
-        socket.on('update_leaderboard', (data) => setLeaderboardData(data));
-        socket.on('update_poll_results', (results) => setPollResults(results));
-        socket.on('update_wordcloud_results', (results) => setWordCloudResults(results));
-        socket.on('update_bubble_quiz_results', (data) => setBubbleQuizClicks(data.clicks));
+        socket.on('update_participant_list', createRosterListener(socket, sessionCode, rosterRef, 'snapshot', setParticipants));
+        socket.on('participant_joined', createRosterListener(socket, sessionCode, rosterRef, 'joined', setParticipants));
+        socket.on('participant_left', createRosterListener(socket, sessionCode, rosterRef, 'left', setParticipants));
+        socket.on('update_leaderboard', withFrameDecoding((data) => setLeaderboardData(data)));
+        socket.on('update_poll_results', createResultListener(socket, sessionCode, 'poll', resultStreamsRef, setPollResults));
+        socket.on('update_wordcloud_results', createResultListener(socket, sessionCode, 'word_cloud', resultStreamsRef, setWordCloudResults));
+        socket.on('update_bubble_quiz_results', withFrameDecoding(createResultListener(socket, sessionCode, 'bubble_quiz', resultStreamsRef, setBubbleQuizResults)));
         socket.on('student_picked', (data) => setPickerData(data));
+        socket.on('prefetch_slides', (data) => prefetchSlideImages(data.slides, SLIDE_IMAGE_SIZES));
         return () => { socket.disconnect(); };
     }, [sessionCode]);
 
@@ -99,7 +111,7 @@ const PresenterView = () => {
             setWordCloudResults(null);
             setIsDrawingActive(false);
             setIsBubbleQuizActive(false);
-            setBubbleQuizClicks([]);
+            setBubbleQuizResults({});
             socketRef.current.emit('change_slide', {
                 session_code: sessionCode,
                 page_number: newPageNumber,
@@ -107,6 +119,12 @@ const PresenterView = () => {
         }
     };
     
+    // Nama siswa per area benar tidak ikut disiarkan; diminta saat guru membuka gelembung
+    const loadBubbleAreaNames = (area) => new Promise((resolve) => {
+        if (!socketRef.current) return resolve([]);
+        socketRef.current.emit('request_bubble_area', { session_code: sessionCode, area }, (data) => resolve(data?.names || []));
+    });
+
     const handleCloseSession = () => {
         if (socketRef.current) {
             socketRef.current.emit('end_session', { session_code: sessionCode });
@@ -122,7 +140,7 @@ const PresenterView = () => {
         if (type === 'quiz') setIsQuizActive(true);
         if (type === 'poll') { setIsPollActive(true); setPollResults(null); }
         if (type === 'word_cloud') { setIsWordCloudActive(true); setWordCloudResults(null); }
-        if (type === 'bubble_quiz') { setIsBubbleQuizActive(true); setBubbleQuizClicks([]); }
+        if (type === 'bubble_quiz') { setIsBubbleQuizActive(true); setBubbleQuizResults({}); }
         socketRef.current.emit(eventName, { session_code: sessionCode, slide_id: currentSlide.id });
     };
     
@@ -131,7 +149,7 @@ const PresenterView = () => {
         setIsDrawingActive(newDrawingState);
         const currentSlideId = presentation?.slides.find(s => s.page_number === currentPage)?.id;
         if (newDrawingState) {
-            socketRef.current.emit('start_drawing', { session_code: sessionCode, lines: drawings[currentSlideId] || [], slide_id: currentSlideId });
+            socketRef.current.emit('start_drawing', { session_code: sessionCode, slide_id: currentSlideId });
         } else {
             socketRef.current.emit('hide_drawing', { session_code: sessionCode });
         }
@@ -151,8 +169,12 @@ const PresenterView = () => {
             }
         }
         setDrawings(prev => ({ ...prev, [currentSlideId]: newLines }));
-        const lastLineData = newLines[newLines.length - 1];
-        socketRef.current.emit('drawing_event', { session_code: sessionCode, drawData: {type: data.type, line: lastLineData, slide_id: currentSlideId} });
+        // Hanya titik baru yang dikirim; server menggabungkannya menjadi frame 'drawing_batch'
+        const drawData = { type: data.type, slide_id: currentSlideId, point: [data.point.x, data.point.y] };
+        if (data.type === 'start') {
+            Object.assign(drawData, { tool: tool.tool, color: tool.color, strokeWidth: tool.strokeWidth / canvasSize.width });
+        }
+        socketRef.current.emit('drawing_event', { session_code: sessionCode, drawData });
     };
 
     const handleClearCanvas = () => {
@@ -176,7 +198,7 @@ const PresenterView = () => {
     }
 
     const currentSlide = presentation?.slides.find(s => s.page_number === currentPage);
-    const slideImageUrl = currentSlide ? `${api.defaults.baseURL}/${currentSlide.content_url}` : '';
+    const slideImage = slideImageProps(currentSlide, SLIDE_IMAGE_SIZES);
 
     if (!isStarted) {
         const qrCodeUrl = `${api.defaults.baseURL}/presentations/sessions/${sessionCode}/qr`;
@@ -290,7 +312,7 @@ const PresenterView = () => {
 
             <main className="flex-grow p-4 flex justify-center relative">
                 <div ref={slideContainerRef} className="w-full max-w-6xl aspect-video bg-black flex items-center justify-center relative">
-                    <img src={slideImageUrl} alt={`Slide ${currentPage}`} className="max-w-full max-h-full object-contain"/>
+                    <img {...slideImage} alt={`Slide ${currentPage}`} className="max-w-full max-h-full object-contain"/>
                     
                     {isDrawingActive && (
                         <div className="absolute top-0 left-0 w-full h-full z-10 cursor-crosshair">
@@ -301,7 +323,7 @@ const PresenterView = () => {
 
                     {isBubbleQuizActive && (
                         <div className="absolute top-0 left-0 w-full h-full z-10">
-                            <BubbleQuizDisplay clicks={bubbleQuizClicks} correctAreas={currentSlide?.settings?.correct_areas || []} width={canvasSize.width} height={canvasSize.height}/>
+                            <BubbleQuizDisplay results={bubbleQuizResults} correctAreas={currentSlide?.settings?.correct_areas || []} width={canvasSize.width} height={canvasSize.height} loadAreaNames={loadBubbleAreaNames}/>
                         </div>
                     )}
                 </div>
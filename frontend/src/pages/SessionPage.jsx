@@ -4,10 +4,12 @@ import React, { useEffect, useState, useRef } from 'react';
 import { useParams, useLocation, useNavigate } from 'react-router-dom';
 import { Stage } from 'react-konva';
 import io from 'socket.io-client';
-import api from '../services/api';
+import { slideImageProps, prefetchSlideImages } from '../services/slideImages';
 import { v4 as uuidv4 } from 'uuid';
 import * as sessionService from '../services/sessionService';
-import * as presentationService from '../services/presentationService';
+import { createResultListener } from '../services/resultStream';
+import { decodeStroke, applyDrawingBatch } from '../services/strokeLog';
+import { BINARY_FRAMES_SUPPORTED, withFrameDecoding } from '../services/frameCodec';
 import ThemeToggleButton from '../components/ThemeToggleButton';
 import SessionSidebar from '../components/SessionSidebar';
 import ConfirmationModal from '../components/ConfirmationModal';
@@ -18,6 +20,9 @@ import DrawingCanvas from '../components/DrawingCanvas';
 import BubbleQuizDisplay from '../components/BubbleQuizDisplay';
 import LeaderboardDisplay from '../components/LeaderboardDisplay';
 
+// Lebar tampilan slide, dipakai untuk <img sizes> dan prefetch
+const SLIDE_IMAGE_SIZES = '(max-width: 1024px) 100vw, 1024px';
+
 const SessionPage = () => {
     const { sessionCode } = useParams();
     const location = useLocation();
@@ -35,6 +40,7 @@ const SessionPage = () => {
     
     // State untuk semua jenis aktivitas
     const [leaderboardData, setLeaderboardData] = useState([]);
+    const [myRank, setMyRank] = useState(null);
     const [pickerData, setPickerData] = useState(null);
     const [activeQuiz, setActiveQuiz] = useState(null);
     const [hasAnsweredQuiz, setHasAnsweredQuiz] = useState(false);
@@ -49,10 +55,11 @@ const SessionPage = () => {
     const [drawings, setDrawings] = useState({});
     const [activeBubbleQuiz, setActiveBubbleQuiz] = useState(null);
     const [hasClickedBubbleQuiz, setHasClickedBubbleQuiz] = useState(false);
-    const [bubbleQuizClicks, setBubbleQuizClicks] = useState([]);
+    const [bubbleQuizResults, setBubbleQuizResults] = useState({});
 
     // Refs
     const socketRef = useRef(null);
+    const resultStreamsRef = useRef({});
     const slideContainerRef = useRef(null);
     const [containerSize, setContainerSize] = useState({ width: 0, height: 0 });
     const resizeObserverRef = useRef(null);
@@ -124,9 +131,8 @@ const SessionPage = () => {
     useEffect(() => {
         const fetchSessionData = async () => {
             try {
-                const sessionResponse = await sessionService.validateSession(sessionCode);
-                const presentationId = sessionResponse.data.presentation_id;
-                const presentationResponse = await presentationService.getPresentationById(presentationId);
+                // Kode sesi divalidasi sekaligus: 404 jika kode tidak valid atau sesi sudah berakhir
+                const presentationResponse = await sessionService.getSessionPresentation(sessionCode);
                 setPresentation(presentationResponse.data);
             } catch (err) {
                 setError('Could not load session. The code might be invalid or expired.');
@@ -147,14 +153,21 @@ const SessionPage = () => {
             socket.emit('join_session', { 
                 session_code: sessionCode, 
                 name: studentName,
-                student_id: studentId // Kirim ID persisten
+                student_id: studentId, // Kirim ID persisten
+                binary_frames: BINARY_FRAMES_SUPPORTED,
             });
         });
         socket.on('disconnect', () => setIsConnected(false));
+        // Siswa yang bergabung setelah presentasi dimulai langsung melihat slide yang sedang tampil
+        socket.on('join_success', (data) => {
+            if (data.page_number) setCurrentPage((prev) => prev || data.page_number);
+        });
+        socket.on('prefetch_slides', (data) => prefetchSlideImages(data.slides, SLIDE_IMAGE_SIZES));
         socket.on('session_ended', (data) => { alert(data.message); navigate('/'); });
         
         // Listener update umum
-        socket.on('update_leaderboard', (data) => setLeaderboardData(data));
+        socket.on('update_leaderboard', withFrameDecoding((data) => setLeaderboardData(data)));
+        socket.on('update_my_rank', (data) => setMyRank(data));
         socket.on('student_picked', (data) => setPickerData(data));
 
         // Listener untuk memulai aktivitas
@@ -190,42 +203,26 @@ const SessionPage = () => {
             console.log('Received bubble_quiz_started:', quizData);
             setActiveBubbleQuiz(quizData);
             setHasClickedBubbleQuiz(false);
-            setBubbleQuizClicks([]);
+            setBubbleQuizResults({});
             setActiveQuiz(null);
             setActivePoll(null);
             setActiveWordCloud(null);
             setIsDrawingActive(false);
         });
+        // Kanvas lengkap dari log server (juga dikirim ke siswa yang baru bergabung)
         socket.on('drawing_started', (data) => {
             setIsDrawingActive(true);
-            const currentSlide = presentation?.slides.find(s => s.page_number === currentPage);
-            if (currentSlide) {
-                setDrawings(prev => ({...prev, [currentSlide.id]: data.lines || []}));
-            }
+            setDrawings(prev => ({ ...prev, [data.slide_id]: (data.strokes || []).map(decodeStroke) }));
         });
         socket.on('drawing_hidden', () => setIsDrawingActive(false));
         
         // Listener untuk update hasil
         socket.on('quiz_feedback', (feedback) => setQuizFeedback(feedback));
-        socket.on('update_poll_results', (results) => setPollResults(results));
-        socket.on('update_wordcloud_results', (results) => setWordCloudResults(results));
-        socket.on('update_bubble_quiz_results', (data) => setBubbleQuizClicks(data.clicks));
+        socket.on('update_poll_results', createResultListener(socket, sessionCode, 'poll', resultStreamsRef, setPollResults));
+        socket.on('update_wordcloud_results', createResultListener(socket, sessionCode, 'word_cloud', resultStreamsRef, setWordCloudResults));
+        socket.on('update_bubble_quiz_results', withFrameDecoding(createResultListener(socket, sessionCode, 'bubble_quiz', resultStreamsRef, setBubbleQuizResults)));
         socket.on('canvas_cleared', (data) => setDrawings(prev => ({ ...prev, [data.slide_id]: [] })));
-        socket.on('update_drawing', (data) => {
-            const { drawData } = data;
-            if (!drawData || !drawData.line || !drawData.slide_id) return;
-            setDrawings(prev => {
-                const currentLines = prev[drawData.slide_id] || [];
-                let newLines = [...currentLines];
-                if (drawData.type === 'start') { 
-                    newLines.push(drawData.line); 
-                } 
-                else if (drawData.type === 'draw' && newLines.length > 0) { 
-                    newLines[newLines.length - 1] = drawData.line; 
-                }
-                return { ...prev, [drawData.slide_id]: newLines };
-            });
-        });
+        socket.on('drawing_batch', withFrameDecoding((batch) => setDrawings(prev => applyDrawingBatch(prev, batch))));
 
         // Listener untuk pindah slide
         socket.on('slide_changed', (data) => {
@@ -234,7 +231,7 @@ const SessionPage = () => {
             setActivePoll(null); setHasVotedPoll(false); setPollResults(null);
             setActiveWordCloud(null); setSubmittedWord(false); setWordCloudResults(null);
             setIsDrawingActive(false);
-            setActiveBubbleQuiz(null); setHasClickedBubbleQuiz(false); setBubbleQuizClicks([]);
+            setActiveBubbleQuiz(null); setHasClickedBubbleQuiz(false); setBubbleQuizResults({});
         });
 
         return () => { 
@@ -321,7 +318,7 @@ const SessionPage = () => {
     }
     
     const currentSlide = presentation?.slides.find(s => s.page_number === currentPage);
-    const slideImageUrl = currentSlide ? `${api.defaults.baseURL}/${currentSlide.content_url}` : '';
+    const slideImage = slideImageProps(currentSlide, SLIDE_IMAGE_SIZES);
 
     const renderInteractiveOverlay = () => {
         // Jika ukuran kontainer belum diukur, jangan render apapun
@@ -348,7 +345,7 @@ const SessionPage = () => {
             return (
                 <div className="absolute top-0 left-0 w-full h-full z-20">
                     <BubbleQuizDisplay
-                        clicks={bubbleQuizClicks}
+                        results={bubbleQuizResults}
                         correctAreas={[]}
                         width={containerSize.width}
                         height={containerSize.height}
@@ -488,7 +485,7 @@ const SessionPage = () => {
                     // style={{ border: '2px solid red' }}
                 >
                     <img 
-                        src={slideImageUrl} 
+                        {...slideImage} 
                         alt={`Slide ${currentPage}`} 
                         className="max-w-full max-h-full object-contain"
                         onLoad={() => {
@@ -507,6 +504,11 @@ const SessionPage = () => {
             
             <footer className="p-2 bg-white dark:bg-gray-800 shadow-inner">
                 <p className="text-center font-bold text-xl">Slide {currentPage} / {presentation?.slides.length || '...'}</p>
+                {myRank && (
+                    <p className="text-center text-sm text-gray-500 dark:text-gray-400">
+                        Rank #{myRank.rank} of {myRank.total} · {myRank.score} pts
+                    </p>
+                )}
             </footer>
         </div>
     );
@@ -0,0 +1,95 @@
+// Decoder frame biner dari server (lihat backend/utils/frame_codec.py).
+// Klien yang mengirim binary_frames: true saat join menerima 'drawing_batch',
+// 'update_bubble_quiz_results', dan 'update_leaderboard' sebagai ArrayBuffer
+// little-endian; hasil decode berbentuk sama persis dengan versi JSON-nya.
+const FRAME_VERSION = 1;
+const KIND_DRAWING_BATCH = 1;
+const KIND_RESULTS = 2;
+const KIND_LEADERBOARD = 3;
+const NULL_STRING = 0xffff;
+// Jenis key hasil bubble quiz: 'grid', 'cell:{i}', 'area:{j}'
+const RESULT_KEY_KINDS = ['grid', 'cell', 'area'];
+
+export const BINARY_FRAMES_SUPPORTED = typeof DataView !== 'undefined' && typeof TextDecoder !== 'undefined';
+
+const textDecoder = BINARY_FRAMES_SUPPORTED ? new TextDecoder() : null;
+
+class FrameReader {
+    constructor(buffer) {
+        this.view = new DataView(buffer);
+        this.offset = 0;
+    }
+
+    u8() { const value = this.view.getUint8(this.offset); this.offset += 1; return value; }
+    u16() { const value = this.view.getUint16(this.offset, true); this.offset += 2; return value; }
+    u32() { const value = this.view.getUint32(this.offset, true); this.offset += 4; return value; }
+    i16() { const value = this.view.getInt16(this.offset, true); this.offset += 2; return value; }
+    i32() { const value = this.view.getInt32(this.offset, true); this.offset += 4; return value; }
+    f32() { const value = this.view.getFloat32(this.offset, true); this.offset += 4; return value; }
+    f64() { const value = this.view.getFloat64(this.offset, true); this.offset += 8; return value; }
+
+    string() {
+        const length = this.u16();
+        if (length === NULL_STRING) return null;
+        const bytes = new Uint8Array(this.view.buffer, this.view.byteOffset + this.offset, length);
+        this.offset += length;
+        return textDecoder.decode(bytes);
+    }
+}
+
+const decodeDrawingBatch = (reader) => {
+    const ops = [];
+    for (let count = reader.u16(); count > 0; count--) {
+        const op = { slide_id: reader.string(), id: reader.f64(), n: reader.u32() };
+        if (reader.u8()) {
+            op.tool = reader.string();
+            op.color = reader.string();
+            const width = reader.f32();
+            op.width = Number.isNaN(width) ? null : width;
+        }
+        const points = [];
+        for (let pairs = reader.u32() * 2; pairs > 0; pairs--) points.push(reader.i16());
+        op.points = points;
+        ops.push(op);
+    }
+    return { ops };
+};
+
+const decodeResults = (reader) => {
+    const frame = { slide_id: reader.string(), seq: reader.u32(), full: reader.u8() === 1, values: {} };
+    for (let count = reader.u32(); count > 0; count--) {
+        const kind = RESULT_KEY_KINDS[reader.u8()];
+        const index = reader.u16();
+        frame.values[kind === 'grid' ? kind : `${kind}:${index}`] = reader.u32();
+    }
+    return frame;
+};
+
+const decodeLeaderboard = (reader) => {
+    const entries = [];
+    for (let count = reader.u32(); count > 0; count--) {
+        entries.push({ student_id: reader.string(), student_name: reader.string(), score: reader.i32() });
+    }
+    return entries;
+};
+
+const DECODERS = {
+    [KIND_DRAWING_BATCH]: decodeDrawingBatch,
+    [KIND_RESULTS]: decodeResults,
+    [KIND_LEADERBOARD]: decodeLeaderboard,
+};
+
+// Mengembalikan payload apa adanya jika bukan frame biner (snapshot dan pesan langsung tetap JSON)
+export const decodeFrame = (data) => {
+    if (!(data instanceof ArrayBuffer || ArrayBuffer.isView(data))) return data;
+    const reader = data instanceof ArrayBuffer
+        ? new FrameReader(data)
+        : new FrameReader(data.buffer.slice(data.byteOffset, data.byteOffset + data.byteLength));
+    const version = reader.u8();
+    const decoder = DECODERS[reader.u8()];
+    if (version !== FRAME_VERSION || !decoder) throw new Error(`Unsupported frame (version ${version})`);
+    return decoder(reader);
+};
+
+// Membungkus listener socket agar menerima payload yang sudah di-decode
+export const withFrameDecoding = (listener) => (data) => listener(decodeFrame(data));
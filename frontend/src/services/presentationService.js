@@ -1,7 +1,8 @@
 import api from './api';
 
-export const getPresentations = () => {
-    return api.get('/presentations');
+// summary: hanya jumlah slide dan thumbnail per presentasi (untuk daftar di dasbor)
+export const getPresentations = ({ summary = false } = {}) => {
+    return api.get('/presentations', { params: summary ? { summary: true } : {} });
 };
 
 export const getPresentationById = (id) => {
@@ -38,6 +39,11 @@ export const uploadPdf = (presentationId, file, onUploadProgress) => {
     );
 };
 
+// Status job konversi PDF: { job_id, status, total_pages, done_pages, error }
+export const getIngestJob = (jobId) => {
+    return api.get(`/presentations/ingest-jobs/${jobId}`);
+};
+
 export const addQuizActivity = (slideId, quizData) => {
     return api.post(`/presentations/slides/${slideId}/quiz`, quizData);
 };
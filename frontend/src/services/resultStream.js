@@ -0,0 +1,24 @@
+// Menggabungkan frame hasil aktivitas berversi dari server.
+// Frame: { slide_id, seq, full, values }. Jika full, values adalah state lengkap;
+// jika tidak, values hanya berisi key yang berubah (nilai absolut).
+// Mengembalikan null jika ada seq yang terlewat sehingga klien perlu meminta snapshot.
+export const applyResultFrame = (current, frame) => {
+    if (frame.full) {
+        return { slideId: frame.slide_id, seq: frame.seq, values: frame.values };
+    }
+    if (!current || current.slideId !== frame.slide_id) return null;
+    if (frame.seq <= current.seq) return current;
+    if (frame.seq !== current.seq + 1) return null;
+    return { ...current, seq: frame.seq, values: { ...current.values, ...frame.values } };
+};
+
+// Membuat listener socket untuk satu jenis aktivitas ('poll', 'word_cloud', 'bubble_quiz').
+export const createResultListener = (socket, sessionCode, activity, streamsRef, onValues) => (frame) => {
+    const next = applyResultFrame(streamsRef.current[activity], frame);
+    if (!next) {
+        socket.emit('request_results_snapshot', { session_code: sessionCode, activity });
+        return;
+    }
+    streamsRef.current[activity] = next;
+    onValues(next.values);
+};
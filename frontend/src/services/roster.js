@@ -0,0 +1,33 @@
+// Roster peserta berversi dari server (lihat ConnectionRegistry di backend).
+// 'update_participant_list' berisi roster lengkap { version, participants };
+// 'participant_joined' { version, participant } dan 'participant_left'
+// { version, student_id } hanya berisi perubahan. Roster dikunci student_id.
+// Mengembalikan null jika ada versi yang terlewat sehingga klien perlu meminta roster lengkap.
+export const applyRosterEvent = (current, type, data) => {
+    if (type === 'snapshot') {
+        const participants = {};
+        data.participants.forEach((participant) => { participants[participant.student_id] = participant; });
+        return { version: data.version, participants };
+    }
+    if (!current) return null;
+    if (data.version <= current.version) return current;
+    if (data.version !== current.version + 1) return null;
+    const participants = { ...current.participants };
+    if (type === 'joined') {
+        participants[data.participant.student_id] = data.participant;
+    } else {
+        delete participants[data.student_id];
+    }
+    return { version: data.version, participants };
+};
+
+// Membuat listener socket untuk satu jenis event roster ('snapshot', 'joined', 'left').
+export const createRosterListener = (socket, sessionCode, rosterRef, type, onParticipants) => (data) => {
+    const next = applyRosterEvent(rosterRef.current, type, data);
+    if (!next) {
+        socket.emit('request_participant_list', { session_code: sessionCode });
+        return;
+    }
+    rosterRef.current = next;
+    onParticipants(Object.values(next.participants));
+};
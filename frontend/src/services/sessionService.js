@@ -2,4 +2,9 @@ import api from './api';
 
 export const validateSession = (sessionCode) => {
     return api.get(`/sessions/${sessionCode}`);
+};
+
+// Presentasi sesi versi siswa (tanpa kunci jawaban), dikirim terkompresi dengan ETag
+export const getSessionPresentation = (sessionCode) => {
+    return api.get(`/sessions/${sessionCode}/presentation`);
 };
\ No newline at end of file
@@ -0,0 +1,45 @@
+import api from './api';
+
+// Atribut <img> responsif untuk sebuah slide.
+// src tetap PNG asli sebagai cadangan; srcSet berisi turunan WebP (thumb/mobile/full)
+// sehingga browser mengunduh ukuran yang sesuai dengan lebar tampilannya.
+export const slideImageProps = (slide, sizes) => {
+    if (!slide) return { src: '' };
+    const baseUrl = api.defaults.baseURL;
+    const props = { src: `${baseUrl}/${slide.content_url}` };
+    if (slide.variants) {
+        props.srcSet = Object.values(slide.variants)
+            .map((variant) => `${baseUrl}/${variant.url} ${variant.width}w`)
+            .join(', ');
+        props.sizes = sizes;
+    }
+    return props;
+};
+
+// Gambar yang sedang di-prefetch disimpan sampai selesai agar unduhannya tidak dibatalkan
+const pendingPrefetches = new Set();
+const prefetchedUrls = new Set();
+
+// Mengunduh gambar slide berikutnya (event 'prefetch_slides') ke cache browser.
+// sizes harus sama dengan <img> yang menampilkan slide agar browser memilih turunan yang sama.
+export const prefetchSlideImages = (slides, sizes, maxDelayMs = 1500) => {
+    slides.forEach((slide) => {
+        const props = slideImageProps(slide, sizes);
+        if (!props.src || prefetchedUrls.has(props.src)) return;
+        prefetchedUrls.add(props.src);
+        // Jeda acak agar seluruh kelas tidak mengunduh pada saat yang sama
+        setTimeout(() => {
+            const img = new Image();
+            const done = () => pendingPrefetches.delete(img);
+            img.onload = done;
+            img.onerror = () => { done(); prefetchedUrls.delete(props.src); };
+            // sizes dan srcset diisi sebelum src agar hanya satu gambar yang diunduh
+            if (props.srcSet) {
+                img.sizes = props.sizes;
+                img.srcset = props.srcSet;
+            }
+            img.src = props.src;
+            pendingPrefetches.add(img);
+        }, Math.random() * maxDelayMs);
+    });
+};
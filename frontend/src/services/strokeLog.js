@@ -0,0 +1,45 @@
+// Decoder coretan dari server (lihat DrawingRelay di backend).
+// Titik dikirim sebagai integer pada grid DRAWING_GRID dan di-delta-encode:
+// [x0, y0, dx1, dy1, ...]. Hasil decode memakai koordinat 0..1 seperti DrawingCanvas.
+const DRAWING_GRID = 4096;
+
+const decodePoints = (encoded, start = [0, 0]) => {
+    const points = [];
+    let [x, y] = start;
+    for (let i = 0; i < encoded.length; i += 2) {
+        x = i === 0 ? encoded[0] : x + encoded[i];
+        y = i === 0 ? encoded[1] : y + encoded[i + 1];
+        points.push(x / DRAWING_GRID, y / DRAWING_GRID);
+    }
+    return points;
+};
+
+// Coretan dari log (event 'drawing_started') -> garis untuk DrawingCanvas
+export const decodeStroke = (stroke) => ({
+    id: stroke.id,
+    tool: stroke.tool,
+    color: stroke.color,
+    strokeWidth: stroke.width,
+    points: decodePoints(stroke.points),
+});
+
+// Menerapkan frame 'drawing_batch' ke state { slide_id: [garis] }.
+// Setiap op membawa n, indeks titik pertamanya; titik yang sudah dimiliki (dari log) dilewati.
+export const applyDrawingBatch = (drawings, batch) => {
+    const next = { ...drawings };
+    batch.ops.forEach((op) => {
+        const lines = [...(next[op.slide_id] || [])];
+        const index = lines.findLastIndex((line) => line.id === op.id);
+        const points = decodePoints(op.points);
+        if (index === -1) {
+            if (op.n !== 0) return;
+            lines.push({ id: op.id, tool: op.tool, color: op.color, strokeWidth: op.width, points });
+        } else {
+            const line = lines[index];
+            const skip = line.points.length / 2 - op.n;
+            lines[index] = { ...line, points: line.points.concat(skip > 0 ? points.slice(skip * 2) : points) };
+        }
+        next[op.slide_id] = lines;
+    });
+    return next;
+};